@@ -36,6 +36,12 @@ class Task:
     :var ~datetime.timedelta | None misfire_grace_time: maximum number of seconds the
         run time of jobs created for this task are allowed to be late, compared to the
         scheduled run time
+    :var int | None batch_size: if set, the jobs of this task are run in batches of up
+        to this many jobs, by calling the callable with a list of the positional
+        argument tuples of the jobs (the callable must then return a sequence of return
+        values, one for each job)
+    :var ~datetime.timedelta | None batch_window: maximum time to wait for more jobs to
+        fill a batch before running a partially filled one
     """
 
     id: str
@@ -45,6 +51,10 @@ class Task:
     misfire_grace_time: timedelta | None = attrs.field(
         eq=False, order=False, default=None
     )
+    batch_size: int | None = attrs.field(eq=False, order=False, default=None)
+    batch_window: timedelta | None = attrs.field(
+        eq=False, order=False, converter=as_timedelta, default=None
+    )
     state: Any = None
 
     def marshal(self, serializer: Serializer) -> dict[str, Any]:
@@ -80,6 +90,7 @@ class Schedule:
         add to the scheduled time for each job created from this schedule
     :var frozenset[str] tags: strings that can be used to categorize and filter the
         schedule and its derivative jobs
+    :var int priority: priority of the jobs created from this schedule
     :var ConflictPolicy conflict_policy: determines what to do if a schedule with the
         same ID already exists in the data store
     :var ~datetime.datetime next_fire_time: the next time the task will be run
@@ -113,6 +124,7 @@ class Schedule:
     tags: frozenset[str] = attrs.field(
         eq=False, order=False, converter=frozenset, default=()
     )
+    priority: int = attrs.field(eq=False, order=False, default=0)
     next_fire_time: datetime | None = attrs.field(eq=False, order=False, default=None)
     last_fire_time: datetime | None = attrs.field(eq=False, order=False, default=None)
     acquired_by: str | None = attrs.field(eq=False, order=False, default=None)
@@ -164,6 +176,9 @@ class Job:
     :var ~datetime.timedelta result_expiration_time: minimum amount of time to keep the
         result available for fetching in the data store
     :var frozenset[str] tags: strings that can be used to categorize and filter the job
+    :var int priority: determines the order in which jobs are acquired for execution
+        (jobs with lower values are acquired first, and jobs with equal priorities in
+        the order they were created in)
     :var ~datetime.datetime created_at: the time at which the job was created
     :var ~datetime.datetime | None started_at: the time at which the execution of the
         job was started
@@ -193,6 +208,7 @@ class Job:
     tags: frozenset[str] = attrs.field(
         eq=False, order=False, converter=frozenset, default=()
     )
+    priority: int = attrs.field(eq=False, order=False, default=0)
     created_at: datetime = attrs.field(
         eq=False, order=False, factory=partial(datetime.now, timezone.utc)
     )
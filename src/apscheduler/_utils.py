@@ -3,7 +3,8 @@ from __future__ import annotations
 
 import sys
 from datetime import datetime, tzinfo
-from typing import TypeVar
+from inspect import Parameter, signature
+from typing import Any, Callable, TypeVar
 
 if sys.version_info >= (3, 9):
     from zoneinfo import ZoneInfo
@@ -30,3 +31,20 @@ def qualified_name(cls: type) -> str:
         return cls.__qualname__
     else:
         return f"{module}.{cls.__qualname__}"
+
+
+def accepts_keyword(func: Callable[..., Any], name: str) -> bool:
+    """Check if the given callable accepts a keyword argument with the given name."""
+    try:
+        parameters = signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+
+    return any(
+        param.kind is Parameter.VAR_KEYWORD
+        or (
+            param.name == name
+            and param.kind in (Parameter.KEYWORD_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+        )
+        for param in parameters
+    )
@@ -3,7 +3,7 @@ from __future__ import annotations
 from abc import ABCMeta, abstractmethod
 from contextlib import AsyncExitStack
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Mapping, Sequence
 from uuid import UUID
 
 if TYPE_CHECKING:
@@ -28,6 +28,45 @@ class Trigger(Iterator[datetime], metaclass=ABCMeta):
         :raises apscheduler.exceptions.MaxIterationsReached:
         """
 
+    def next_after(self, dt: datetime) -> datetime | None:
+        """
+        Skip all the fire times up to and including the given datetime.
+
+        The trigger state is advanced as if :meth:`next` had been called until it
+        returned a fire time later than ``dt``.
+
+        The default implementation does exactly that, so subclasses are encouraged to
+        override this with something that does not need to visit every skipped fire
+        time.
+
+        :param dt: the datetime to skip past
+        :return: the first fire time later than ``dt``, or ``None`` if there is none
+        :raises apscheduler.exceptions.MaxIterationsReached:
+        """
+        while True:
+            fire_time = self.next()
+            if fire_time is None or fire_time > dt:
+                return fire_time
+
+    def next_n(self, n: int) -> list[datetime]:
+        """
+        Return the next ``n`` fire times.
+
+        :param n: the maximum number of fire times to return
+        :return: a list of fire times, shorter than ``n`` if the trigger ran out of fire
+            times
+        :raises apscheduler.exceptions.MaxIterationsReached:
+        """
+        fire_times: list[datetime] = []
+        for _ in range(n):
+            fire_time = self.next()
+            if fire_time is None:
+                break
+
+            fire_times.append(fire_time)
+
+        return fire_times
+
     @abstractmethod
     def __getstate__(self):
         """Return the (JSON compatible) serializable state of the trigger."""
@@ -214,6 +253,23 @@ class DataStore(metaclass=ABCMeta):
             existing schedule with the same ID
         """
 
+    async def add_schedules(
+        self, schedules: Iterable[Schedule], conflict_policy: ConflictPolicy
+    ) -> None:
+        """
+        Add or update the given schedules in the data store.
+
+        The default implementation calls :meth:`add_schedule` for each schedule.
+        Data stores backed by an external service should override this to store all
+        the schedules with as few round trips as possible.
+
+        :param schedules: schedules to be added
+        :param conflict_policy: policy that determines what to do if there is an
+            existing schedule with the same ID
+        """
+        for schedule in schedules:
+            await self.add_schedule(schedule, conflict_policy)
+
     @abstractmethod
     async def remove_schedules(self, ids: Iterable[str]) -> None:
         """
@@ -246,6 +302,39 @@ class DataStore(metaclass=ABCMeta):
         :param schedules: the previously claimed schedules
         """
 
+    async def process_due_schedules(
+        self,
+        scheduler_id: str,
+        limit: int,
+        callback: Callable[[list[Schedule]], list[Job]],
+    ) -> list[Schedule]:
+        """
+        Acquire due schedules, add the jobs produced for them and release them.
+
+        The callback is given the acquired schedules. It must update their next fire
+        times (and triggers) in place and return the jobs to be added.
+
+        The default implementation calls :meth:`acquire_schedules`, :meth:`add_jobs`
+        and :meth:`release_schedules` in that order. Data stores that support
+        transactions should override this to do all of it in a single transaction,
+        so that a crash in between cannot cause duplicate or lost jobs.
+
+        :param scheduler_id: unique identifier of the scheduler
+        :param limit: maximum number of schedules to claim
+        :param callback: a callable that calculates the next fire times of the
+            schedules and returns the jobs to add
+        :return: the list of processed schedules
+        """
+        schedules = await self.acquire_schedules(scheduler_id, limit)
+        if schedules:
+            jobs = callback(schedules)
+            if jobs:
+                await self.add_jobs(jobs)
+
+            await self.release_schedules(scheduler_id, schedules)
+
+        return schedules
+
     @abstractmethod
     async def get_next_schedule_run_time(self) -> datetime | None:
         """
@@ -261,6 +350,19 @@ class DataStore(metaclass=ABCMeta):
         :param job: the job object
         """
 
+    async def add_jobs(self, jobs: Iterable[Job]) -> None:
+        """
+        Add several jobs to be executed by eligible workers.
+
+        The default implementation calls :meth:`add_job` for each job. Data stores
+        backed by an external service should override this to store all the jobs
+        with as few round trips as possible.
+
+        :param jobs: the job objects
+        """
+        for job in jobs:
+            await self.add_job(job)
+
     @abstractmethod
     async def get_jobs(self, ids: Iterable[UUID] | None = None) -> list[Job]:
         """
@@ -272,7 +374,13 @@ class DataStore(metaclass=ABCMeta):
         """
 
     @abstractmethod
-    async def acquire_jobs(self, worker_id: str, limit: int | None = None) -> list[Job]:
+    async def acquire_jobs(
+        self,
+        worker_id: str,
+        limit: int | None = None,
+        *,
+        executor_limits: Mapping[str, int] | None = None,
+    ) -> list[Job]:
         """
         Acquire unclaimed jobs for execution.
 
@@ -281,7 +389,13 @@ class DataStore(metaclass=ABCMeta):
 
         :param worker_id: unique identifier of the worker
         :param limit: maximum number of jobs to claim and return
+        :param executor_limits: if given, a mapping of job executor names to the
+            maximum number of jobs to claim for each; jobs of tasks using any other job
+            executor are left unclaimed
         :return: the list of claimed jobs
+
+        Implementations are not required to accept ``executor_limits``. The scheduler
+        only passes it to data stores whose ``acquire_jobs()`` has that parameter.
         """
 
     @abstractmethod
@@ -296,6 +410,22 @@ class DataStore(metaclass=ABCMeta):
         :param result: the result of the job
         """
 
+    async def release_jobs(
+        self, worker_id: str, results: Sequence[tuple[str, JobResult]]
+    ) -> None:
+        """
+        Release the claims on several jobs and record their results.
+
+        The default implementation calls :meth:`release_job` for each result. Data
+        stores backed by an external service should override this to release all the
+        jobs with as few round trips as possible.
+
+        :param worker_id: unique identifier of the worker
+        :param results: a sequence of (task ID, job result) tuples
+        """
+        for task_id, result in results:
+            await self.release_job(worker_id, task_id, result)
+
     @abstractmethod
     async def get_job_result(self, job_id: UUID) -> JobResult | None:
         """
@@ -307,8 +437,28 @@ class DataStore(metaclass=ABCMeta):
         :return: the result, or ``None`` if the result was not found
         """
 
+    async def cleanup(self) -> None:
+        """
+        Remove expired job results from the store.
+
+        This is called periodically by the data store itself while it is running.
+
+        The default implementation does nothing. Data stores that keep expired job
+        results around should override this to purge them.
+        """
+
 
 class JobExecutor(metaclass=ABCMeta):
+    @property
+    def max_concurrent_jobs(self) -> int | None:
+        """
+        The maximum number of jobs this executor can run concurrently, or ``None`` if
+        there is no such limit.
+
+        The scheduler won't acquire more jobs for this executor than it can run at once.
+        """
+        return None
+
     async def start(self, exit_stack: AsyncExitStack) -> None:
         """
         Start the job executor.
@@ -3,7 +3,10 @@ from __future__ import annotations
 from contextlib import AsyncExitStack
 from logging import Logger, getLogger
 
+import anyio
 import attrs
+from anyio import create_task_group
+from anyio.abc import TaskGroup
 
 from .._retry import RetryMixin
 from ..abc import DataStore, EventBroker, Serializer
@@ -17,16 +20,32 @@ class BaseDataStore(DataStore):
 
     :param lock_expiration_delay: maximum amount of time (in seconds) that a scheduler
         or worker can keep a lock on a schedule or task
+    :param cleanup_interval: interval (in seconds) between purges of expired job
+        results (``None`` to disable)
     """
 
     lock_expiration_delay: float = 30
+    cleanup_interval: float | None = 60
     _event_broker: EventBroker = attrs.field(init=False)
     _logger: Logger = attrs.field(init=False)
+    _task_group: TaskGroup = attrs.field(init=False)
 
     async def start(
         self, exit_stack: AsyncExitStack, event_broker: EventBroker
     ) -> None:
         self._event_broker = event_broker
+        self._task_group = await exit_stack.enter_async_context(create_task_group())
+        exit_stack.callback(self._task_group.cancel_scope.cancel)
+        if self.cleanup_interval:
+            self._task_group.start_soon(self._run_cleanup)
+
+    async def _run_cleanup(self) -> None:
+        while True:
+            await anyio.sleep(self.cleanup_interval)
+            try:
+                await self.cleanup()
+            except Exception:
+                self._logger.exception("Error cleaning up expired job results")
 
     def __attrs_post_init__(self):
         self._logger = getLogger(self.__class__.__name__)
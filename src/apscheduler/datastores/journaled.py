@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import gc
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+from uuid import UUID
+
+import anyio
+import attrs
+from anyio import CancelScope, to_thread
+
+from .._structures import Job, JobResult, Schedule, Task
+from ..abc import EventBroker
+from .memory import JobState, MemoryDataStore, ScheduleState, TaskState
+
+# The snapshot and every batch of journal records are written as a frame consisting of
+# the length and CRC-32 checksum of the pickled payload, followed by the payload itself
+_frame_header = struct.Struct("<II")
+_pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+
+def _write_frame(file: BinaryIO, payload: bytes) -> None:
+    file.write(_frame_header.pack(len(payload), zlib.crc32(payload)))
+    file.write(payload)
+
+
+def _read_frames(data: bytes) -> Iterator[bytes]:
+    """
+    Yield the payloads of the frames in the given data.
+
+    Reading stops at the first incomplete or corrupted frame, as that is what a crash in
+    the middle of a write leaves at the end of the journal.
+
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset + _frame_header.size <= len(view):
+        length, checksum = _frame_header.unpack_from(view, offset)
+        start = offset + _frame_header.size
+        offset = start + length
+        payload = view[start:offset]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+
+        yield payload
+
+
+def _sync_directory(path: Path) -> None:
+    """Make sure that files created in or removed from the directory stay that way."""
+    if os.name == "posix":
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+@attrs.define(eq=False)
+class JournaledMemoryDataStore(MemoryDataStore):
+    """
+    Stores scheduler data in memory, and persists it in a directory on the local file
+    system.
+
+    All queries and acquisitions are served from memory, like with
+    :class:`~apscheduler.datastores.memory.MemoryDataStore`. In addition, every change
+    is appended to a journal file. The changes are written to the journal (and synced to
+    disk) in batches in a worker thread, at most ``sync_interval`` seconds after they
+    were made, so a crash loses at most that much of the latest changes.
+
+    Periodically, and when the data store is stopped, the whole state is written to a
+    snapshot file and a new journal is started. On startup, the snapshot is loaded
+    through a memory map, and the journals written after it are replayed.
+
+    Claims on schedules and jobs are not persisted, so any jobs that were running when
+    the process exited will be run again after a restart.
+
+    Tasks, schedules, jobs and job results are persisted with :mod:`pickle`, so they
+    (including the task callables, the job arguments and return values and the
+    triggers) must be picklable.
+
+    :param path: path to the directory where the snapshot and journal files are stored
+        (created if it doesn't exist)
+    :param sync_interval: maximum time (in seconds) that changes are buffered before
+        they're written to the journal
+    :param snapshot_interval: interval (in seconds) between snapshots (``None`` to only
+        take a snapshot when the data store is stopped)
+    :param start_from_scratch: erase all existing data during startup (useful for test
+        suites)
+    """
+
+    path: Path = attrs.field(kw_only=True, converter=Path)
+    sync_interval: float = attrs.field(kw_only=True, default=0.1)
+    snapshot_interval: float | None = attrs.field(kw_only=True, default=300)
+    start_from_scratch: bool = attrs.field(kw_only=True, default=False)
+    _journaling: bool = attrs.field(init=False, default=False)
+    _generation: int = attrs.field(init=False, default=0)
+    _journal: BinaryIO | None = attrs.field(init=False, default=None)
+    _pending_records: list[tuple[Any, ...]] = attrs.field(init=False, factory=list)
+    _records_pending: anyio.Event = attrs.field(init=False)
+    _journal_lock: anyio.Lock = attrs.field(init=False, factory=anyio.Lock)
+    _snapshot_lock: anyio.Lock = attrs.field(init=False, factory=anyio.Lock)
+
+    @property
+    def _snapshot_path(self) -> Path:
+        return self.path / "snapshot"
+
+    def _journal_path(self, generation: int) -> Path:
+        return self.path / f"journal.{generation}"
+
+    def _journal_generations(self) -> list[int]:
+        return sorted(
+            int(path.suffix[1:])
+            for path in self.path.glob("journal.*")
+            if path.suffix[1:].isdigit()
+        )
+
+    async def start(
+        self, exit_stack: AsyncExitStack, event_broker: EventBroker
+    ) -> None:
+        await to_thread.run_sync(self._recover)
+        self._records_pending = anyio.Event()
+        self._journaling = True
+        await super().start(exit_stack, event_broker)
+
+        # Runs before the task group is cancelled, so a snapshot is always taken
+        exit_stack.push_async_callback(self._stop)
+        self._task_group.start_soon(self._write_journal_continuously)
+        if self.snapshot_interval:
+            self._task_group.start_soon(self._take_snapshots_periodically)
+
+    async def _stop(self) -> None:
+        with CancelScope(shield=True):
+            await self._take_snapshot()
+            async with self._journal_lock:
+                self._journaling = False
+                if self._journal is not None:
+                    await to_thread.run_sync(self._journal.close)
+                    self._journal = None
+
+    def _recover(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self.start_from_scratch:
+            self._snapshot_path.unlink(missing_ok=True)
+            for generation in self._journal_generations():
+                self._journal_path(generation).unlink()
+
+        # Loading creates lots of long lived objects, which would otherwise trigger
+        # many pointless garbage collection passes
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            last_generation = self._load()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        # Start a new journal, as the last one may end with an incomplete write
+        self._generation = last_generation + 1
+        self._journal = open(self._journal_path(self._generation), "ab")
+        _sync_directory(self.path)
+
+    def _load(self) -> int:
+        """
+        Load the snapshot and replay the journals written after it.
+
+        :return: the generation of the last journal (or snapshot)
+
+        """
+        # Load the snapshot (if there is one)
+        snapshot_generation = 0
+        if self._snapshot_path.exists():
+            with open(self._snapshot_path, "rb") as file, mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                length, checksum = _frame_header.unpack_from(mapped)
+                header_size = _frame_header.size
+                with memoryview(mapped)[header_size:] as payload:
+                    if len(payload) != length or zlib.crc32(payload) != checksum:
+                        raise RuntimeError(
+                            f"The snapshot file ({self._snapshot_path}) is corrupted"
+                        )
+
+                    snapshot = pickle.loads(payload)
+
+            snapshot_generation, tasks, schedules, jobs, job_results = snapshot
+            # The base class methods are used to skip pickling the items again
+            for task in pickle.loads(tasks):
+                super()._put_task(task)
+
+            for schedule in pickle.loads(schedules):
+                super()._put_schedule(schedule)
+
+            for job in jobs:
+                super()._put_job(job)
+
+            for job_result in job_results:
+                super()._store_job_result(job_result)
+
+        # Replay the changes made after the snapshot was taken
+        generations = self._journal_generations()
+        for generation in generations:
+            if generation >= snapshot_generation:
+                data = self._journal_path(generation).read_bytes()
+                for payload in _read_frames(data):
+                    for record in pickle.loads(payload):
+                        self._replay(*record)
+
+        # Replayed removals may have left stale entries in the queue of ready tasks
+        self._ready_tasks.clear()
+        self._ready_task_keys.clear()
+        for task_id in self._tasks:
+            self._activate_task(task_id)
+
+        return max(generations + [snapshot_generation])
+
+    def _replay(self, operation: str, *args: Any) -> None:
+        if operation == "put_task":
+            super()._put_task(pickle.loads(args[0]))
+        elif operation == "delete_task":
+            self._tasks.pop(args[0], None)
+        elif operation == "put_schedule":
+            super()._put_schedule(pickle.loads(args[0]))
+        elif operation == "remove_schedule":
+            self._remove_schedule(args[0])
+        elif operation == "put_job":
+            super()._put_job(pickle.loads(args[0]))
+        elif operation == "delete_job":
+            if args[0] in self._jobs_by_id:
+                self._delete_job(args[0])
+        elif operation == "put_job_result":
+            super()._store_job_result(pickle.loads(args[0]))
+        elif operation == "delete_job_result":
+            self._job_results.pop(args[0], None)
+
+    def _record(self, *record: Any) -> None:
+        if self._journaling:
+            self._pending_records.append(record)
+            self._records_pending.set()
+
+    async def _write_journal_continuously(self) -> None:
+        while True:
+            # Give more changes a chance to accumulate before writing them
+            await self._records_pending.wait()
+            await anyio.sleep(self.sync_interval)
+            await self._write_pending_records()
+
+    async def _write_pending_records(self) -> None:
+        async with self._journal_lock:
+            records, self._pending_records = self._pending_records, []
+            self._records_pending = anyio.Event()
+            if records and self._journal is not None:
+                await to_thread.run_sync(self._write_journal, self._journal, records)
+
+    @staticmethod
+    def _write_journal(journal: BinaryIO, records: list[tuple[Any, ...]]) -> None:
+        _write_frame(journal, pickle.dumps(records, protocol=_pickle_protocol))
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    async def _take_snapshots_periodically(self) -> None:
+        while True:
+            await anyio.sleep(self.snapshot_interval)
+            await self._take_snapshot()
+
+    async def _take_snapshot(self) -> None:
+        async with self._snapshot_lock:
+            async with self._journal_lock:
+                # Capture the current state, and direct all further changes to a new
+                # journal. Only that journal will be replayed on top of the snapshot.
+                records, self._pending_records = self._pending_records, []
+                self._records_pending = anyio.Event()
+                old_journal = self._journal
+                self._generation += 1
+                generation = self._generation
+                tasks = pickle.dumps(
+                    [state.task for state in self._tasks.values()],
+                    protocol=_pickle_protocol,
+                )
+                schedules = pickle.dumps(
+                    [state.schedule for state in self._schedules_by_id.values()],
+                    protocol=_pickle_protocol,
+                )
+                jobs = [state.job for state in self._jobs_by_id.values()]
+                job_results = list(self._job_results.values())
+                self._journal = await to_thread.run_sync(
+                    self._rotate_journal, old_journal, records, generation
+                )
+
+            # The (immutable) jobs and job results are pickled again in the worker
+            # thread, while the journal can be written to again
+            await to_thread.run_sync(
+                self._write_snapshot,
+                (generation, tasks, schedules, jobs, job_results),
+            )
+
+    def _rotate_journal(
+        self,
+        old_journal: BinaryIO | None,
+        records: list[tuple[Any, ...]],
+        generation: int,
+    ) -> BinaryIO:
+        if old_journal is not None:
+            if records:
+                self._write_journal(old_journal, records)
+
+            old_journal.close()
+
+        journal = open(self._journal_path(generation), "ab")
+        _sync_directory(self.path)
+        return journal
+
+    def _write_snapshot(self, snapshot: tuple[Any, ...]) -> None:
+        temp_path = self.path / "snapshot.tmp"
+        with open(temp_path, "wb") as file:
+            _write_frame(file, pickle.dumps(snapshot, protocol=_pickle_protocol))
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temp_path, self._snapshot_path)
+        _sync_directory(self.path)
+
+        # The older journals are no longer needed
+        generation = snapshot[0]
+        for old_generation in self._journal_generations():
+            if old_generation < generation:
+                self._journal_path(old_generation).unlink()
+
+    def _put_task(self, task: Task) -> TaskState | None:
+        # Pickle first, so that an unpicklable task is rejected before it's added
+        pickled = pickle.dumps(task, protocol=_pickle_protocol)
+        old_state = super()._put_task(task)
+        self._record("put_task", pickled)
+        return old_state
+
+    def _delete_task(self, task_id: str) -> None:
+        super()._delete_task(task_id)
+        self._record("delete_task", task_id)
+
+    def _put_schedule(self, schedule: Schedule) -> ScheduleState | None:
+        pickled = pickle.dumps(schedule, protocol=_pickle_protocol)
+        old_state = super()._put_schedule(schedule)
+        self._record("put_schedule", pickled)
+        return old_state
+
+    def _release_schedule(self, schedule: Schedule) -> bool:
+        if super()._release_schedule(schedule):
+            self._record(
+                "put_schedule", pickle.dumps(schedule, protocol=_pickle_protocol)
+            )
+            return True
+
+        return False
+
+    def _remove_schedule(self, schedule_id: str) -> ScheduleState | None:
+        state = super()._remove_schedule(schedule_id)
+        if state is not None:
+            self._record("remove_schedule", schedule_id)
+
+        return state
+
+    def _put_job(self, job: Job) -> None:
+        pickled = pickle.dumps(job, protocol=_pickle_protocol)
+        super()._put_job(job)
+        self._record("put_job", pickled)
+
+    def _delete_job(self, job_id: UUID) -> JobState:
+        state = super()._delete_job(job_id)
+        self._record("delete_job", job_id)
+        return state
+
+    def _store_job_result(self, result: JobResult) -> None:
+        if result.expires_at > result.finished_at:
+            pickled = pickle.dumps(result, protocol=_pickle_protocol)
+            super()._store_job_result(result)
+            self._record("put_job_result", pickled)
+
+    async def get_job_result(self, job_id: UUID) -> JobResult | None:
+        result = await super().get_job_result(job_id)
+        if result is not None:
+            self._record("delete_job_result", job_id)
+
+        return result
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from bisect import bisect_left, insort_right
 from collections import defaultdict
 from datetime import MAXYEAR, datetime, timedelta, timezone
 from functools import partial
-from typing import Any, Iterable
+from heapq import heapify, heappop, heappush
+from itertools import count
+from typing import Any, Iterable, Iterator, Mapping
 from uuid import UUID
 
 import attrs
@@ -36,6 +37,13 @@ class TaskState:
     def __eq__(self, other):
         return self.task.id == other.task.id
 
+    @property
+    def has_free_slots(self) -> bool:
+        return (
+            self.task.max_running_jobs is None
+            or self.running_jobs < self.task.max_running_jobs
+        )
+
 
 @attrs.define
 class ScheduleState:
@@ -64,21 +72,27 @@ class ScheduleState:
         return hash(self.schedule.id)
 
 
-@attrs.define(order=True)
+@attrs.define
 class JobState:
-    job: Job = attrs.field(order=False)
-    created_at: datetime = attrs.field(
-        init=False, factory=partial(datetime.now, timezone.utc)
-    )
-    acquired_by: str | None = attrs.field(eq=False, order=False, default=None)
-    acquired_until: datetime | None = attrs.field(eq=False, order=False, default=None)
+    job: Job
+    sequence: int = attrs.field(eq=False)
+    acquired_by: str | None = attrs.field(eq=False, default=None)
+    acquired_until: datetime | None = attrs.field(eq=False, default=None)
 
     def __eq__(self, other):
         return self.job.id == other.job.id
 
+    def __lt__(self, other):
+        return self.sort_key < other.sort_key
+
     def __hash__(self):
         return hash(self.job.id)
 
+    @property
+    def sort_key(self) -> tuple[int, int]:
+        """The key that determines the order in which jobs are acquired."""
+        return self.job.priority, self.sequence
+
 
 @attrs.define(eq=False)
 class MemoryDataStore(BaseDataStore):
@@ -89,46 +103,257 @@ class MemoryDataStore(BaseDataStore):
     """
 
     _tasks: dict[str, TaskState] = attrs.Factory(dict)
-    _schedules: list[ScheduleState] = attrs.Factory(list)
     _schedules_by_id: dict[str, ScheduleState] = attrs.Factory(dict)
     _schedules_by_task_id: dict[str, set[ScheduleState]] = attrs.Factory(
         partial(defaultdict, set)
     )
-    _jobs: list[JobState] = attrs.Factory(list)
+    _schedule_queue: list[tuple[datetime, str, ScheduleState]] = attrs.Factory(list)
+    _schedule_locks: list[tuple[datetime, str, ScheduleState]] = attrs.Factory(list)
     _jobs_by_id: dict[UUID, JobState] = attrs.Factory(dict)
     _jobs_by_task_id: dict[str, set[JobState]] = attrs.Factory(
         partial(defaultdict, set)
     )
+    _job_sequence: Iterator[int] = attrs.Factory(count)
+    _ready_jobs: dict[str, list[tuple[tuple[int, int], JobState]]] = attrs.Factory(
+        partial(defaultdict, list)
+    )
+    _ready_tasks: list[tuple[tuple[int, int], str]] = attrs.Factory(list)
+    _ready_task_keys: dict[str, tuple[int, int]] = attrs.Factory(dict)
+    _job_locks: list[tuple[datetime, int, JobState]] = attrs.Factory(list)
     _job_results: dict[UUID, JobResult] = attrs.Factory(dict)
+    _job_result_expirations: list[tuple[datetime, UUID]] = attrs.Factory(list)
+
+    def _enqueue_schedule(self, state: ScheduleState) -> None:
+        if state.next_fire_time is not None:
+            heappush(
+                self._schedule_queue,
+                (state.next_fire_time, state.schedule.id, state),
+            )
+            self._compact_schedule_queue()
+
+    def _compact_schedule_queue(self) -> None:
+        """
+        Rebuild the schedule queue if it consists mostly of stale entries.
+
+        This keeps memory use in check when schedules are frequently removed or
+        replaced without their queue entries reaching the head of the queue.
+
+        """
+        if len(self._schedule_queue) > 2 * len(self._schedules_by_id) + 100:
+            self._schedule_queue = [
+                entry
+                for entry in self._schedule_queue
+                if self._is_queued_schedule(*entry)
+            ]
+            heapify(self._schedule_queue)
+
+    def _is_queued_schedule(
+        self, fire_time: datetime, schedule_id: str, state: ScheduleState
+    ) -> bool:
+        """
+        Check if the given schedule queue entry is still valid.
+
+        Queue entries are not removed when a schedule is removed, replaced, acquired or
+        rescheduled, so stale entries are filtered out lazily here.
+
+        """
+        return (
+            self._schedules_by_id.get(schedule_id) is state
+            and state.acquired_by is None
+            and state.next_fire_time == fire_time
+        )
+
+    def _is_locked_schedule(
+        self, acquired_until: datetime, schedule_id: str, state: ScheduleState
+    ) -> bool:
+        return (
+            self._schedules_by_id.get(schedule_id) is state
+            and state.acquired_by is not None
+            and state.acquired_until == acquired_until
+        )
+
+    def _reclaim_expired_schedule_locks(self, now: datetime) -> None:
+        """Make schedules with expired acquisition locks available again."""
+        while self._schedule_locks and self._schedule_locks[0][0] < now:
+            entry = heappop(self._schedule_locks)
+            if self._is_locked_schedule(*entry):
+                state = entry[2]
+                state.acquired_by = None
+                state.acquired_until = None
+                self._enqueue_schedule(state)
+
+    def _peek_ready_job(self, task_id: str) -> JobState | None:
+        """
+        Return the next unclaimed job of the given task (by priority and age), if any.
+
+        Stale entries (for jobs that have since been acquired or removed) are discarded
+        from the head of the task's ready queue along the way.
+
+        """
+        queue = self._ready_jobs.get(task_id)
+        while queue:
+            state = queue[0][1]
+            if (
+                self._jobs_by_id.get(state.job.id) is state
+                and state.acquired_by is None
+            ):
+                return state
+
+            heappop(queue)
+
+        return None
+
+    def _activate_task(self, task_id: str) -> None:
+        """
+        Add the given task to the queue of tasks that have jobs ready for acquisition.
+
+        Nothing is done if the task has no free job slots or no unclaimed jobs, or if
+        it's already queued with its next unclaimed job. Each task only has one valid
+        entry in the queue at a time (the one recorded in ``_ready_task_keys``).
+
+        """
+        task_state = self._tasks.get(task_id)
+        if task_state is not None and task_state.has_free_slots:
+            state = self._peek_ready_job(task_id)
+            if (
+                state is not None
+                and self._ready_task_keys.get(task_id) != state.sort_key
+            ):
+                self._ready_task_keys[task_id] = state.sort_key
+                heappush(self._ready_tasks, (state.sort_key, task_id))
+                self._compact_ready_tasks()
+
+    def _compact_ready_tasks(self) -> None:
+        """
+        Rebuild the ready task queue if it consists mostly of superseded entries.
+
+        Entries are superseded when a task gets a job with a higher priority than the
+        one it was queued with.
+
+        """
+        if len(self._ready_tasks) > 2 * len(self._ready_task_keys) + 100:
+            self._ready_tasks = [
+                (sort_key, task_id)
+                for task_id, sort_key in self._ready_task_keys.items()
+            ]
+            heapify(self._ready_tasks)
+
+    def _is_locked_job(
+        self, acquired_until: datetime, sequence: int, state: JobState
+    ) -> bool:
+        return (
+            self._jobs_by_id.get(state.job.id) is state
+            and state.acquired_by is not None
+            and state.acquired_until == acquired_until
+        )
+
+    def _reclaim_expired_job_locks(self, now: datetime) -> None:
+        """Return jobs with expired acquisition locks to their tasks' ready queues."""
+        while self._job_locks and self._job_locks[0][0] < now:
+            entry = heappop(self._job_locks)
+            if self._is_locked_job(*entry):
+                state = entry[2]
+                state.acquired_by = None
+                state.acquired_until = None
+                task_state = self._tasks.get(state.job.task_id)
+                if task_state is not None:
+                    task_state.running_jobs -= 1
+
+                heappush(self._ready_jobs[state.job.task_id], (state.sort_key, state))
+                self._activate_task(state.job.task_id)
+
+    def _put_task(self, task: Task) -> TaskState | None:
+        """Add or replace a task, returning the state of the replaced task (if any)."""
+        old_state = self._tasks.get(task.id)
+        running_jobs = old_state.running_jobs if old_state is not None else 0
+        self._tasks[task.id] = TaskState(task, running_jobs)
+        self._activate_task(task.id)
+        return old_state
+
+    def _delete_task(self, task_id: str) -> None:
+        del self._tasks[task_id]
+
+    def _put_schedule(self, schedule: Schedule) -> ScheduleState | None:
+        """
+        Add or replace a schedule, returning the state of the replaced schedule (if
+        any).
+
+        """
+        old_state = self._schedules_by_id.get(schedule.id)
+        if old_state is not None:
+            self._schedules_by_task_id[old_state.schedule.task_id].discard(old_state)
+
+        state = ScheduleState(schedule)
+        self._schedules_by_id[schedule.id] = state
+        self._schedules_by_task_id[schedule.task_id].add(state)
+        self._enqueue_schedule(state)
+        return old_state
+
+    def _release_schedule(self, schedule: Schedule) -> bool:
+        """
+        Put an acquired schedule back in the queue at its new position.
+
+        :return: ``False`` if the schedule was removed while it was being processed
+
+        """
+        state = self._schedules_by_id.get(schedule.id)
+        if state is None:
+            return False
+
+        state.next_fire_time = schedule.next_fire_time
+        state.acquired_by = None
+        state.acquired_until = None
+        self._enqueue_schedule(state)
+        return True
+
+    def _remove_schedule(self, schedule_id: str) -> ScheduleState | None:
+        state = self._schedules_by_id.pop(schedule_id, None)
+        if state is not None:
+            self._schedules_by_task_id[state.schedule.task_id].discard(state)
+
+        return state
+
+    def _put_job(self, job: Job) -> None:
+        state = JobState(job, next(self._job_sequence))
+        self._jobs_by_id[job.id] = state
+        self._jobs_by_task_id[job.task_id].add(state)
+        heappush(self._ready_jobs[job.task_id], (state.sort_key, state))
+        if self._peek_ready_job(job.task_id) is state:
+            self._activate_task(job.task_id)
 
-    def _find_schedule_index(self, state: ScheduleState) -> int | None:
-        left_index = bisect_left(self._schedules, state)
-        right_index = bisect_left(self._schedules, state)
-        return self._schedules.index(state, left_index, right_index + 1)
+    def _delete_job(self, job_id: UUID) -> JobState:
+        state = self._jobs_by_id.pop(job_id)
+        self._jobs_by_task_id[state.job.task_id].discard(state)
+        return state
 
-    def _find_job_index(self, state: JobState) -> int | None:
-        left_index = bisect_left(self._jobs, state)
-        right_index = bisect_left(self._jobs, state)
-        return self._jobs.index(state, left_index, right_index + 1)
+    def _store_job_result(self, result: JobResult) -> None:
+        if result.expires_at > result.finished_at:
+            self._job_results[result.job_id] = result
+            heappush(self._job_result_expirations, (result.expires_at, result.job_id))
 
     async def get_schedules(self, ids: set[str] | None = None) -> list[Schedule]:
-        return [
-            state.schedule
-            for state in self._schedules
-            if ids is None or state.schedule.id in ids
-        ]
+        if ids is None:
+            states = self._schedules_by_id.values()
+        else:
+            states = (
+                self._schedules_by_id[schedule_id]
+                for schedule_id in ids
+                if schedule_id in self._schedules_by_id
+            )
+
+        return sorted(
+            (state.schedule for state in states), key=lambda schedule: schedule.id
+        )
 
     async def add_task(self, task: Task) -> None:
-        task_exists = task.id in self._tasks
-        self._tasks[task.id] = TaskState(task)
-        if task_exists:
+        if self._put_task(task) is not None:
             await self._event_broker.publish(TaskUpdated(task_id=task.id))
         else:
             await self._event_broker.publish(TaskAdded(task_id=task.id))
 
     async def remove_task(self, task_id: str) -> None:
         try:
-            del self._tasks[task_id]
+            self._delete_task(task_id)
         except KeyError:
             raise TaskLookupError(task_id) from None
 
@@ -148,23 +373,13 @@ class MemoryDataStore(BaseDataStore):
     async def add_schedule(
         self, schedule: Schedule, conflict_policy: ConflictPolicy
     ) -> None:
-        old_state = self._schedules_by_id.get(schedule.id)
-        if old_state is not None:
+        if schedule.id in self._schedules_by_id:
             if conflict_policy is ConflictPolicy.do_nothing:
                 return
             elif conflict_policy is ConflictPolicy.exception:
                 raise ConflictingIdError(schedule.id)
 
-            index = self._find_schedule_index(old_state)
-            del self._schedules[index]
-            self._schedules_by_task_id[old_state.schedule.task_id].remove(old_state)
-
-        state = ScheduleState(schedule)
-        self._schedules_by_id[schedule.id] = state
-        self._schedules_by_task_id[schedule.task_id].add(state)
-        insort_right(self._schedules, state)
-
-        if old_state is not None:
+        if self._put_schedule(schedule) is not None:
             event = ScheduleUpdated(
                 schedule_id=schedule.id, next_fire_time=schedule.next_fire_time
             )
@@ -177,30 +392,32 @@ class MemoryDataStore(BaseDataStore):
 
     async def remove_schedules(self, ids: Iterable[str]) -> None:
         for schedule_id in ids:
-            state = self._schedules_by_id.pop(schedule_id, None)
-            if state:
-                self._schedules.remove(state)
-                event = ScheduleRemoved(schedule_id=state.schedule.id)
+            if self._remove_schedule(schedule_id) is not None:
+                event = ScheduleRemoved(schedule_id=schedule_id)
                 await self._event_broker.publish(event)
 
+        self._compact_schedule_queue()
+
     async def acquire_schedules(self, scheduler_id: str, limit: int) -> list[Schedule]:
         now = datetime.now(timezone.utc)
+        self._reclaim_expired_schedule_locks(now)
+        acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
         schedules: list[Schedule] = []
-        for state in self._schedules:
-            if state.next_fire_time is None or state.next_fire_time > now:
-                # The schedule is either paused or not yet due
+        while self._schedule_queue and len(schedules) < limit:
+            entry = self._schedule_queue[0]
+            if not self._is_queued_schedule(*entry):
+                heappop(self._schedule_queue)
+                continue
+            elif entry[0] > now:
+                # The earliest schedule is not yet due
                 break
-            elif state.acquired_by is not None:
-                if state.acquired_by != scheduler_id and now <= state.acquired_until:
-                    # The schedule has been acquired by another scheduler and the
-                    # timeout has not expired yet
-                    continue
 
+            heappop(self._schedule_queue)
+            state = entry[2]
             schedules.append(state.schedule)
             state.acquired_by = scheduler_id
-            state.acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
-            if len(schedules) == limit:
-                break
+            state.acquired_until = acquired_until
+            heappush(self._schedule_locks, (acquired_until, state.schedule.id, state))
 
         return schedules
 
@@ -211,16 +428,9 @@ class MemoryDataStore(BaseDataStore):
         finished_schedule_ids: list[str] = []
         for s in schedules:
             if s.next_fire_time is not None:
-                # Remove the schedule
-                schedule_state = self._schedules_by_id.get(s.id)
-                index = self._find_schedule_index(schedule_state)
-                del self._schedules[index]
-
-                # Re-add the schedule to its new position
-                schedule_state.next_fire_time = s.next_fire_time
-                schedule_state.acquired_by = None
-                schedule_state.acquired_until = None
-                insort_right(self._schedules, schedule_state)
+                if not self._release_schedule(s):
+                    continue
+
                 event = ScheduleUpdated(
                     schedule_id=s.id, next_fire_time=s.next_fire_time
                 )
@@ -232,14 +442,28 @@ class MemoryDataStore(BaseDataStore):
         await self.remove_schedules(finished_schedule_ids)
 
     async def get_next_schedule_run_time(self) -> datetime | None:
-        return self._schedules[0].next_fire_time if self._schedules else None
+        # Discard stale entries from the heads of the queues
+        while self._schedule_queue and not self._is_queued_schedule(
+            *self._schedule_queue[0]
+        ):
+            heappop(self._schedule_queue)
+
+        while self._schedule_locks and not self._is_locked_schedule(
+            *self._schedule_locks[0]
+        ):
+            heappop(self._schedule_locks)
+
+        # Schedules with expired locks can be acquired again, so they need to be
+        # considered too
+        candidates = [
+            queue[0][0]
+            for queue in (self._schedule_queue, self._schedule_locks)
+            if queue
+        ]
+        return min(candidates, default=None)
 
     async def add_job(self, job: Job) -> None:
-        state = JobState(job)
-        self._jobs.append(state)
-        self._jobs_by_id[job.id] = state
-        self._jobs_by_task_id[job.task_id].add(state)
-
+        self._put_job(job)
         event = JobAdded(
             job_id=job.id,
             task_id=job.task_id,
@@ -252,41 +476,72 @@ class MemoryDataStore(BaseDataStore):
         if ids is not None:
             ids = frozenset(ids)
 
-        return [state.job for state in self._jobs if ids is None or state.job.id in ids]
+        return [
+            state.job
+            for state in self._jobs_by_id.values()
+            if ids is None or state.job.id in ids
+        ]
 
-    async def acquire_jobs(self, worker_id: str, limit: int | None = None) -> list[Job]:
+    async def acquire_jobs(
+        self,
+        worker_id: str,
+        limit: int | None = None,
+        *,
+        executor_limits: Mapping[str, int] | None = None,
+    ) -> list[Job]:
         now = datetime.now(timezone.utc)
+        self._reclaim_expired_job_locks(now)
+        acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
+        executor_slots_left = (
+            dict(executor_limits) if executor_limits is not None else None
+        )
+        skipped_tasks: list[tuple[tuple[int, int], str]] = []
         jobs: list[Job] = []
-        for _index, job_state in enumerate(self._jobs):
-            task_state = self._tasks[job_state.job.task_id]
-
-            # Skip already acquired jobs (unless the acquisition lock has expired)
-            if job_state.acquired_by is not None:
-                if job_state.acquired_until >= now:
-                    continue
-                else:
-                    task_state.running_jobs -= 1
+        while self._ready_tasks and (limit is None or len(jobs) < limit):
+            # Take the task whose next unclaimed job has the highest priority of all
+            # (or is the oldest of those with the highest priority)
+            sort_key, task_id = heappop(self._ready_tasks)
+            if self._ready_task_keys.get(task_id) != sort_key:
+                # Superseded entry; the task has another one in the queue
+                continue
 
-            # Check if the task allows one more job to be started
+            task_state = self._tasks.get(task_id)
+            job_state = self._peek_ready_job(task_id)
             if (
-                task_state.task.max_running_jobs is not None
-                and task_state.running_jobs >= task_state.task.max_running_jobs
+                task_state is None
+                or not task_state.has_free_slots
+                or job_state is None
+                or job_state.sort_key != sort_key
             ):
+                # Stale entry; the task will be reactivated when it has a free slot
+                # and an unclaimed job again
+                del self._ready_task_keys[task_id]
                 continue
 
+            # Leave the task's jobs for other workers if there's no room for them in
+            # the job executor
+            if executor_slots_left is not None:
+                executor = task_state.task.executor
+                if not executor_slots_left.get(executor):
+                    skipped_tasks.append((sort_key, task_id))
+                    continue
+
+                executor_slots_left[executor] -= 1
+
             # Mark the job as acquired by this worker
+            del self._ready_task_keys[task_id]
+            heappop(self._ready_jobs[task_id])
             jobs.append(job_state.job)
             job_state.acquired_by = worker_id
-            job_state.acquired_until = now + timedelta(
-                seconds=self.lock_expiration_delay
-            )
+            job_state.acquired_until = acquired_until
+            heappush(self._job_locks, (acquired_until, job_state.sequence, job_state))
 
             # Increment the number of running jobs for this task
             task_state.running_jobs += 1
+            self._activate_task(task_id)
 
-            # Exit the loop if enough jobs have been acquired
-            if len(jobs) == limit:
-                break
+        for entry in skipped_tasks:
+            heappush(self._ready_tasks, entry)
 
         # Publish the appropriate events
         for job in jobs:
@@ -300,8 +555,7 @@ class MemoryDataStore(BaseDataStore):
         self, worker_id: str, task_id: str, result: JobResult
     ) -> None:
         # Record the job result
-        if result.expires_at > result.finished_at:
-            self._job_results[result.job_id] = result
+        self._store_job_result(result)
 
         # Decrement the number of running jobs for this task
         task_state = self._tasks.get(task_id)
@@ -309,10 +563,18 @@ class MemoryDataStore(BaseDataStore):
             task_state.running_jobs -= 1
 
         # Delete the job
-        job_state = self._jobs_by_id.pop(result.job_id)
-        self._jobs_by_task_id[task_id].remove(job_state)
-        index = self._find_job_index(job_state)
-        del self._jobs[index]
+        self._delete_job(result.job_id)
+
+        # The task may have gained a free slot for its next job
+        self._activate_task(task_id)
 
     async def get_job_result(self, job_id: UUID) -> JobResult | None:
         return self._job_results.pop(job_id, None)
+
+    async def cleanup(self) -> None:
+        now = datetime.now(timezone.utc)
+        while self._job_result_expirations and self._job_result_expirations[0][0] < now:
+            expires_at, job_id = heappop(self._job_result_expirations)
+            result = self._job_results.get(job_id)
+            if result is not None and result.expires_at == expires_at:
+                del self._job_results[job_id]
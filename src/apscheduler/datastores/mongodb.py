@@ -4,22 +4,32 @@ import operator
 from collections import defaultdict
 from contextlib import AsyncExitStack
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, ClassVar, Iterable
+from typing import Any, Callable, ClassVar, Iterable, Mapping, Sequence, TypeVar
 from uuid import UUID
 
+import anyio
 import attrs
 import pymongo
 from anyio import to_thread
 from attrs.validators import instance_of
 from bson import CodecOptions, UuidRepresentation
 from bson.codec_options import TypeEncoder, TypeRegistry
-from pymongo import ASCENDING, DeleteOne, MongoClient, UpdateOne
+from pymongo import ASCENDING, DeleteOne, InsertOne, MongoClient, ReplaceOne, UpdateOne
+from pymongo.change_stream import ChangeStream
+from pymongo.client_session import ClientSession
 from pymongo.collection import Collection
-from pymongo.errors import ConnectionFailure, DuplicateKeyError
+from pymongo.errors import (
+    BulkWriteError,
+    ConnectionFailure,
+    DuplicateKeyError,
+    OperationFailure,
+    PyMongoError,
+)
 
 from .._enums import CoalescePolicy, ConflictPolicy, JobOutcome
 from .._events import (
     DataStoreEvent,
+    Event,
     JobAcquired,
     JobAdded,
     ScheduleAdded,
@@ -37,8 +47,11 @@ from .._exceptions import (
 )
 from .._structures import Job, JobResult, Schedule, Task
 from ..abc import EventBroker
+from ..eventbrokers.local import LocalEventBroker
 from .base import BaseExternalDataStore
 
+T = TypeVar("T")
+
 
 class CustomEncoder(TypeEncoder):
     def __init__(self, python_type: type, encoder: Callable):
@@ -61,15 +74,35 @@ class MongoDBDataStore(BaseExternalDataStore):
     When started, this data store creates the appropriate indexes on the given database
     if they're not already present.
 
+    As PyMongo only offers blocking calls, every operation is run in a worker thread
+    so that the event loop is never blocked by network I/O. The client pools both
+    connections and server sessions internally, so sessions are cheap to start.
+
     Operations are retried (in accordance to ``retry_settings``) when an operation
-    raises :exc:`pymongo.errors.ConnectionFailure`.
+    raises :exc:`pymongo.errors.ConnectionFailure`. Transactions that conflict with
+    those of other schedulers are retried by PyMongo itself.
+
+    If the event broker only delivers events locally (like
+    :class:`~apscheduler.eventbrokers.local.LocalEventBroker` does) and the server is
+    part of a replica set or a sharded cluster, this data store watches the jobs and
+    schedules collections through a change stream, and publishes the appropriate events
+    locally to wake up the scheduler when other processes add jobs or schedules. The
+    change stream is resumed from where it left off after connection failures.
 
     :param client: a PyMongo client
     :param database: name of the database to use
+    :param watch_changes: ``False`` to not watch for changes made by other processes
     """
 
     client: MongoClient = attrs.field(validator=instance_of(MongoClient))
     database: str = attrs.field(default="apscheduler", kw_only=True)
+    watch_changes: bool = attrs.field(default=True, kw_only=True)
+
+    _resume_token: Mapping[str, Any] | None = attrs.field(init=False, default=None)
+    _known_job_ids: dict[UUID, None] = attrs.field(init=False, factory=dict)
+    _known_fire_times: dict[str, datetime | None] = attrs.field(
+        init=False, factory=dict
+    )
 
     _task_attrs: ClassVar[list[str]] = [field.name for field in attrs.fields(Task)]
     _schedule_attrs: ClassVar[list[str]] = [
@@ -81,6 +114,14 @@ class MongoDBDataStore(BaseExternalDataStore):
     def _temporary_failure_exceptions(self) -> tuple[type[Exception], ...]:
         return (ConnectionFailure,)
 
+    @property
+    def _supports_transactions(self) -> bool:
+        return self.client.topology_description.topology_type_name in (
+            "ReplicaSetWithPrimary",
+            "Sharded",
+            "LoadBalanced",
+        )
+
     def __attrs_post_init__(self) -> None:
         type_registry = TypeRegistry(
             [
@@ -95,11 +136,13 @@ class MongoDBDataStore(BaseExternalDataStore):
             type_registry=type_registry,
             uuid_representation=UuidRepresentation.STANDARD,
         )
-        database = self.client.get_database(self.database, codec_options=codec_options)
-        self._tasks: Collection = database["tasks"]
-        self._schedules: Collection = database["schedules"]
-        self._jobs: Collection = database["jobs"]
-        self._jobs_results: Collection = database["job_results"]
+        self._database = self.client.get_database(
+            self.database, codec_options=codec_options
+        )
+        self._tasks: Collection = self._database["tasks"]
+        self._schedules: Collection = self._database["schedules"]
+        self._jobs: Collection = self._database["jobs"]
+        self._jobs_results: Collection = self._database["job_results"]
 
     @classmethod
     def from_url(cls, uri: str, **options) -> MongoDBDataStore:
@@ -116,10 +159,37 @@ class MongoDBDataStore(BaseExternalDataStore):
 
             self._schedules.create_index("next_fire_time", session=session)
             self._jobs.create_index("task_id", session=session)
-            self._jobs.create_index("created_at", session=session)
+            self._jobs.create_index(
+                [("priority", ASCENDING), ("created_at", ASCENDING)], session=session
+            )
             self._jobs.create_index("tags", session=session)
             self._jobs_results.create_index("finished_at", session=session)
-            self._jobs_results.create_index("expires_at", session=session)
+
+            # Let the server remove expired job results on its own. The plain index
+            # created by earlier versions must be dropped first, as the options of an
+            # existing index cannot be changed.
+            index_info = self._jobs_results.index_information(session=session)
+            old_index = index_info.get("expires_at_1")
+            if old_index is not None and "expireAfterSeconds" not in old_index:
+                self._jobs_results.drop_index("expires_at_1", session=session)
+
+            self._jobs_results.create_index(
+                "expires_at", expireAfterSeconds=0, session=session
+            )
+
+    async def _run_in_thread(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Call the given function in a worker thread, retrying on temporary failures.
+
+        PyMongo only offers blocking calls, so everything that involves network I/O
+        (including iterating over cursors) must be done within this function.
+
+        :return: the return value of the function
+
+        """
+        async for attempt in self._retry():
+            with attempt:
+                return await to_thread.run_sync(func, *args)
 
     async def start(
         self, exit_stack: AsyncExitStack, event_broker: EventBroker
@@ -132,48 +202,169 @@ class MongoDBDataStore(BaseExternalDataStore):
                 f"{server_info['version']}"
             )
 
-        async for attempt in self._retry():
-            with attempt:
-                await to_thread.run_sync(self._initialize)
-
-    async def add_task(self, task: Task) -> None:
-        async for attempt in self._retry():
-            with attempt:
-                previous = await to_thread.run_sync(
-                    lambda: self._tasks.find_one_and_update(
-                        {"_id": task.id},
+        await self._run_in_thread(self._initialize)
+
+        # Watch for changes made by other processes, unless the event broker already
+        # delivers their events (change streams are available on the same kinds of
+        # deployments as transactions)
+        if (
+            self.watch_changes
+            and isinstance(event_broker, LocalEventBroker)
+            and self._supports_transactions
+        ):
+            exit_stack.enter_context(
+                event_broker.subscribe(
+                    self._record_event, {JobAdded, ScheduleAdded, ScheduleUpdated}
+                )
+            )
+            # Open the change stream right away so that no changes made after this
+            # point are missed
+            stream = await self._run_in_thread(self._open_change_stream)
+            self._task_group.start_soon(self._watch_changes, stream)
+
+    def _open_change_stream(self) -> ChangeStream:
+        pipeline = [
+            {
+                "$match": {
+                    "$or": [
+                        {"ns.coll": "jobs", "operationType": "insert"},
+                        {
+                            "ns.coll": "schedules",
+                            "operationType": {"$in": ["insert", "replace"]},
+                        },
                         {
-                            "$set": task.marshal(self.serializer),
-                            "$setOnInsert": {"running_jobs": 0},
+                            "ns.coll": "schedules",
+                            "operationType": "update",
+                            "updateDescription.updatedFields.next_fire_time": {
+                                "$exists": True
+                            },
                         },
-                        upsert=True,
+                    ]
+                }
+            },
+            {
+                "$project": {
+                    "ns.coll": 1,
+                    "documentKey": 1,
+                    "fullDocument.task_id": 1,
+                    "fullDocument.schedule_id": 1,
+                    "fullDocument.tags": 1,
+                    "fullDocument.next_fire_time": 1,
+                    "updateDescription.updatedFields.next_fire_time": 1,
+                }
+            },
+        ]
+        return self._database.watch(
+            pipeline, resume_after=self._resume_token, max_await_time_ms=1000
+        )
+
+    async def _watch_changes(self, stream: ChangeStream | None) -> None:
+        while True:
+            try:
+                if stream is None:
+                    stream = await self._run_in_thread(self._open_change_stream)
+
+                with stream:
+                    while True:
+                        # The cursor must not be closed while a thread is still using
+                        # it, so cancellation is only acted on between polls, which
+                        # return within max_await_time_ms
+                        change = await to_thread.run_sync(stream.try_next)
+                        self._resume_token = stream.resume_token
+                        if change is not None:
+                            await self._publish_change(change)
+            except OperationFailure as exc:
+                if self._resume_token is not None and exc.code in (260, 280, 286):
+                    # The change stream can't be resumed, so start over
+                    self._logger.warning(
+                        "Could not resume the change stream; changes made by other "
+                        "processes in the meantime may go unnoticed: %s",
+                        exc,
                     )
-                )
+                    self._resume_token = None
+                else:
+                    self._logger.error("Error watching for changes: %s", exc)
+                    await anyio.sleep(1)
+            except PyMongoError as exc:
+                self._logger.error("Error watching for changes: %s", exc)
+                await anyio.sleep(1)
+
+            stream = None
+
+    async def _publish_change(self, change: Mapping[str, Any]) -> None:
+        event: Event
+        document = change.get("fullDocument") or {}
+        if change["ns"]["coll"] == "jobs":
+            job_id = change["documentKey"]["_id"]
+            if job_id in self._known_job_ids:
+                return
+
+            event = JobAdded(
+                job_id=job_id,
+                task_id=document["task_id"],
+                schedule_id=document.get("schedule_id"),
+                tags=document.get("tags", ()),
+            )
+        else:
+            schedule_id = change["documentKey"]["_id"]
+            if "updateDescription" in change:
+                updated_fields = change["updateDescription"]["updatedFields"]
+                next_fire_time = updated_fields["next_fire_time"]
+            else:
+                next_fire_time = document.get("next_fire_time")
+
+            if (
+                next_fire_time is None
+                or self._known_fire_times.get(schedule_id) == next_fire_time
+            ):
+                return
 
+            event = ScheduleUpdated(
+                schedule_id=schedule_id, next_fire_time=next_fire_time
+            )
+
+        self._record_event(event)
+        await self._event_broker.publish_local(event)
+
+    def _record_event(self, event: Event) -> None:
+        if isinstance(event, JobAdded):
+            self._known_job_ids[event.job_id] = None
+            if len(self._known_job_ids) > 1000:
+                del self._known_job_ids[next(iter(self._known_job_ids))]
+        elif isinstance(event, (ScheduleAdded, ScheduleUpdated)):
+            self._known_fire_times.pop(event.schedule_id, None)
+            self._known_fire_times[event.schedule_id] = event.next_fire_time
+            if len(self._known_fire_times) > 1000:
+                del self._known_fire_times[next(iter(self._known_fire_times))]
+
+    async def add_task(self, task: Task) -> None:
+        previous = await self._run_in_thread(
+            lambda: self._tasks.find_one_and_update(
+                {"_id": task.id},
+                {
+                    "$set": task.marshal(self.serializer),
+                    "$setOnInsert": {"running_jobs": 0},
+                },
+                upsert=True,
+            )
+        )
         if previous:
             await self._event_broker.publish(TaskUpdated(task_id=task.id))
         else:
             await self._event_broker.publish(TaskAdded(task_id=task.id))
 
     async def remove_task(self, task_id: str) -> None:
-        async for attempt in self._retry():
-            with attempt:
-                if not await to_thread.run_sync(
-                    self._tasks.find_one_and_delete, {"_id": task_id}
-                ):
-                    raise TaskLookupError(task_id)
+        if not await self._run_in_thread(
+            self._tasks.find_one_and_delete, {"_id": task_id}
+        ):
+            raise TaskLookupError(task_id)
 
         await self._event_broker.publish(TaskRemoved(task_id=task_id))
 
     async def get_task(self, task_id: str) -> Task:
-        async for attempt in self._retry():
-            with attempt:
-                document = await to_thread.run_sync(
-                    lambda: self._tasks.find_one(
-                        {"_id": task_id}, projection=self._task_attrs
-                    )
-                )
-
+        document = await self._run_in_thread(
+            lambda: self._tasks.find_one({"_id": task_id}, projection=self._task_attrs)
+        )
         if not document:
             raise TaskLookupError(task_id)
 
@@ -182,34 +373,37 @@ class MongoDBDataStore(BaseExternalDataStore):
         return task
 
     async def get_tasks(self) -> list[Task]:
-        async for attempt in self._retry():
-            with attempt:
-                tasks: list[Task] = []
-                for document in self._tasks.find(
+        documents = await self._run_in_thread(
+            lambda: list(
+                self._tasks.find(
                     projection=self._task_attrs, sort=[("_id", pymongo.ASCENDING)]
-                ):
-                    document["id"] = document.pop("_id")
-                    tasks.append(Task.unmarshal(self.serializer, document))
+                )
+            )
+        )
+        tasks: list[Task] = []
+        for document in documents:
+            document["id"] = document.pop("_id")
+            tasks.append(Task.unmarshal(self.serializer, document))
 
         return tasks
 
     async def get_schedules(self, ids: set[str] | None = None) -> list[Schedule]:
         filters = {"_id": {"$in": list(ids)}} if ids is not None else {}
-        async for attempt in self._retry():
-            with attempt:
-                schedules: list[Schedule] = []
-                cursor = self._schedules.find(filters).sort("_id")
-                for document in cursor:
-                    document["id"] = document.pop("_id")
-                    try:
-                        schedule = Schedule.unmarshal(self.serializer, document)
-                    except DeserializationError:
-                        self._logger.warning(
-                            "Failed to deserialize schedule %r", document["_id"]
-                        )
-                        continue
+        documents = await self._run_in_thread(
+            lambda: list(self._schedules.find(filters).sort("_id"))
+        )
+        schedules: list[Schedule] = []
+        for document in documents:
+            document["id"] = document.pop("_id")
+            try:
+                schedule = Schedule.unmarshal(self.serializer, document)
+            except DeserializationError:
+                self._logger.warning(
+                    "Failed to deserialize schedule %r", document["id"]
+                )
+                continue
 
-                    schedules.append(schedule)
+            schedules.append(schedule)
 
         return schedules
 
@@ -220,19 +414,14 @@ class MongoDBDataStore(BaseExternalDataStore):
         document = schedule.marshal(self.serializer)
         document["_id"] = document.pop("id")
         try:
-            async for attempt in self._retry():
-                with attempt:
-                    self._schedules.insert_one(document)
+            await self._run_in_thread(self._schedules.insert_one, document)
         except DuplicateKeyError:
             if conflict_policy is ConflictPolicy.exception:
                 raise ConflictingIdError(schedule.id) from None
             elif conflict_policy is ConflictPolicy.replace:
-                async for attempt in self._retry():
-                    with attempt:
-                        self._schedules.replace_one(
-                            {"_id": schedule.id}, document, True
-                        )
-
+                await self._run_in_thread(
+                    self._schedules.replace_one, {"_id": schedule.id}, document, True
+                )
                 event = ScheduleUpdated(
                     schedule_id=schedule.id, next_fire_time=schedule.next_fire_time
                 )
@@ -243,67 +432,134 @@ class MongoDBDataStore(BaseExternalDataStore):
             )
             await self._event_broker.publish(event)
 
+    async def add_schedules(
+        self, schedules: Iterable[Schedule], conflict_policy: ConflictPolicy
+    ) -> None:
+        def add() -> dict[str, DataStoreEvent]:
+            with self.client.start_session() as session:
+                # Find out which of the schedules already exist
+                cursor = self._schedules.find(
+                    {"_id": {"$in": list({schedule.id for schedule in schedules})}},
+                    projection=["_id"],
+                    session=session,
+                )
+                existing_ids: set[str] = {doc["_id"] for doc in cursor}
+
+                # Sort the schedules into inserts and replacements
+                inserts: dict[str, dict[str, Any]] = {}
+                replacements: dict[str, dict[str, Any]] = {}
+                events: dict[str, DataStoreEvent] = {}
+                for schedule in schedules:
+                    if schedule.id in existing_ids or schedule.id in inserts:
+                        if conflict_policy is ConflictPolicy.exception:
+                            raise ConflictingIdError(schedule.id)
+                        elif conflict_policy is ConflictPolicy.do_nothing:
+                            continue
+
+                    document = schedule.marshal(self.serializer)
+                    document["_id"] = document.pop("id")
+                    if schedule.id in existing_ids:
+                        replacements[schedule.id] = document
+                        events[schedule.id] = ScheduleUpdated(
+                            schedule_id=schedule.id,
+                            next_fire_time=schedule.next_fire_time,
+                        )
+                    else:
+                        inserts[schedule.id] = document
+                        events[schedule.id] = ScheduleAdded(
+                            schedule_id=schedule.id,
+                            next_fire_time=schedule.next_fire_time,
+                        )
+
+                requests: list[InsertOne | ReplaceOne] = [
+                    InsertOne(document) for document in inserts.values()
+                ]
+                requests.extend(
+                    ReplaceOne({"_id": schedule_id}, document)
+                    for schedule_id, document in replacements.items()
+                )
+                if requests:
+                    self._schedules.bulk_write(requests, session=session)
+
+                return events
+
+        schedules = list(schedules)
+        if not schedules:
+            return
+
+        try:
+            events = await self._run_in_thread(add)
+        except BulkWriteError:
+            # A concurrent writer added one of the schedules after we checked, so
+            # fall back to adding them one at a time
+            for schedule in schedules:
+                await self.add_schedule(schedule, conflict_policy)
+
+            return
+
+        for event in events.values():
+            await self._event_broker.publish(event)
+
     async def remove_schedules(self, ids: Iterable[str]) -> None:
-        filters = {"_id": {"$in": list(ids)}} if ids is not None else {}
-        async for attempt in self._retry():
-            with attempt, self.client.start_session() as session:
+        def remove() -> list[str]:
+            with self.client.start_session() as session:
                 cursor = self._schedules.find(
                     filters, projection=["_id"], session=session
                 )
-                ids = [doc["_id"] for doc in cursor]
-                if ids:
+                removed_ids = [doc["_id"] for doc in cursor]
+                if removed_ids:
                     self._schedules.delete_many(filters, session=session)
 
-        for schedule_id in ids:
-            await self._event_broker.publish(ScheduleRemoved(schedule_id=schedule_id))
+                return removed_ids
 
-    async def acquire_schedules(self, scheduler_id: str, limit: int) -> list[Schedule]:
-        async for attempt in self._retry():
-            with attempt, self.client.start_session() as session:
-                schedules: list[Schedule] = []
-                cursor = (
-                    self._schedules.find(
-                        {
-                            "next_fire_time": {"$ne": None},
-                            "$or": [
-                                {"acquired_until": {"$exists": False}},
-                                {"acquired_until": {"$lt": datetime.now(timezone.utc)}},
-                            ],
-                        },
-                        session=session,
-                    )
-                    .sort("next_fire_time")
-                    .limit(limit)
-                )
-                for document in cursor:
-                    document["id"] = document.pop("_id")
-                    schedule = Schedule.unmarshal(self.serializer, document)
-                    schedules.append(schedule)
+        filters = {"_id": {"$in": list(ids)}} if ids is not None else {}
+        for schedule_id in await self._run_in_thread(remove):
+            await self._event_broker.publish(ScheduleRemoved(schedule_id=schedule_id))
 
-                if schedules:
-                    now = datetime.now(timezone.utc)
-                    acquired_until = datetime.fromtimestamp(
-                        now.timestamp() + self.lock_expiration_delay, now.tzinfo
-                    )
-                    filters = {"_id": {"$in": [schedule.id for schedule in schedules]}}
-                    update = {
-                        "$set": {
-                            "acquired_by": scheduler_id,
-                            "acquired_until": acquired_until,
-                        }
-                    }
-                    self._schedules.update_many(filters, update, session=session)
+    def _claim_schedules(
+        self, session: ClientSession, scheduler_id: str, limit: int
+    ) -> list[Schedule]:
+        schedules: list[Schedule] = []
+        now = datetime.now(timezone.utc)
+        cursor = (
+            self._schedules.find(
+                {
+                    "next_fire_time": {"$ne": None, "$lte": now},
+                    "$or": [
+                        {"acquired_until": {"$exists": False}},
+                        {"acquired_until": {"$lt": now}},
+                    ],
+                },
+                session=session,
+            )
+            .sort("next_fire_time")
+            .limit(limit)
+        )
+        for document in cursor:
+            document["id"] = document.pop("_id")
+            schedule = Schedule.unmarshal(self.serializer, document)
+            schedules.append(schedule)
+
+        if schedules:
+            acquired_until = datetime.fromtimestamp(
+                now.timestamp() + self.lock_expiration_delay, now.tzinfo
+            )
+            filters = {"_id": {"$in": [schedule.id for schedule in schedules]}}
+            update = {
+                "$set": {
+                    "acquired_by": scheduler_id,
+                    "acquired_until": acquired_until,
+                }
+            }
+            self._schedules.update_many(filters, update, session=session)
 
         return schedules
 
-    async def release_schedules(
+    def _build_schedule_release_requests(
         self, scheduler_id: str, schedules: list[Schedule]
-    ) -> None:
-        updated_schedules: list[tuple[str, datetime]] = []
-        finished_schedule_ids: list[str] = []
-
-        # Update schedules that have a next fire time
-        requests = []
+    ) -> tuple[list[UpdateOne | DeleteOne], list[DataStoreEvent]]:
+        requests: list[UpdateOne | DeleteOne] = []
+        events: list[DataStoreEvent] = []
         for schedule in schedules:
             filters = {"_id": schedule.id, "acquired_by": scheduler_id}
             if schedule.next_fire_time is not None:
@@ -315,7 +571,7 @@ class MongoDBDataStore(BaseExternalDataStore):
                         schedule.id,
                     )
                     requests.append(DeleteOne(filters))
-                    finished_schedule_ids.append(schedule.id)
+                    events.append(ScheduleRemoved(schedule_id=schedule.id))
                     continue
 
                 update = {
@@ -329,87 +585,181 @@ class MongoDBDataStore(BaseExternalDataStore):
                     },
                 }
                 requests.append(UpdateOne(filters, update))
-                updated_schedules.append((schedule.id, schedule.next_fire_time))
+                events.append(
+                    ScheduleUpdated(
+                        schedule_id=schedule.id,
+                        next_fire_time=schedule.next_fire_time,
+                    )
+                )
             else:
                 requests.append(DeleteOne(filters))
-                finished_schedule_ids.append(schedule.id)
+                events.append(ScheduleRemoved(schedule_id=schedule.id))
 
-            if requests:
-                async for attempt in self._retry():
-                    with attempt, self.client.start_session() as session:
-                        self._schedules.bulk_write(
-                            requests, ordered=False, session=session
-                        )
+        return requests, events
 
-        for schedule_id, next_fire_time in updated_schedules:
-            event = ScheduleUpdated(
-                schedule_id=schedule_id, next_fire_time=next_fire_time
+    async def acquire_schedules(self, scheduler_id: str, limit: int) -> list[Schedule]:
+        def acquire() -> list[Schedule]:
+            with self.client.start_session() as session:
+                return self._claim_schedules(session, scheduler_id, limit)
+
+        return await self._run_in_thread(acquire)
+
+    async def release_schedules(
+        self, scheduler_id: str, schedules: list[Schedule]
+    ) -> None:
+        requests, events = self._build_schedule_release_requests(
+            scheduler_id, schedules
+        )
+        if requests:
+            await self._run_in_thread(
+                lambda: self._schedules.bulk_write(requests, ordered=False)
             )
+
+        for event in events:
             await self._event_broker.publish(event)
 
-        for schedule_id in finished_schedule_ids:
-            await self._event_broker.publish(ScheduleRemoved(schedule_id=schedule_id))
+    async def process_due_schedules(
+        self,
+        scheduler_id: str,
+        limit: int,
+        callback: Callable[[list[Schedule]], list[Job]],
+    ) -> list[Schedule]:
+        def run(
+            session: ClientSession,
+        ) -> tuple[list[Schedule], list[Job], list[DataStoreEvent]]:
+            schedules = self._claim_schedules(session, scheduler_id, limit)
+            if not schedules:
+                return [], [], []
+
+            jobs = callback(schedules)
+            if jobs:
+                documents = []
+                for job in jobs:
+                    document = job.marshal(self.serializer)
+                    document["_id"] = document.pop("id")
+                    documents.append(document)
+
+                self._jobs.insert_many(documents, session=session)
+
+            requests, events = self._build_schedule_release_requests(
+                scheduler_id, schedules
+            )
+            if requests:
+                self._schedules.bulk_write(requests, ordered=False, session=session)
+
+            return schedules, jobs, events
+
+        def process() -> tuple[list[Schedule], list[Job], list[DataStoreEvent]]:
+            with self.client.start_session() as session:
+                # Use a transaction if the deployment supports them (replica sets and
+                # sharded clusters). If it conflicts with the transaction of another
+                # scheduler (TransientTransactionError), it's run again from the start,
+                # and an uncertain commit (UnknownTransactionCommitResult) is retried.
+                if self._supports_transactions:
+                    return session.with_transaction(run)
+                else:
+                    return run(session)
+
+        schedules, jobs, events = await self._run_in_thread(process)
+        for job in jobs:
+            event = JobAdded(
+                job_id=job.id,
+                task_id=job.task_id,
+                schedule_id=job.schedule_id,
+                tags=job.tags,
+            )
+            await self._event_broker.publish(event)
 
-    async def get_next_schedule_run_time(self) -> datetime | None:
-        async for attempt in self._retry():
-            with attempt:
-                document = self._schedules.find_one(
-                    {"next_run_time": {"$ne": None}},
-                    projection=["next_run_time"],
-                    sort=[("next_run_time", ASCENDING)],
-                )
+        for event in events:
+            await self._event_broker.publish(event)
+
+        return schedules
 
+    async def get_next_schedule_run_time(self) -> datetime | None:
+        document = await self._run_in_thread(
+            lambda: self._schedules.find_one(
+                {"next_fire_time": {"$ne": None}},
+                projection=["next_fire_time"],
+                sort=[("next_fire_time", ASCENDING)],
+            )
+        )
         if document:
-            return document["next_run_time"]
+            return document["next_fire_time"]
         else:
             return None
 
     async def add_job(self, job: Job) -> None:
-        document = job.marshal(self.serializer)
-        document["_id"] = document.pop("id")
-        async for attempt in self._retry():
-            with attempt:
-                self._jobs.insert_one(document)
-
-        event = JobAdded(
-            job_id=job.id,
-            task_id=job.task_id,
-            schedule_id=job.schedule_id,
-            tags=job.tags,
-        )
-        await self._event_broker.publish(event)
+        await self.add_jobs([job])
+
+    async def add_jobs(self, jobs: Iterable[Job]) -> None:
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        documents = []
+        for job in jobs:
+            document = job.marshal(self.serializer)
+            document["_id"] = document.pop("id")
+            documents.append(document)
+
+        await self._run_in_thread(self._jobs.insert_many, documents)
+        for job in jobs:
+            event = JobAdded(
+                job_id=job.id,
+                task_id=job.task_id,
+                schedule_id=job.schedule_id,
+                tags=job.tags,
+            )
+            await self._event_broker.publish(event)
 
     async def get_jobs(self, ids: Iterable[UUID] | None = None) -> list[Job]:
         filters = {"_id": {"$in": list(ids)}} if ids is not None else {}
-        async for attempt in self._retry():
-            with attempt:
-                jobs: list[Job] = []
-                cursor = self._jobs.find(filters).sort("_id")
-                for document in cursor:
-                    document["id"] = document.pop("_id")
-                    try:
-                        job = Job.unmarshal(self.serializer, document)
-                    except DeserializationError:
-                        self._logger.warning(
-                            "Failed to deserialize job %r", document["id"]
-                        )
-                        continue
+        documents = await self._run_in_thread(
+            lambda: list(self._jobs.find(filters).sort("_id"))
+        )
+        jobs: list[Job] = []
+        for document in documents:
+            document["id"] = document.pop("_id")
+            try:
+                job = Job.unmarshal(self.serializer, document)
+            except DeserializationError:
+                self._logger.warning("Failed to deserialize job %r", document["id"])
+                continue
 
-                    jobs.append(job)
+            jobs.append(job)
 
         return jobs
 
-    async def acquire_jobs(self, worker_id: str, limit: int | None = None) -> list[Job]:
-        async for attempt in self._retry():
-            with attempt, self.client.start_session() as session:
+    async def acquire_jobs(
+        self,
+        worker_id: str,
+        limit: int | None = None,
+        *,
+        executor_limits: Mapping[str, int] | None = None,
+    ) -> list[Job]:
+        def acquire() -> list[Job]:
+            with self.client.start_session() as session:
+                filters: dict[str, Any] = {
+                    "$or": [
+                        {"acquired_until": {"$exists": False}},
+                        {"acquired_until": {"$lt": datetime.now(timezone.utc)}},
+                    ]
+                }
+                if executor_limits is not None:
+                    # Only look for jobs of tasks that use the given job executors
+                    executors = [
+                        name for name, slots in executor_limits.items() if slots
+                    ]
+                    eligible_tasks = self._tasks.find(
+                        {"executor": {"$in": executors}},
+                        projection=["_id"],
+                        session=session,
+                    )
+                    filters["task_id"] = {"$in": [doc["_id"] for doc in eligible_tasks]}
+
                 cursor = self._jobs.find(
-                    {
-                        "$or": [
-                            {"acquired_until": {"$exists": False}},
-                            {"acquired_until": {"$lt": datetime.now(timezone.utc)}},
-                        ]
-                    },
-                    sort=[("created_at", ASCENDING)],
+                    filters,
+                    sort=[("priority", ASCENDING), ("created_at", ASCENDING)],
                     limit=limit,
                     session=session,
                 )
@@ -417,15 +767,23 @@ class MongoDBDataStore(BaseExternalDataStore):
 
                 # Retrieve the limits
                 task_ids: set[str] = {document["task_id"] for document in documents}
-                task_limits = self._tasks.find(
-                    {"_id": {"$in": list(task_ids)}, "max_running_jobs": {"$ne": None}},
-                    projection=["max_running_jobs", "running_jobs"],
+                task_documents = self._tasks.find(
+                    {"_id": {"$in": list(task_ids)}},
+                    projection=["executor", "max_running_jobs", "running_jobs"],
                     session=session,
                 )
-                job_slots_left = {
-                    doc["_id"]: doc["max_running_jobs"] - doc["running_jobs"]
-                    for doc in task_limits
-                }
+                task_executors: dict[str, str] = {}
+                job_slots_left: dict[str, int] = {}
+                for doc in task_documents:
+                    task_executors[doc["_id"]] = doc["executor"]
+                    if doc["max_running_jobs"] is not None:
+                        job_slots_left[doc["_id"]] = (
+                            doc["max_running_jobs"] - doc["running_jobs"]
+                        )
+
+                executor_slots_left = (
+                    dict(executor_limits) if executor_limits is not None else None
+                )
 
                 # Filter out jobs that don't have free slots
                 acquired_jobs: list[Job] = []
@@ -438,7 +796,16 @@ class MongoDBDataStore(BaseExternalDataStore):
                     slots_left = job_slots_left.get(job.task_id)
                     if slots_left == 0:
                         continue
-                    elif slots_left is not None:
+
+                    # ...or if the job executor has no room for it
+                    if executor_slots_left is not None:
+                        executor = task_executors.get(job.task_id)
+                        if not executor_slots_left.get(executor):
+                            continue
+
+                        executor_slots_left[executor] -= 1
+
+                    if slots_left is not None:
                         job_slots_left[job.task_id] -= 1
 
                     acquired_jobs.append(job)
@@ -459,12 +826,17 @@ class MongoDBDataStore(BaseExternalDataStore):
                     self._jobs.update_many(filters, update, session=session)
 
                     # Increment the running job counters on each task
-                    for task_id, increment in increments.items():
-                        self._tasks.find_one_and_update(
-                            {"_id": task_id},
-                            {"$inc": {"running_jobs": increment}},
-                            session=session,
+                    requests = [
+                        UpdateOne(
+                            {"_id": task_id}, {"$inc": {"running_jobs": increment}}
                         )
+                        for task_id, increment in increments.items()
+                    ]
+                    self._tasks.bulk_write(requests, ordered=False, session=session)
+
+                return acquired_jobs
+
+        acquired_jobs = await self._run_in_thread(acquire)
 
         # Publish the appropriate events
         for job in acquired_jobs:
@@ -477,29 +849,59 @@ class MongoDBDataStore(BaseExternalDataStore):
     async def release_job(
         self, worker_id: str, task_id: str, result: JobResult
     ) -> None:
-        async for attempt in self._retry():
-            with attempt, self.client.start_session() as session:
-                # Record the job result
-                if result.expires_at > result.finished_at:
-                    document = result.marshal(self.serializer)
-                    document["_id"] = document.pop("job_id")
-                    self._jobs_results.insert_one(document, session=session)
-
-                # Decrement the running jobs counter
-                self._tasks.find_one_and_update(
-                    {"_id": task_id}, {"$inc": {"running_jobs": -1}}, session=session
-                )
+        await self.release_jobs(worker_id, [(task_id, result)])
 
-                # Delete the job
-                self._jobs.delete_one({"_id": result.job_id}, session=session)
+    async def release_jobs(
+        self, worker_id: str, results: Sequence[tuple[str, JobResult]]
+    ) -> None:
+        def release() -> None:
+            with self.client.start_session() as session:
+                # Record the job results
+                if documents:
+                    self._jobs_results.insert_many(documents, session=session)
+
+                # Decrement the running jobs counters
+                requests = [
+                    UpdateOne({"_id": task_id}, {"$inc": {"running_jobs": -decrement}})
+                    for task_id, decrement in decrements.items()
+                ]
+                self._tasks.bulk_write(requests, ordered=False, session=session)
+
+                # Delete the jobs
+                self._jobs.delete_many({"_id": {"$in": job_ids}}, session=session)
+
+        if not results:
+            return
+
+        documents: list[dict[str, Any]] = []
+        decrements: dict[str, int] = defaultdict(lambda: 0)
+        job_ids: list[UUID] = []
+        for task_id, result in results:
+            if result.expires_at > result.finished_at:
+                document = result.marshal(self.serializer)
+                document["_id"] = document.pop("job_id")
+                documents.append(document)
+
+            decrements[task_id] += 1
+            job_ids.append(result.job_id)
+
+        await self._run_in_thread(release)
 
     async def get_job_result(self, job_id: UUID) -> JobResult | None:
-        async for attempt in self._retry():
-            with attempt:
-                document = self._jobs_results.find_one_and_delete({"_id": job_id})
-
+        document = await self._run_in_thread(
+            self._jobs_results.find_one_and_delete, {"_id": job_id}
+        )
         if document:
             document["job_id"] = document.pop("_id")
             return JobResult.unmarshal(self.serializer, document)
         else:
             return None
+
+    async def cleanup(self) -> None:
+        # The TTL index takes care of this eventually, but the server only checks for
+        # expired documents once per minute
+        await self._run_in_thread(
+            lambda: self._jobs_results.delete_many(
+                {"expires_at": {"$lt": datetime.now(timezone.utc)}}
+            )
+        )
@@ -0,0 +1,964 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Mapping, Sequence
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+import attrs
+from redis.asyncio import Redis
+from redis.asyncio.connection import ConnectionPool
+from redis.exceptions import ConnectionError, TimeoutError
+
+from .._enums import ConflictPolicy
+from .._events import (
+    DataStoreEvent,
+    JobAcquired,
+    JobAdded,
+    JobDeserializationFailed,
+    ScheduleAdded,
+    ScheduleDeserializationFailed,
+    ScheduleRemoved,
+    ScheduleUpdated,
+    TaskAdded,
+    TaskRemoved,
+    TaskUpdated,
+)
+from .._exceptions import (
+    ConflictingIdError,
+    DeserializationError,
+    SerializationError,
+    TaskLookupError,
+)
+from .._structures import Job, JobResult, Schedule, Task
+from ..abc import EventBroker
+from .base import BaseExternalDataStore
+
+# Marshalled fields that need to be converted back from their string representations
+_datetime_fields = frozenset(
+    [
+        "next_fire_time",
+        "last_fire_time",
+        "acquired_until",
+        "scheduled_fire_time",
+        "start_deadline",
+        "created_at",
+        "started_at",
+        "finished_at",
+        "expires_at",
+    ]
+)
+_timedelta_fields = frozenset(
+    [
+        "misfire_grace_time",
+        "max_jitter",
+        "batch_window",
+        "jitter",
+        "result_expiration_time",
+    ]
+)
+_int_fields = frozenset(["max_running_jobs", "batch_size", "priority"])
+_bytes_fields = frozenset(
+    ["trigger", "args", "kwargs", "state", "exception", "return_value"]
+)
+
+# Claims up to the given number of due schedules, after returning schedules with
+# expired claims to the queue.
+# ARGV: key prefix, current time (timestamp), scheduler ID, claim expiration time
+# (timestamp), claim expiration time (ISO 8601), limit
+_acquire_schedules_script = """
+local prefix = ARGV[1]
+local queue_key = prefix .. ':schedule_queue'
+local locks_key = prefix .. ':schedule_locks'
+for _, id in ipairs(redis.call('zrangebyscore', locks_key, '-inf', '(' .. ARGV[2])) do
+    redis.call('zrem', locks_key, id)
+    local fire_time = redis.call('hget', prefix .. ':schedules', id)
+    if fire_time and fire_time ~= '' then
+        redis.call('zadd', queue_key, fire_time, id)
+    end
+end
+
+local schedules = {}
+local ids = redis.call('zrangebyscore', queue_key, '-inf', ARGV[2], 'LIMIT', 0, ARGV[6])
+for _, id in ipairs(ids) do
+    local key = prefix .. ':schedule:' .. id
+    redis.call('zrem', queue_key, id)
+    redis.call('zadd', locks_key, ARGV[4], id)
+    redis.call('hset', key, 'acquired_by', ARGV[3], 'acquired_until', ARGV[5])
+    schedules[#schedules + 1] = redis.call('hgetall', key)
+end
+return schedules
+"""
+
+# Updates or removes schedules claimed by the given scheduler, and releases the claims.
+# ARGV: key prefix, scheduler ID, followed by (schedule ID, serialized trigger, next
+# fire time (ISO 8601), next fire time (timestamp)) for each schedule, where an empty
+# next fire time means that the schedule is to be removed
+_release_schedules_script = """
+local prefix = ARGV[1]
+for i = 3, #ARGV, 4 do
+    local id = ARGV[i]
+    local key = prefix .. ':schedule:' .. id
+    if redis.call('hget', key, 'acquired_by') == ARGV[2] then
+        redis.call('zrem', prefix .. ':schedule_locks', id)
+        if ARGV[i + 2] == '' then
+            redis.call('del', key)
+            redis.call('hdel', prefix .. ':schedules', id)
+        else
+            redis.call('hset', key, 'trigger', ARGV[i + 1], 'next_fire_time',
+                       ARGV[i + 2], 'acquired_by', '', 'acquired_until', '')
+            redis.call('hset', prefix .. ':schedules', id, ARGV[i + 3])
+            redis.call('zadd', prefix .. ':schedule_queue', ARGV[i + 3], id)
+        end
+    end
+end
+"""
+
+# Adds or replaces schedules. If any of the schedules already exists and the conflict
+# policy is "exception", nothing is added and the ID of that schedule is returned.
+# Otherwise returns a list of flags telling which of the schedules already existed.
+# ARGV: key prefix, conflict policy, followed by (schedule ID, next fire time
+# (timestamp, or empty), number of field arguments, field names and values) for each
+# schedule
+_add_schedules_script = """
+local prefix = ARGV[1]
+local policy = ARGV[2]
+local schedules = {}
+local existing = {}
+local i = 3
+while i <= #ARGV do
+    local id = ARGV[i]
+    local exists = existing[id]
+            or redis.call('hexists', prefix .. ':schedules', id) == 1
+    if exists and policy == 'exception' then
+        return id
+    end
+
+    schedules[#schedules + 1] = {id, ARGV[i + 1], i + 3, i + 2 + ARGV[i + 2], exists}
+    existing[id] = true
+    i = i + 3 + ARGV[i + 2]
+end
+
+local results = {}
+for _, schedule in ipairs(schedules) do
+    local id = schedule[1]
+    local fire_time = schedule[2]
+    if not schedule[5] or policy == 'replace' then
+        local key = prefix .. ':schedule:' .. id
+        redis.call('del', key)
+        redis.call('hset', key, unpack(ARGV, schedule[3], schedule[4]))
+        redis.call('hset', prefix .. ':schedules', id, fire_time)
+        redis.call('zrem', prefix .. ':schedule_locks', id)
+        if fire_time == '' then
+            redis.call('zrem', prefix .. ':schedule_queue', id)
+        else
+            redis.call('zadd', prefix .. ':schedule_queue', fire_time, id)
+        end
+    end
+    results[#results + 1] = schedule[5] and 1 or 0
+end
+return results
+"""
+
+# Returns the next fire time of the first schedule in the queue, and the claim
+# expiration time of the first claimed schedule.
+# ARGV: key prefix
+_next_schedule_run_time_script = """
+local prefix = ARGV[1]
+local result = {false, false}
+local id = redis.call('zrange', prefix .. ':schedule_queue', 0, 0)[1]
+if id then
+    result[1] = redis.call('hget', prefix .. ':schedule:' .. id, 'next_fire_time')
+end
+id = redis.call('zrange', prefix .. ':schedule_locks', 0, 0)[1]
+if id then
+    result[2] = redis.call('hget', prefix .. ':schedule:' .. id, 'acquired_until')
+end
+return result
+"""
+
+# Functions shared by the job scripts. Each task has its own job queue, ordered by
+# priority and then by the sequence number prefixed to the job ID. The first entry of
+# the queue of each task that is able to run more jobs is kept in the "job_heads" sorted
+# set, in the same order, so jobs can be acquired without scanning past the jobs of
+# tasks that are already running as many jobs as they can.
+_job_queue_functions = """
+local function update_task_head(prefix, task_id)
+    local heads_key = prefix .. ':job_heads'
+    local head_entries_key = prefix .. ':job_head_entries'
+    local old_entry = redis.call('hget', head_entries_key, task_id)
+    local entry = false
+    local priority = nil
+    local task = redis.call('hmget', prefix .. ':task:' .. task_id,
+                            'max_running_jobs', 'running_jobs', 'executor')
+    if task[3] and (task[1] == '' or tonumber(task[2]) < tonumber(task[1])) then
+        local head = redis.call('zrange', prefix .. ':job_queue:' .. task_id, 0, 0,
+                                'WITHSCORES')
+        entry = head[1] or false
+        priority = head[2]
+    end
+
+    if entry == old_entry then
+        return
+    end
+
+    if old_entry then
+        redis.call('zrem', heads_key, old_entry)
+    end
+    if entry then
+        redis.call('zadd', heads_key, priority, entry)
+        redis.call('hset', head_entries_key, task_id, entry)
+    else
+        redis.call('hdel', head_entries_key, task_id)
+    end
+end
+
+local function requeue_job(prefix, id)
+    local key = prefix .. ':job:' .. id
+    local job = redis.call('hmget', key, 'sequence', 'priority', 'task_id')
+    if job[1] then
+        redis.call('hset', key, 'acquired_by', '', 'acquired_until', '')
+        redis.call('zadd', prefix .. ':job_queue:' .. job[3], job[2],
+                   string.format('%016d:%s', job[1], id))
+        local task_key = prefix .. ':task:' .. job[3]
+        if redis.call('exists', task_key) == 1 then
+            redis.call('hincrby', task_key, 'running_jobs', -1)
+        end
+        update_task_head(prefix, job[3])
+    end
+end
+"""
+
+# Refreshes the queue head of a task after the task has been added or replaced.
+# ARGV: key prefix, task ID
+_update_task_head_script = (
+    _job_queue_functions
+    + """
+update_task_head(ARGV[1], ARGV[2])
+"""
+)
+
+# Adds jobs to the queues of their tasks.
+# ARGV: key prefix, followed by (job ID, task ID, priority, number of field arguments,
+# field names and values) for each job
+_add_jobs_script = (
+    _job_queue_functions
+    + """
+local prefix = ARGV[1]
+local i = 2
+while i <= #ARGV do
+    local id = ARGV[i]
+    local task_id = ARGV[i + 1]
+    local sequence = redis.call('incr', prefix .. ':job_sequence')
+    redis.call('hset', prefix .. ':job:' .. id, 'sequence', sequence,
+               unpack(ARGV, i + 4, i + 3 + ARGV[i + 3]))
+    redis.call('zadd', prefix .. ':jobs', sequence, id)
+    redis.call('zadd', prefix .. ':job_queue:' .. task_id, ARGV[i + 2],
+               string.format('%016d:%s', sequence, id))
+    update_task_head(prefix, task_id)
+    i = i + 4 + ARGV[i + 3]
+end
+"""
+)
+
+# Claims up to the given number of jobs, respecting the running job limits of their
+# tasks and the free slots of the job executors, after returning jobs with expired
+# claims to the queue. Only the queue heads of the tasks are looked at, so the cost
+# depends on the number of jobs claimed, rather than on the number of jobs waiting.
+# ARGV: key prefix, current time (timestamp), worker ID, claim expiration time
+# (timestamp), claim expiration time (ISO 8601), limit (0 for no limit), "1" if the
+# job executors are limited, followed by (job executor, free slots) pairs
+_acquire_jobs_script = (
+    _job_queue_functions
+    + """
+local prefix = ARGV[1]
+local heads_key = prefix .. ':job_heads'
+local locks_key = prefix .. ':job_locks'
+for _, id in ipairs(redis.call('zrangebyscore', locks_key, '-inf', '(' .. ARGV[2])) do
+    redis.call('zrem', locks_key, id)
+    requeue_job(prefix, id)
+end
+
+local limit = tonumber(ARGV[6])
+local executor_slots = nil
+local total_executor_slots = 0
+if ARGV[7] == '1' then
+    executor_slots = {}
+    for i = 8, #ARGV, 2 do
+        executor_slots[ARGV[i]] = tonumber(ARGV[i + 1])
+        total_executor_slots = total_executor_slots + tonumber(ARGV[i + 1])
+    end
+end
+
+-- Heads before the offset belong to tasks whose job executors have no free slots left
+local jobs = {}
+local offset = 0
+while (limit == 0 or #jobs < limit)
+        and (executor_slots == nil or total_executor_slots > 0) do
+    local entry = redis.call('zrange', heads_key, offset, offset)[1]
+    if not entry then
+        break
+    end
+
+    local id = string.sub(entry, 18)
+    local key = prefix .. ':job:' .. id
+    local task_id = redis.call('hget', key, 'task_id')
+    local task_key = prefix .. ':task:' .. task_id
+    local executor = redis.call('hget', task_key, 'executor')
+    if not executor then
+        -- The task has been removed, so drop its queue head
+        redis.call('zrem', heads_key, entry)
+        update_task_head(prefix, task_id)
+    elseif executor_slots == nil or (executor_slots[executor] or 0) > 0 then
+        -- Claiming the job replaces the task's queue head with an entry that sorts
+        -- after this one, so the next head to look at is at the same offset
+        redis.call('zrem', prefix .. ':job_queue:' .. task_id, entry)
+        redis.call('hset', key, 'acquired_by', ARGV[3], 'acquired_until', ARGV[5])
+        redis.call('zadd', locks_key, ARGV[4], id)
+        redis.call('hincrby', task_key, 'running_jobs', 1)
+        update_task_head(prefix, task_id)
+        if executor_slots then
+            executor_slots[executor] = executor_slots[executor] - 1
+            total_executor_slots = total_executor_slots - 1
+        end
+
+        jobs[#jobs + 1] = redis.call('hgetall', key)
+    else
+        offset = offset + 1
+    end
+end
+return jobs
+"""
+)
+
+# Returns the jobs claimed by the given worker to their queues.
+# ARGV: key prefix, worker ID, followed by job IDs
+_unclaim_jobs_script = (
+    _job_queue_functions
+    + """
+local prefix = ARGV[1]
+for i = 3, #ARGV do
+    local id = ARGV[i]
+    if redis.call('hget', prefix .. ':job:' .. id, 'acquired_by') == ARGV[2]
+            and redis.call('zrem', prefix .. ':job_locks', id) == 1 then
+        requeue_job(prefix, id)
+    end
+end
+"""
+)
+
+# Deletes finished jobs and decrements the running job counters of their tasks.
+# ARGV: key prefix, followed by (task ID, job ID) pairs
+_release_jobs_script = (
+    _job_queue_functions
+    + """
+local prefix = ARGV[1]
+for i = 2, #ARGV, 2 do
+    local task_id = ARGV[i]
+    local id = ARGV[i + 1]
+    local key = prefix .. ':job:' .. id
+    local task_key = prefix .. ':task:' .. task_id
+
+    -- The counter was already decremented if the claim on the job has expired
+    if redis.call('zrem', prefix .. ':job_locks', id) == 1
+            and redis.call('exists', task_key) == 1 then
+        redis.call('hincrby', task_key, 'running_jobs', -1)
+    end
+
+    local sequence = redis.call('hget', key, 'sequence')
+    if sequence then
+        redis.call('zrem', prefix .. ':job_queue:' .. task_id,
+                   string.format('%016d:%s', sequence, id))
+    end
+    redis.call('zrem', prefix .. ':jobs', id)
+    redis.call('del', key)
+    update_task_head(prefix, task_id)
+end
+"""
+)
+
+# Deletes the job results that have expired by the given time.
+# ARGV: key prefix, current time (timestamp)
+_cleanup_script = """
+local prefix = ARGV[1]
+local expirations_key = prefix .. ':job_result_expirations'
+local max_score = '(' .. ARGV[2]
+for _, id in ipairs(redis.call('zrangebyscore', expirations_key, '-inf', max_score)) do
+    redis.call('del', prefix .. ':job_result:' .. id)
+end
+redis.call('zremrangebyscore', expirations_key, '-inf', max_score)
+"""
+
+
+def _encode(marshalled: dict[str, Any]) -> dict[str, bytes | str | int | float]:
+    """Convert the values of a marshalled object into types that Redis accepts."""
+    encoded: dict[str, bytes | str | int | float] = {}
+    for key, value in marshalled.items():
+        if value is None:
+            value = ""
+        elif isinstance(value, Enum):
+            value = value.name
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, timedelta):
+            value = value.total_seconds()
+        elif isinstance(value, UUID):
+            value = str(value)
+        elif isinstance(value, list):
+            value = json.dumps(value)
+
+        encoded[key] = value
+
+    return encoded
+
+
+def _decode(cls: type, data: Mapping[bytes, bytes]) -> dict[str, Any]:
+    """Convert the contents of a Redis hash back into a marshalled object."""
+    marshalled: dict[str, Any] = {}
+    field_names = {field.name for field in attrs.fields(cls)}
+    for raw_key, raw_value in data.items():
+        key = raw_key.decode("utf-8")
+        if key not in field_names:
+            continue
+
+        value: Any
+        if not raw_value:
+            value = None
+        elif key in _bytes_fields:
+            value = raw_value
+        elif key in _datetime_fields:
+            value = datetime.fromisoformat(raw_value.decode("ascii"))
+        elif key in _timedelta_fields:
+            value = timedelta(seconds=float(raw_value))
+        elif key in _int_fields:
+            value = int(raw_value)
+        elif key == "tags":
+            value = json.loads(raw_value)
+        else:
+            value = raw_value.decode("utf-8")
+
+        marshalled[key] = value
+
+    return marshalled
+
+
+@attrs.define(eq=False)
+class RedisDataStore(BaseExternalDataStore):
+    """
+    Uses a Redis server to store data.
+
+    Tasks, schedules, jobs and job results are stored as hashes. Due schedules and
+    pending jobs are tracked in sorted sets, and claimed atomically by Lua scripts
+    which also enforce the running job limits of the tasks.
+
+    As the scripts derive the keys they access from the key prefix, Redis Cluster is not
+    supported. The client must not be configured to decode responses.
+
+    Operations are retried (in accordance to ``retry_settings``) when an operation
+    raises :exc:`redis.ConnectionError` or :exc:`redis.TimeoutError`.
+
+    Requires the redis_ library to be installed.
+
+    .. _redis: https://pypi.org/project/redis/
+
+    :param client: an asynchronous Redis client
+    :param prefix: prefix for the names of all the keys used by this data store
+    """
+
+    client: Redis = attrs.field(validator=attrs.validators.instance_of(Redis))
+    prefix: str = attrs.field(kw_only=True, default="apscheduler")
+
+    @property
+    def _temporary_failure_exceptions(self) -> tuple[type[Exception], ...]:
+        return ConnectionError, TimeoutError
+
+    def __attrs_post_init__(self) -> None:
+        super().__attrs_post_init__()
+        self._acquire_schedules = self.client.register_script(_acquire_schedules_script)
+        self._release_schedules = self.client.register_script(_release_schedules_script)
+        self._add_schedules = self.client.register_script(_add_schedules_script)
+        self._next_schedule_run_time = self.client.register_script(
+            _next_schedule_run_time_script
+        )
+        self._update_task_head = self.client.register_script(_update_task_head_script)
+        self._add_jobs = self.client.register_script(_add_jobs_script)
+        self._acquire_jobs = self.client.register_script(_acquire_jobs_script)
+        self._unclaim_jobs = self.client.register_script(_unclaim_jobs_script)
+        self._release_jobs = self.client.register_script(_release_jobs_script)
+        self._cleanup = self.client.register_script(_cleanup_script)
+
+    @classmethod
+    def from_url(cls, url: str, **options) -> RedisDataStore:
+        """
+        Create a new data store from a URL.
+
+        :param url: a Redis URL (```redis://...```)
+        :param options: keyword arguments to pass to the initializer of this class
+        :return: the newly created data store
+
+        """
+        pool = ConnectionPool.from_url(url)
+        client = Redis(connection_pool=pool)
+        return cls(client, **options)
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    def _unmarshal_schedule(self, data: Mapping[bytes, bytes]) -> Schedule:
+        try:
+            return Schedule.unmarshal(self.serializer, _decode(Schedule, data))
+        except DeserializationError:
+            raise
+        except Exception as exc:
+            # The serializers let through whatever their underlying libraries raise
+            raise DeserializationError(f"Error deserializing schedule: {exc}") from exc
+
+    def _unmarshal_job(self, data: Mapping[bytes, bytes]) -> Job:
+        marshalled = _decode(Job, data)
+        marshalled["id"] = UUID(marshalled["id"])
+        try:
+            return Job.unmarshal(self.serializer, marshalled)
+        except DeserializationError:
+            raise
+        except Exception as exc:
+            raise DeserializationError(f"Error deserializing job: {exc}") from exc
+
+    async def start(
+        self, exit_stack: AsyncExitStack, event_broker: EventBroker
+    ) -> None:
+        await super().start(exit_stack, event_broker)
+        if self.start_from_scratch:
+            async for attempt in self._retry():
+                with attempt:
+                    keys = [
+                        key
+                        async for key in self.client.scan_iter(
+                            match=self._key("*"), count=1000
+                        )
+                    ]
+                    if keys:
+                        await self.client.delete(*keys)
+
+    async def add_task(self, task: Task) -> None:
+        key = self._key("task", task.id)
+        async for attempt in self._retry():
+            with attempt:
+                async with self.client.pipeline() as pipe:
+                    pipe.exists(key)
+                    pipe.hset(key, mapping=_encode(task.marshal(self.serializer)))
+                    pipe.hsetnx(key, "running_jobs", 0)
+                    pipe.sadd(self._key("tasks"), task.id)
+                    await self._update_task_head(
+                        args=[self.prefix, task.id], client=pipe
+                    )
+                    existed, *_ = await pipe.execute()
+
+        if existed:
+            await self._event_broker.publish(TaskUpdated(task_id=task.id))
+        else:
+            await self._event_broker.publish(TaskAdded(task_id=task.id))
+
+    async def remove_task(self, task_id: str) -> None:
+        async for attempt in self._retry():
+            with attempt:
+                async with self.client.pipeline() as pipe:
+                    pipe.srem(self._key("tasks"), task_id)
+                    pipe.delete(self._key("task", task_id))
+                    removed, _ = await pipe.execute()
+
+        if not removed:
+            raise TaskLookupError(task_id)
+
+        await self._event_broker.publish(TaskRemoved(task_id=task_id))
+
+    async def get_task(self, task_id: str) -> Task:
+        async for attempt in self._retry():
+            with attempt:
+                data = await self.client.hgetall(self._key("task", task_id))
+
+        if not data:
+            raise TaskLookupError(task_id)
+
+        return Task.unmarshal(self.serializer, _decode(Task, data))
+
+    async def get_tasks(self) -> list[Task]:
+        async for attempt in self._retry():
+            with attempt:
+                task_ids = await self.client.smembers(self._key("tasks"))
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for task_id in task_ids:
+                        pipe.hgetall(self._key("task", task_id.decode("utf-8")))
+
+                    results = await pipe.execute()
+
+        tasks = [
+            Task.unmarshal(self.serializer, _decode(Task, data))
+            for data in results
+            if data
+        ]
+        return sorted(tasks, key=lambda task: task.id)
+
+    async def get_schedules(self, ids: set[str] | None = None) -> list[Schedule]:
+        async for attempt in self._retry():
+            with attempt:
+                if ids is None:
+                    schedule_ids = [
+                        schedule_id.decode("utf-8")
+                        for schedule_id in await self.client.hkeys(
+                            self._key("schedules")
+                        )
+                    ]
+                else:
+                    schedule_ids = list(ids)
+
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for schedule_id in schedule_ids:
+                        pipe.hgetall(self._key("schedule", schedule_id))
+
+                    results = await pipe.execute()
+
+        schedules: list[Schedule] = []
+        for schedule_id, data in zip(schedule_ids, results):
+            if not data:
+                continue
+
+            try:
+                schedules.append(self._unmarshal_schedule(data))
+            except DeserializationError:
+                self._logger.warning("Failed to deserialize schedule %r", schedule_id)
+
+        return sorted(schedules, key=lambda schedule: schedule.id)
+
+    async def add_schedule(
+        self, schedule: Schedule, conflict_policy: ConflictPolicy
+    ) -> None:
+        await self.add_schedules([schedule], conflict_policy)
+
+    async def add_schedules(
+        self, schedules: Iterable[Schedule], conflict_policy: ConflictPolicy
+    ) -> None:
+        schedules = list(schedules)
+        if not schedules:
+            return
+
+        args: list[Any] = [self.prefix, conflict_policy.name]
+        for schedule in schedules:
+            encoded = _encode(schedule.marshal(self.serializer))
+            args.extend(
+                [
+                    schedule.id,
+                    repr(schedule.next_fire_time.timestamp())
+                    if schedule.next_fire_time
+                    else "",
+                    len(encoded) * 2,
+                ]
+            )
+            for item in encoded.items():
+                args.extend(item)
+
+        async for attempt in self._retry():
+            with attempt:
+                results = await self._add_schedules(args=args)
+
+        if isinstance(results, bytes):
+            raise ConflictingIdError(results.decode("utf-8"))
+
+        event: DataStoreEvent
+        for schedule, existed in zip(schedules, results):
+            if not existed:
+                event = ScheduleAdded(
+                    schedule_id=schedule.id, next_fire_time=schedule.next_fire_time
+                )
+            elif conflict_policy is ConflictPolicy.replace:
+                event = ScheduleUpdated(
+                    schedule_id=schedule.id, next_fire_time=schedule.next_fire_time
+                )
+            else:
+                continue
+
+            await self._event_broker.publish(event)
+
+    async def remove_schedules(self, ids: Iterable[str]) -> None:
+        ids = list(ids)
+        async for attempt in self._retry():
+            with attempt:
+                async with self.client.pipeline() as pipe:
+                    for schedule_id in ids:
+                        pipe.hdel(self._key("schedules"), schedule_id)
+                        pipe.delete(self._key("schedule", schedule_id))
+                        pipe.zrem(self._key("schedule_queue"), schedule_id)
+                        pipe.zrem(self._key("schedule_locks"), schedule_id)
+
+                    results = await pipe.execute()
+
+        for schedule_id, removed in zip(ids, results[::4]):
+            if removed:
+                await self._event_broker.publish(
+                    ScheduleRemoved(schedule_id=schedule_id)
+                )
+
+    async def acquire_schedules(self, scheduler_id: str, limit: int) -> list[Schedule]:
+        now = datetime.now(timezone.utc)
+        acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
+        args = [
+            self.prefix,
+            repr(now.timestamp()),
+            scheduler_id,
+            repr(acquired_until.timestamp()),
+            acquired_until.isoformat(),
+            limit,
+        ]
+        async for attempt in self._retry():
+            with attempt:
+                results = await self._acquire_schedules(args=args)
+
+        # Schedules that fail to deserialize are left claimed until the claim expires,
+        # as releasing them would just make them due again right away
+        schedules: list[Schedule] = []
+        for result in results:
+            data = dict(zip(result[::2], result[1::2]))
+            try:
+                schedules.append(self._unmarshal_schedule(data))
+            except DeserializationError as exc:
+                await self._event_broker.publish(
+                    ScheduleDeserializationFailed(
+                        schedule_id=data[b"id"].decode("utf-8"), exception=exc
+                    )
+                )
+
+        return schedules
+
+    async def release_schedules(
+        self, scheduler_id: str, schedules: list[Schedule]
+    ) -> None:
+        args: list[Any] = [self.prefix, scheduler_id]
+        events: list[DataStoreEvent] = []
+        for schedule in schedules:
+            if schedule.next_fire_time is not None:
+                try:
+                    serialized_trigger = self.serializer.serialize(schedule.trigger)
+                except SerializationError:
+                    self._logger.exception(
+                        "Error serializing schedule %r – removing from data store",
+                        schedule.id,
+                    )
+                    args.extend([schedule.id, "", "", ""])
+                    events.append(ScheduleRemoved(schedule_id=schedule.id))
+                    continue
+
+                args.extend(
+                    [
+                        schedule.id,
+                        serialized_trigger,
+                        schedule.next_fire_time.isoformat(),
+                        repr(schedule.next_fire_time.timestamp()),
+                    ]
+                )
+                events.append(
+                    ScheduleUpdated(
+                        schedule_id=schedule.id,
+                        next_fire_time=schedule.next_fire_time,
+                    )
+                )
+            else:
+                args.extend([schedule.id, "", "", ""])
+                events.append(ScheduleRemoved(schedule_id=schedule.id))
+
+        if schedules:
+            async for attempt in self._retry():
+                with attempt:
+                    await self._release_schedules(args=args)
+
+        for event in events:
+            await self._event_broker.publish(event)
+
+    async def get_next_schedule_run_time(self) -> datetime | None:
+        async for attempt in self._retry():
+            with attempt:
+                results = await self._next_schedule_run_time(args=[self.prefix])
+
+        # Schedules with expired claims can be acquired again, so they need to be
+        # considered too
+        candidates = [
+            datetime.fromisoformat(result.decode("ascii"))
+            for result in results
+            if result
+        ]
+        return min(candidates, default=None)
+
+    async def add_job(self, job: Job) -> None:
+        await self.add_jobs([job])
+
+    async def add_jobs(self, jobs: Iterable[Job]) -> None:
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        args: list[Any] = [self.prefix]
+        for job in jobs:
+            encoded = _encode(job.marshal(self.serializer))
+            args.extend([str(job.id), job.task_id, job.priority, len(encoded) * 2])
+            for item in encoded.items():
+                args.extend(item)
+
+        async for attempt in self._retry():
+            with attempt:
+                await self._add_jobs(args=args)
+
+        for job in jobs:
+            event = JobAdded(
+                job_id=job.id,
+                task_id=job.task_id,
+                schedule_id=job.schedule_id,
+                tags=job.tags,
+            )
+            await self._event_broker.publish(event)
+
+    async def get_jobs(self, ids: Iterable[UUID] | None = None) -> list[Job]:
+        async for attempt in self._retry():
+            with attempt:
+                if ids is None:
+                    job_ids = [
+                        job_id.decode("ascii")
+                        for job_id in await self.client.zrange(self._key("jobs"), 0, -1)
+                    ]
+                else:
+                    job_ids = [str(job_id) for job_id in ids]
+
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for job_id in job_ids:
+                        pipe.hgetall(self._key("job", job_id))
+
+                    results = await pipe.execute()
+
+        jobs: list[tuple[int, int, Job]] = []
+        for job_id, data in zip(job_ids, results):
+            if not data:
+                continue
+
+            try:
+                job = self._unmarshal_job(data)
+            except DeserializationError:
+                self._logger.warning("Failed to deserialize job %r", job_id)
+                continue
+
+            jobs.append((job.priority, int(data[b"sequence"]), job))
+
+        jobs.sort(key=lambda item: item[:2])
+        return [job for _, _, job in jobs]
+
+    async def acquire_jobs(
+        self,
+        worker_id: str,
+        limit: int | None = None,
+        *,
+        executor_limits: Mapping[str, int] | None = None,
+    ) -> list[Job]:
+        now = datetime.now(timezone.utc)
+        acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
+        args: list[Any] = [
+            self.prefix,
+            repr(now.timestamp()),
+            worker_id,
+            repr(acquired_until.timestamp()),
+            acquired_until.isoformat(),
+            limit or 0,
+        ]
+        if executor_limits is not None:
+            args.append("1")
+            for item in executor_limits.items():
+                args.extend(item)
+        else:
+            args.append("")
+
+        async for attempt in self._retry():
+            with attempt:
+                results = await self._acquire_jobs(args=args)
+
+        jobs: list[Job] = []
+        events: list[DataStoreEvent] = []
+        failed_job_ids: list[str] = []
+        for result in results:
+            data = dict(zip(result[::2], result[1::2]))
+            try:
+                jobs.append(self._unmarshal_job(data))
+            except DeserializationError as exc:
+                job_id = data[b"id"].decode("ascii")
+                failed_job_ids.append(job_id)
+                events.append(JobDeserializationFailed(job_id=job_id, exception=exc))
+
+        # Return the jobs that could not be deserialized to the queue
+        if failed_job_ids:
+            async for attempt in self._retry():
+                with attempt:
+                    await self._unclaim_jobs(
+                        args=[self.prefix, worker_id, *failed_job_ids]
+                    )
+
+        # Publish the appropriate events
+        events.extend(JobAcquired(job_id=job.id, worker_id=worker_id) for job in jobs)
+        for event in events:
+            await self._event_broker.publish(event)
+
+        return jobs
+
+    async def release_job(
+        self, worker_id: str, task_id: str, result: JobResult
+    ) -> None:
+        await self.release_jobs(worker_id, [(task_id, result)])
+
+    async def release_jobs(
+        self, worker_id: str, results: Sequence[tuple[str, JobResult]]
+    ) -> None:
+        if not results:
+            return
+
+        args: list[Any] = [self.prefix]
+        for task_id, result in results:
+            args.extend([task_id, str(result.job_id)])
+
+        async for attempt in self._retry():
+            with attempt:
+                async with self.client.pipeline() as pipe:
+                    # Record the job results (the server expires them on its own too,
+                    # in case the data store is not running)
+                    for task_id, result in results:
+                        if result.expires_at > result.finished_at:
+                            job_id = str(result.job_id)
+                            key = self._key("job_result", job_id)
+                            marshalled = result.marshal(self.serializer)
+                            pipe.hset(key, mapping=_encode(marshalled))
+                            pipe.pexpireat(key, result.expires_at)
+                            pipe.zadd(
+                                self._key("job_result_expirations"),
+                                {job_id: result.expires_at.timestamp()},
+                            )
+
+                    await self._release_jobs(args=args, client=pipe)
+                    await pipe.execute()
+
+    async def get_job_result(self, job_id: UUID) -> JobResult | None:
+        key = self._key("job_result", str(job_id))
+        async for attempt in self._retry():
+            with attempt:
+                async with self.client.pipeline() as pipe:
+                    pipe.hgetall(key)
+                    pipe.delete(key)
+                    pipe.zrem(self._key("job_result_expirations"), str(job_id))
+                    data, *_ = await pipe.execute()
+
+        if not data:
+            return None
+
+        marshalled = _decode(JobResult, data)
+        marshalled["job_id"] = UUID(marshalled["job_id"])
+        return JobResult.unmarshal(self.serializer, marshalled)
+
+    async def cleanup(self) -> None:
+        now = datetime.now(timezone.utc)
+        async for attempt in self._retry():
+            with attempt:
+                await self._cleanup(args=[self.prefix, repr(now.timestamp())])
@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import random
+from bisect import bisect
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from datetime import datetime
+from functools import partial
+from hashlib import blake2b
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Sequence, TypeVar
+from uuid import UUID
+
+import attrs
+from anyio import create_task_group
+
+from .._enums import ConflictPolicy
+from .._exceptions import ConflictingIdError
+from .._structures import Job, JobResult, Schedule, Task
+from .._utils import accepts_keyword
+from ..abc import DataStore, EventBroker
+from .base import BaseDataStore
+
+T = TypeVar("T")
+
+#: Number of points each shard gets on the hash ring
+virtual_nodes = 100
+
+
+def _hash(key: str) -> int:
+    # The built-in hash() of strings differs from one process to another, so it cannot
+    # be used here
+    digest = blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _job_sort_key(job: Job) -> tuple[int, datetime]:
+    return job.priority, job.created_at
+
+
+async def _gather(calls: Iterable[Awaitable[T]]) -> list[T]:
+    """Run the given awaitables concurrently and return their results in order."""
+    calls = list(calls)
+    if len(calls) == 1:
+        return [await calls[0]]
+
+    results: list[Any] = [None] * len(calls)
+
+    async def run(index: int, call: Awaitable[T]) -> None:
+        results[index] = await call
+
+    async with create_task_group() as tg:
+        for index, call in enumerate(calls):
+            tg.start_soon(run, index, call)
+
+    return results
+
+
+@attrs.define(eq=False)
+class ShardedDataStore(BaseDataStore):
+    """
+    Distributes scheduler data over several data stores ("shards").
+
+    Each task, along with all of its jobs and their results, is stored on the shard
+    chosen by a consistent hash of the task ID. Keeping the jobs of a task together
+    means that the shard can enforce the task's ``max_running_jobs`` limit on its own.
+    Schedules are spread over the shards by a consistent hash of the schedule ID. If a
+    schedule produces jobs that belong on another shard, those jobs are added there
+    right after the schedule has been processed, rather than in the same transaction.
+
+    Queries that cannot be routed by a task or schedule ID (like :meth:`get_jobs` and
+    :meth:`get_job_result`) are sent to all the shards concurrently. Schedulers and
+    workers acquire schedules and jobs by taking turns with the shard they try first, so
+    concurrent acquisitions are spread over all the shards. As a consequence, job
+    priorities are only honored within each shard.
+
+    As the hash ring is derived from the positions of the shards in the sequence, all
+    the schedulers and workers must be given the shards in the same order. Appending a
+    shard only moves the items that now belong on the new shard, but those items are
+    not migrated automatically.
+
+    The shards are started along with this data store, using the same event broker. Each
+    shard purges its own expired job results, so the cleanup interval of this data store
+    defaults to ``None``.
+
+    :param shards: the underlying data stores
+    """
+
+    shards: Sequence[DataStore] = attrs.field(
+        converter=tuple,
+        validator=attrs.validators.deep_iterable(
+            attrs.validators.instance_of(DataStore)
+        ),
+    )
+    cleanup_interval: float | None = attrs.field(kw_only=True, default=None)
+    _ring_points: list[int] = attrs.field(init=False, factory=list)
+    _ring_indexes: list[int] = attrs.field(init=False, factory=list)
+    _next_shard: int = attrs.field(init=False, default=0)
+    _task_executors: dict[str, str] = attrs.field(init=False, factory=dict)
+    _executor_limit_shards: list[bool] = attrs.field(init=False, factory=list)
+
+    def __attrs_post_init__(self) -> None:
+        super().__attrs_post_init__()
+        if not self.shards:
+            raise ValueError("at least one shard is required")
+
+        ring = sorted(
+            (_hash(f"{index}:{replica}"), index)
+            for index in range(len(self.shards))
+            for replica in range(virtual_nodes)
+        )
+        self._ring_points = [point for point, _ in ring]
+        self._ring_indexes = [index for _, index in ring]
+
+        # Make workers in different processes start their rounds from different shards
+        self._next_shard = random.randrange(len(self.shards))
+
+        # Shards written against the older interface don't take executor limits
+        self._executor_limit_shards = [
+            accepts_keyword(shard.acquire_jobs, "executor_limits")
+            for shard in self.shards
+        ]
+
+    def _get_shard_index(self, key: str) -> int:
+        """Return the index of the shard that the given task or schedule ID maps to."""
+        position = bisect(self._ring_points, _hash(key)) % len(self._ring_points)
+        return self._ring_indexes[position]
+
+    def _get_shard(self, key: str) -> DataStore:
+        return self.shards[self._get_shard_index(key)]
+
+    def _group_by_shard(
+        self, items: Iterable[T], key: Callable[[T], str]
+    ) -> list[tuple[DataStore, list[T]]]:
+        groups: dict[int, list[T]] = defaultdict(list)
+        for item in items:
+            groups[self._get_shard_index(key(item))].append(item)
+
+        return [(self.shards[index], group) for index, group in groups.items()]
+
+    def _take_turns(self) -> Sequence[int]:
+        """
+        Return the indexes of all the shards, starting with a different one on every
+        call.
+
+        """
+        start = self._next_shard
+        self._next_shard = (start + 1) % len(self.shards)
+        return list(range(start, len(self.shards))) + list(range(start))
+
+    async def _get_task_executor(self, shard: DataStore, task_id: str) -> str:
+        try:
+            return self._task_executors[task_id]
+        except KeyError:
+            task = await shard.get_task(task_id)
+            self._task_executors[task_id] = task.executor
+            return task.executor
+
+    def _route_jobs(
+        self,
+        callback: Callable[[list[Schedule]], list[Job]],
+        shard: DataStore,
+        foreign_jobs: list[Job],
+        schedules: list[Schedule],
+    ) -> list[Job]:
+        """
+        Call the given callback, and return the jobs that belong on the given shard.
+
+        The rest of the jobs are collected in ``foreign_jobs``.
+
+        """
+        local_jobs: list[Job] = []
+        for job in callback(schedules):
+            if self._get_shard(job.task_id) is shard:
+                local_jobs.append(job)
+            else:
+                foreign_jobs.append(job)
+
+        return local_jobs
+
+    async def start(
+        self, exit_stack: AsyncExitStack, event_broker: EventBroker
+    ) -> None:
+        await super().start(exit_stack, event_broker)
+        for shard in self.shards:
+            await shard.start(exit_stack, event_broker)
+
+    async def add_task(self, task: Task) -> None:
+        await self._get_shard(task.id).add_task(task)
+        self._task_executors[task.id] = task.executor
+
+    async def remove_task(self, task_id: str) -> None:
+        self._task_executors.pop(task_id, None)
+        await self._get_shard(task_id).remove_task(task_id)
+
+    async def get_task(self, task_id: str) -> Task:
+        return await self._get_shard(task_id).get_task(task_id)
+
+    async def get_tasks(self) -> list[Task]:
+        results = await _gather(shard.get_tasks() for shard in self.shards)
+        return sorted(
+            (task for tasks in results for task in tasks), key=lambda task: task.id
+        )
+
+    async def get_schedules(self, ids: set[str] | None = None) -> list[Schedule]:
+        if ids is None:
+            calls = [shard.get_schedules() for shard in self.shards]
+        else:
+            groups = self._group_by_shard(ids, lambda schedule_id: schedule_id)
+            calls = [shard.get_schedules(set(shard_ids)) for shard, shard_ids in groups]
+
+        results = await _gather(calls)
+        return sorted(
+            (schedule for schedules in results for schedule in schedules),
+            key=lambda schedule: schedule.id,
+        )
+
+    async def add_schedule(
+        self, schedule: Schedule, conflict_policy: ConflictPolicy
+    ) -> None:
+        await self._get_shard(schedule.id).add_schedule(schedule, conflict_policy)
+
+    async def add_schedules(
+        self, schedules: Iterable[Schedule], conflict_policy: ConflictPolicy
+    ) -> None:
+        schedules = list(schedules)
+        if conflict_policy is ConflictPolicy.exception:
+            # Check all the shards first, so that none of the schedules are added if any
+            # of their IDs is already taken
+            existing = await self.get_schedules({schedule.id for schedule in schedules})
+            if existing:
+                raise ConflictingIdError(existing[0].id)
+
+        groups = self._group_by_shard(schedules, lambda schedule: schedule.id)
+        await _gather(
+            shard.add_schedules(shard_schedules, conflict_policy)
+            for shard, shard_schedules in groups
+        )
+
+    async def remove_schedules(self, ids: Iterable[str]) -> None:
+        groups = self._group_by_shard(ids, lambda schedule_id: schedule_id)
+        await _gather(shard.remove_schedules(shard_ids) for shard, shard_ids in groups)
+
+    async def acquire_schedules(self, scheduler_id: str, limit: int) -> list[Schedule]:
+        schedules: list[Schedule] = []
+        for index in self._take_turns():
+            shard = self.shards[index]
+            if len(schedules) >= limit:
+                break
+
+            schedules += await shard.acquire_schedules(
+                scheduler_id, limit - len(schedules)
+            )
+
+        return schedules
+
+    async def release_schedules(
+        self, scheduler_id: str, schedules: list[Schedule]
+    ) -> None:
+        groups = self._group_by_shard(schedules, lambda schedule: schedule.id)
+        await _gather(
+            shard.release_schedules(scheduler_id, shard_schedules)
+            for shard, shard_schedules in groups
+        )
+
+    async def process_due_schedules(
+        self,
+        scheduler_id: str,
+        limit: int,
+        callback: Callable[[list[Schedule]], list[Job]],
+    ) -> list[Schedule]:
+        schedules: list[Schedule] = []
+        for index in self._take_turns():
+            shard = self.shards[index]
+            if len(schedules) >= limit:
+                break
+
+            # Let the shard add the jobs that belong on it in the same transaction
+            foreign_jobs: list[Job] = []
+            route_jobs = partial(self._route_jobs, callback, shard, foreign_jobs)
+            schedules += await shard.process_due_schedules(
+                scheduler_id, limit - len(schedules), route_jobs
+            )
+            if foreign_jobs:
+                await self.add_jobs(foreign_jobs)
+
+        return schedules
+
+    async def get_next_schedule_run_time(self) -> datetime | None:
+        results = await _gather(
+            shard.get_next_schedule_run_time() for shard in self.shards
+        )
+        return min((result for result in results if result is not None), default=None)
+
+    async def add_job(self, job: Job) -> None:
+        await self._get_shard(job.task_id).add_job(job)
+
+    async def add_jobs(self, jobs: Iterable[Job]) -> None:
+        groups = self._group_by_shard(jobs, lambda job: job.task_id)
+        await _gather(shard.add_jobs(shard_jobs) for shard, shard_jobs in groups)
+
+    async def get_jobs(self, ids: Iterable[UUID] | None = None) -> list[Job]:
+        if ids is not None:
+            ids = frozenset(ids)
+
+        results = await _gather(shard.get_jobs(ids) for shard in self.shards)
+        return sorted((job for jobs in results for job in jobs), key=_job_sort_key)
+
+    async def acquire_jobs(
+        self,
+        worker_id: str,
+        limit: int | None = None,
+        *,
+        executor_limits: Mapping[str, int] | None = None,
+    ) -> list[Job]:
+        executor_slots_left = (
+            dict(executor_limits) if executor_limits is not None else None
+        )
+        jobs: list[Job] = []
+        for index in self._take_turns():
+            shard = self.shards[index]
+            if limit is not None and len(jobs) >= limit:
+                break
+            elif executor_slots_left is not None and not any(
+                slots > 0 for slots in executor_slots_left.values()
+            ):
+                break
+
+            shard_limit = limit - len(jobs) if limit is not None else None
+            if executor_slots_left is not None and self._executor_limit_shards[index]:
+                shard_jobs = await shard.acquire_jobs(
+                    worker_id, shard_limit, executor_limits=executor_slots_left
+                )
+            else:
+                shard_jobs = await shard.acquire_jobs(worker_id, shard_limit)
+
+            # Don't let the next shards exceed the job executors' limits
+            if executor_slots_left is not None:
+                for job in shard_jobs:
+                    executor = await self._get_task_executor(shard, job.task_id)
+                    if executor in executor_slots_left:
+                        executor_slots_left[executor] -= 1
+
+            jobs += shard_jobs
+
+        jobs.sort(key=_job_sort_key)
+        return jobs
+
+    async def release_job(
+        self, worker_id: str, task_id: str, result: JobResult
+    ) -> None:
+        await self._get_shard(task_id).release_job(worker_id, task_id, result)
+
+    async def release_jobs(
+        self, worker_id: str, results: Sequence[tuple[str, JobResult]]
+    ) -> None:
+        groups = self._group_by_shard(results, lambda item: item[0])
+        await _gather(
+            shard.release_jobs(worker_id, shard_results)
+            for shard, shard_results in groups
+        )
+
+    async def get_job_result(self, job_id: UUID) -> JobResult | None:
+        # The result was stored on the shard of the job's task, which is not known here
+        results = await _gather(shard.get_job_result(job_id) for shard in self.shards)
+        return next((result for result in results if result is not None), None)
+
+    async def cleanup(self) -> None:
+        await _gather(shard.cleanup() for shard in self.shards)
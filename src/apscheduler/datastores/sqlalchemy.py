@@ -1,23 +1,25 @@
 from __future__ import annotations
 
+import random
 import sys
 from collections import defaultdict
-from collections.abc import AsyncGenerator, Sequence
-from contextlib import AsyncExitStack, asynccontextmanager
+from collections.abc import Mapping, Sequence
+from contextlib import AsyncExitStack
 from datetime import datetime, timedelta, timezone
-from typing import Any, Iterable
-from uuid import UUID
+from typing import Any, Callable, Iterable, TypeVar
+from uuid import UUID, uuid4
 
 import anyio
 import attrs
 import sniffio
 import tenacity
-from anyio import to_thread
+from anyio import move_on_after, to_thread
 from sqlalchemy import (
     JSON,
     BigInteger,
     Column,
     Enum,
+    Index,
     Integer,
     LargeBinary,
     MetaData,
@@ -26,20 +28,24 @@ from sqlalchemy import (
     Unicode,
     and_,
     bindparam,
+    func,
+    inspect,
     or_,
     select,
+    text,
 )
-from sqlalchemy.engine import URL, Dialect, Result
+from sqlalchemy.engine import URL, Dialect, Result, Row
 from sqlalchemy.exc import CompileError, IntegrityError, InterfaceError
-from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.future import Connection, Engine
-from sqlalchemy.sql import ClauseElement, Executable
-from sqlalchemy.sql.ddl import DropTable
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.ddl import CreateColumn, DropTable
 from sqlalchemy.sql.elements import BindParameter, literal
 
 from .._enums import CoalescePolicy, ConflictPolicy, JobOutcome
 from .._events import (
     DataStoreEvent,
+    Event,
     JobAcquired,
     JobAdded,
     JobDeserializationFailed,
@@ -54,6 +60,7 @@ from .._events import (
 from .._exceptions import ConflictingIdError, SerializationError, TaskLookupError
 from .._structures import Job, JobResult, Schedule, Task
 from ..abc import EventBroker
+from ..eventbrokers.local import LocalEventBroker
 from ..marshalling import callable_to_ref
 from .base import BaseExternalDataStore
 
@@ -62,6 +69,14 @@ if sys.version_info >= (3, 11):
 else:
     from typing_extensions import Self
 
+T = TypeVar("T")
+
+#: maximum number of expired job results to delete in a single transaction
+CLEANUP_BATCH_SIZE = 1000
+
+#: version of the database schema created by this data store
+SCHEMA_VERSION = 2
+
 
 class EmulatedUUID(TypeDecorator):
     impl = Unicode(32)
@@ -96,13 +111,27 @@ class EmulatedInterval(TypeDecorator):
         return timedelta(seconds=value) if value is not None else None
 
 
+class EmulatedMicrosecondInterval(TypeDecorator):
+    """Stores time intervals as whole microseconds, to keep sub-second precision."""
+
+    impl = BigInteger()
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect: Dialect) -> Any:
+        return value // timedelta(microseconds=1) if value is not None else None
+
+    def process_result_value(self, value: Any, dialect: Dialect):
+        return timedelta(microseconds=value) if value is not None else None
+
+
 @attrs.define(eq=False)
 class SQLAlchemyDataStore(BaseExternalDataStore):
     """
     Uses a relational database to store data.
 
     When started, this data store creates the appropriate tables on the given database
-    if they're not already present.
+    if they're not already present. Tables created by earlier versions of APScheduler
+    are upgraded by adding the missing columns and indexes.
 
     Operations are retried (in accordance to ``retry_settings``) when an operation
     raises :exc:`sqlalchemy.OperationalError`.
@@ -110,18 +139,43 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
     This store has been tested to work with PostgreSQL (asyncpg driver) and MySQL
     (asyncmy driver).
 
+    A synchronous engine (like one using the ``sqlite`` or ``psycopg2`` dialect) can be
+    used too, in which case each operation is run as a whole in a worker thread.
+
+    If the event broker only delivers events locally (like
+    :class:`~apscheduler.eventbrokers.local.LocalEventBroker` does), this data store
+    watches the database for jobs and schedules added by other processes, and publishes
+    the appropriate events locally to wake up the scheduler. On PostgreSQL, the changes
+    are signalled with ``NOTIFY``, and picked up right away if the asyncpg driver is
+    used. Otherwise, the database is polled at randomized intervals of up to
+    ``max_poll_time`` seconds.
+
     :param engine: an asynchronous SQLAlchemy engine
     :param schema: a database schema name to use, if not the default
+    :param max_poll_time: maximum time (in seconds) between polls for changes made by
+        other processes (``None`` to disable polling)
+    :param max_idle_time: maximum time (in seconds) to let the connection listening to
+        notifications sit idle before checking that it's still alive
+    :param notify_channel: name of the ``NOTIFY`` channel to use on PostgreSQL
     """
 
     engine: Engine | AsyncEngine
     schema: str | None = attrs.field(default=None)
     max_poll_time: float | None = attrs.field(default=1)
     max_idle_time: float = attrs.field(default=60)
+    notify_channel: str = attrs.field(default="apscheduler")
 
     _is_async: bool = attrs.field(init=False)
+    _instance_id: str = attrs.field(init=False, factory=lambda: uuid4().hex)
+    _notification_received: anyio.Event = attrs.field(init=False)
+    _known_job_ids: dict[UUID, None] = attrs.field(init=False, factory=dict)
+    _known_fire_times: dict[str, datetime | None] = attrs.field(
+        init=False, factory=dict
+    )
 
     def __attrs_post_init__(self) -> None:
+        super().__attrs_post_init__()
+
         # Generate the table definitions
         prefix = f"{self.schema}." if self.schema else ""
         self._metadata = self.get_table_definitions()
@@ -141,6 +195,126 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
         else:
             self._supports_update_returning = True
 
+        self._build_statements()
+
+    def _build_statements(self) -> None:
+        """
+        Build the statements used by the most frequently called operations.
+
+        Reusing the same statement objects spares SQLAlchemy from constructing them,
+        and generating their cache keys, on every call.
+
+        """
+        p_now: BindParameter = bindparam("p_now")
+
+        # Used by _claim_schedules()
+        schedules_cte = (
+            select(self.t_schedules.c.id)
+            .where(
+                and_(
+                    self.t_schedules.c.next_fire_time.isnot(None),
+                    self.t_schedules.c.next_fire_time <= p_now,
+                    or_(
+                        self.t_schedules.c.acquired_until.is_(None),
+                        self.t_schedules.c.acquired_until < p_now,
+                    ),
+                )
+            )
+            .order_by(self.t_schedules.c.next_fire_time)
+            .limit(bindparam("p_limit"))
+            .with_for_update(skip_locked=True)
+            .cte()
+        )
+        self._claim_schedules_update = (
+            self.t_schedules.update()
+            .where(self.t_schedules.c.id.in_(select([schedules_cte.c.id])))
+            .values(
+                acquired_by=bindparam("p_scheduler_id"),
+                acquired_until=bindparam("p_acquired_until"),
+            )
+        )
+        if self._supports_update_returning:
+            self._claim_schedules_update = self._claim_schedules_update.returning(
+                *self.t_schedules.columns
+            )
+        else:
+            self._claimed_schedules_query = self.t_schedules.select().where(
+                self.t_schedules.c.acquired_by == bindparam("p_scheduler_id")
+            )
+
+        # Used by _release_schedules()
+        self._release_schedules_update = (
+            self.t_schedules.update()
+            .where(
+                and_(
+                    self.t_schedules.c.id == bindparam("p_id"),
+                    self.t_schedules.c.acquired_by == bindparam("p_scheduler_id"),
+                )
+            )
+            .values(
+                trigger=bindparam("p_trigger"),
+                next_fire_time=bindparam("p_next_fire_time"),
+                acquired_by=None,
+                acquired_until=None,
+            )
+        )
+        self._delete_schedules = self.t_schedules.delete().where(
+            self.t_schedules.c.id.in_(bindparam("p_ids", expanding=True))
+        )
+
+        # Used by acquire_jobs(): one query for each combination of the "limit" and
+        # "executor_limits" arguments being given or not
+        query = (
+            self.t_jobs.select()
+            .join(self.t_tasks, self.t_tasks.c.id == self.t_jobs.c.task_id)
+            .where(
+                or_(
+                    self.t_jobs.c.acquired_until.is_(None),
+                    self.t_jobs.c.acquired_until < p_now,
+                )
+            )
+            .order_by(self.t_jobs.c.priority, self.t_jobs.c.created_at)
+            .with_for_update(skip_locked=True)
+        )
+        limited_query = query.limit(bindparam("p_limit"))
+        executor_filter = self.t_tasks.c.executor.in_(
+            bindparam("p_executors", expanding=True)
+        )
+        self._acquire_jobs_queries = {
+            (False, False): query,
+            (True, False): limited_query,
+            (False, True): query.where(executor_filter),
+            (True, True): limited_query.where(executor_filter),
+        }
+        self._task_slots_query = select(
+            [
+                self.t_tasks.c.id,
+                self.t_tasks.c.executor,
+                self.t_tasks.c.max_running_jobs - self.t_tasks.c.running_jobs,
+            ]
+        ).where(self.t_tasks.c.id.in_(bindparam("p_task_ids", expanding=True)))
+        self._acquire_jobs_update = (
+            self.t_jobs.update()
+            .values(
+                acquired_by=bindparam("p_worker_id"),
+                acquired_until=bindparam("p_acquired_until"),
+            )
+            .where(self.t_jobs.c.id.in_(bindparam("p_job_ids", expanding=True)))
+        )
+
+        # Used by acquire_jobs(), release_job() and release_jobs() to adjust the
+        # running job counters on tasks
+        self._running_jobs_update = (
+            self.t_tasks.update()
+            .values(running_jobs=self.t_tasks.c.running_jobs + bindparam("p_delta"))
+            .where(self.t_tasks.c.id == bindparam("p_id"))
+        )
+
+        # Used by release_job() and release_jobs()
+        self._delete_jobs = self.t_jobs.delete().where(
+            self.t_jobs.c.id.in_(bindparam("p_job_ids", expanding=True))
+        )
+
     @classmethod
     def from_url(cls: type[Self], url: str | URL, **options) -> Self:
         """
@@ -156,7 +330,7 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
         return cls(engine, **options)
 
     def _retry(self) -> tenacity.AsyncRetrying:
-        def after_attempt(self, retry_state: tenacity.RetryCallState) -> None:
+        def after_attempt(retry_state: tenacity.RetryCallState) -> None:
             self._logger.warning(
                 "Temporary data store error (attempt %d): %s",
                 retry_state.attempt_number,
@@ -173,38 +347,31 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             reraise=True,
         )
 
-    @asynccontextmanager
-    async def _begin_transaction(self) -> AsyncGenerator[Connection | AsyncConnection]:
-        if isinstance(self.engine, AsyncEngine):
-            async with self.engine.begin() as conn:
-                yield conn
-        else:
-            cm = self.engine.begin()
-            conn = await to_thread.run_sync(cm.__enter__)
-            try:
-                yield conn
-            except BaseException as exc:
-                await to_thread.run_sync(cm.__exit__, type(exc), exc, exc.__traceback__)
-                raise
-            else:
-                await to_thread.run_sync(cm.__exit__, None, None, None)
+    async def _run_transaction(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Call the given function within a transaction, retrying on temporary failures.
 
-    async def _create_metadata(self, conn: Connection | AsyncConnection) -> None:
-        if isinstance(conn, AsyncConnection):
-            await conn.run_sync(self._metadata.create_all)
-        else:
-            await to_thread.run_sync(self._metadata.create_all, conn)
+        The function is passed a (synchronous) connection, followed by the given
+        positional arguments. With an asynchronous engine, it is run via
+        :meth:`~sqlalchemy.ext.asyncio.AsyncConnection.run_sync`. With a synchronous
+        engine, the whole transaction is run in a single call to a worker thread.
 
-    async def _execute(
-        self,
-        conn: Connection | AsyncConnection,
-        statement: ClauseElement | Executable,
-        parameters: Sequence | None = None,
-    ):
-        if isinstance(conn, AsyncConnection):
-            return await conn.execute(statement, parameters)
-        else:
-            return await to_thread.run_sync(conn.execute, statement, parameters)
+        :return: the return value of the function
+
+        """
+        async for attempt in self._retry():
+            with attempt:
+                if isinstance(self.engine, AsyncEngine):
+                    async with self.engine.begin() as conn:
+                        return await conn.run_sync(func, *args)
+                else:
+                    return await to_thread.run_sync(
+                        self._run_transaction_sync, func, *args
+                    )
+
+    def _run_transaction_sync(self, func: Callable[..., T], *args: Any) -> T:
+        with self.engine.begin() as conn:
+            return func(conn, *args)
 
     @property
     def _temporary_failure_exceptions(self) -> tuple[type[Exception], ...]:
@@ -221,11 +388,13 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             timestamp_type = postgresql.TIMESTAMP(timezone=True)
             job_id_type = postgresql.UUID(as_uuid=True)
             interval_type = postgresql.INTERVAL(precision=6)
+            precise_interval_type = interval_type
             tags_type = postgresql.ARRAY(Unicode)
         else:
             timestamp_type = EmulatedTimestampTZ
             job_id_type = EmulatedUUID
             interval_type = EmulatedInterval
+            precise_interval_type = EmulatedMicrosecondInterval
             tags_type = JSON
 
         metadata = MetaData(schema=self.schema)
@@ -239,6 +408,8 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             Column("state", LargeBinary),
             Column("max_running_jobs", Integer),
             Column("misfire_grace_time", interval_type),
+            Column("batch_size", Integer),
+            Column("batch_window", precise_interval_type),
             Column("running_jobs", Integer, nullable=False, server_default=literal(0)),
         )
         Table(
@@ -253,6 +424,7 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             Column("misfire_grace_time", interval_type),
             Column("max_jitter", interval_type),
             Column("tags", tags_type, nullable=False),
+            Column("priority", Integer, nullable=False, server_default=literal(0)),
             Column("next_fire_time", timestamp_type, index=True),
             Column("last_fire_time", timestamp_type),
             Column("acquired_by", Unicode(500)),
@@ -271,10 +443,12 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             Column("start_deadline", timestamp_type),
             Column("result_expiration_time", interval_type),
             Column("tags", tags_type, nullable=False),
+            Column("priority", Integer, nullable=False, server_default=literal(0)),
             Column("created_at", timestamp_type, nullable=False),
             Column("started_at", timestamp_type),
             Column("acquired_by", Unicode(500)),
             Column("acquired_until", timestamp_type),
+            Index("ix_jobs_priority_created_at", "priority", "created_at"),
         )
         Table(
             "job_results",
@@ -299,49 +473,242 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             )
 
         # Verify that the schema is in place
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    if self.start_from_scratch:
-                        for table in self._metadata.sorted_tables:
-                            await self._execute(conn, DropTable(table, if_exists=True))
-
-                    await self._create_metadata(conn)
-                    query = select(self.t_metadata.c.schema_version)
-                    result = await self._execute(conn, query)
-                    version = result.scalar()
-                    if version is None:
-                        await self._execute(
-                            conn, self.t_metadata.insert(values={"schema_version": 1})
-                        )
-                    elif version > 1:
-                        raise RuntimeError(
-                            f"Unexpected schema version ({version}); "
-                            f"only version 1 is supported by this version of "
-                            f"APScheduler"
+        def initialize(conn: Connection) -> None:
+            if self.start_from_scratch:
+                for table in self._metadata.sorted_tables:
+                    conn.execute(DropTable(table, if_exists=True))
+
+            self._metadata.create_all(conn)
+            query = select(self.t_metadata.c.schema_version)
+            version = conn.execute(query).scalar()
+            if version is None:
+                conn.execute(
+                    self.t_metadata.insert(values={"schema_version": SCHEMA_VERSION})
+                )
+            elif version < SCHEMA_VERSION:
+                self._upgrade_schema(conn, version)
+            elif version > SCHEMA_VERSION:
+                raise RuntimeError(
+                    f"Unexpected schema version ({version}); "
+                    f"only versions up to {SCHEMA_VERSION} are supported by this "
+                    f"version of APScheduler"
+                )
+
+        await self._run_transaction(initialize)
+
+        # Watch for changes made by other processes, unless the event broker already
+        # delivers their events
+        if isinstance(event_broker, LocalEventBroker):
+            exit_stack.enter_context(
+                event_broker.subscribe(
+                    self._record_event, {JobAdded, ScheduleAdded, ScheduleUpdated}
+                )
+            )
+            await self._announce_changes(publish=False)
+            if self._is_async and self.engine.dialect.driver == "asyncpg":
+                self._notification_received = anyio.Event()
+                self._task_group.start_soon(self._listen_notifications)
+            elif self.max_poll_time:
+                self._task_group.start_soon(self._poll_changes)
+
+    def _upgrade_schema(self, conn: Connection, version: int) -> None:
+        """
+        Upgrade the tables from the given schema version to the current one.
+
+        Version 2 only added nullable (or defaulted) columns and indexes, so upgrading
+        from version 1 means adding the ones that are missing.
+
+        """
+        self._logger.info(
+            "Upgrading the database schema from version %d to %d",
+            version,
+            SCHEMA_VERSION,
+        )
+        inspector = inspect(conn)
+        preparer = conn.dialect.identifier_preparer
+        for table in self._metadata.sorted_tables:
+            columns = inspector.get_columns(table.name, schema=table.schema)
+            column_names = {column["name"] for column in columns}
+            for column in table.columns:
+                if column.name not in column_names:
+                    column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {preparer.format_table(table)} "
+                            f"ADD {column_ddl}"
                         )
+                    )
+
+            indexes = inspector.get_indexes(table.name, schema=table.schema)
+            index_names = {index["name"] for index in indexes}
+            for index in table.indexes:
+                if index.name not in index_names:
+                    index.create(conn)
+
+        conn.execute(self.t_metadata.update(values={"schema_version": SCHEMA_VERSION}))
+
+    def _notify(self, conn: Connection) -> None:
+        """Signal the other processes that jobs or schedules have been changed."""
+        if self.engine.dialect.name == "postgresql":
+            conn.execute(select(func.pg_notify(self.notify_channel, self._instance_id)))
+
+    async def _listen_notifications(self) -> None:
+        def notification_received(
+            connection: Any, pid: int, channel: str, payload: str
+        ) -> None:
+            # Ignore the notifications sent by this data store
+            if payload != self._instance_id:
+                self._notification_received.set()
+
+        while True:
+            try:
+                async with self.engine.connect() as conn:
+                    raw_connection = await conn.get_raw_connection()
+                    listener = raw_connection.driver_connection
+                    await listener.add_listener(
+                        self.notify_channel, notification_received
+                    )
+                    try:
+                        # Catch up with the changes made while not listening
+                        await self._announce_changes()
+                        while True:
+                            with move_on_after(self.max_idle_time):
+                                await self._notification_received.wait()
+
+                            if self._notification_received.is_set():
+                                self._notification_received = anyio.Event()
+                                await self._announce_changes(force=True)
+                            else:
+                                await listener.execute("SELECT 1")
+                    finally:
+                        with move_on_after(3, shield=True):
+                            await listener.remove_listener(
+                                self.notify_channel, notification_received
+                            )
+            except Exception as exc:
+                self._logger.error("Error listening to notifications: %s", exc)
+                await anyio.sleep(self.max_poll_time or 1)
+
+    async def _poll_changes(self) -> None:
+        while True:
+            # Randomize the interval to keep several processes from polling in sync
+            await anyio.sleep(self.max_poll_time * random.uniform(0.5, 1))
+            try:
+                await self._announce_changes()
+            except Exception:
+                self._logger.exception("Error polling for changes")
+
+    def _record_event(self, event: Event) -> None:
+        if isinstance(event, JobAdded):
+            self._known_job_ids[event.job_id] = None
+            if len(self._known_job_ids) > 1000:
+                del self._known_job_ids[next(iter(self._known_job_ids))]
+        elif isinstance(event, (ScheduleAdded, ScheduleUpdated)):
+            self._known_fire_times.pop(event.schedule_id, None)
+            self._known_fire_times[event.schedule_id] = event.next_fire_time
+            if len(self._known_fire_times) > 1000:
+                del self._known_fire_times[next(iter(self._known_fire_times))]
+
+    async def _announce_changes(
+        self, *, publish: bool = True, force: bool = False
+    ) -> None:
+        """
+        Publish local events about the next job to be acquired and the next schedule to
+        be processed, unless events about them have been seen already.
+
+        :param publish: ``False`` to only record the current state
+        :param force: ``True`` to publish the events even if they have been seen
+            already
+
+        """
+        now = datetime.now(timezone.utc)
+        job_query = (
+            select(
+                [
+                    self.t_jobs.c.id,
+                    self.t_jobs.c.task_id,
+                    self.t_jobs.c.schedule_id,
+                    self.t_jobs.c.tags,
+                ]
+            )
+            .where(
+                or_(
+                    self.t_jobs.c.acquired_until.is_(None),
+                    self.t_jobs.c.acquired_until < now,
+                )
+            )
+            .order_by(self.t_jobs.c.priority, self.t_jobs.c.created_at)
+            .limit(1)
+        )
+        schedule_query = (
+            select([self.t_schedules.c.id, self.t_schedules.c.next_fire_time])
+            .where(
+                self.t_schedules.c.next_fire_time.isnot(None),
+                or_(
+                    self.t_schedules.c.acquired_until.is_(None),
+                    self.t_schedules.c.acquired_until < now,
+                ),
+            )
+            .order_by(self.t_schedules.c.next_fire_time)
+            .limit(1)
+        )
+
+        def get_next_rows(conn: Connection) -> tuple[Row | None, Row | None]:
+            return (
+                conn.execute(job_query).first(),
+                conn.execute(schedule_query).first(),
+            )
 
-    async def _deserialize_schedules(self, result: Result) -> list[Schedule]:
+        job_row, schedule_row = await self._run_transaction(get_next_rows)
+        events: list[Event] = []
+        if job_row and (force or job_row.id not in self._known_job_ids):
+            events.append(
+                JobAdded(
+                    job_id=job_row.id,
+                    task_id=job_row.task_id,
+                    schedule_id=job_row.schedule_id,
+                    tags=job_row.tags,
+                )
+            )
+
+        if schedule_row and (
+            force
+            or schedule_row.id not in self._known_fire_times
+            or self._known_fire_times[schedule_row.id] != schedule_row.next_fire_time
+        ):
+            events.append(
+                ScheduleUpdated(
+                    schedule_id=schedule_row.id,
+                    next_fire_time=schedule_row.next_fire_time,
+                )
+            )
+
+        for event in events:
+            self._record_event(event)
+            if publish:
+                await self._event_broker.publish_local(event)
+
+    def _deserialize_schedules(
+        self, result: Result, events: list[Event]
+    ) -> list[Schedule]:
         schedules: list[Schedule] = []
         for row in result:
             try:
                 schedules.append(Schedule.unmarshal(self.serializer, row._asdict()))
             except SerializationError as exc:
-                await self._event_broker.publish(
+                events.append(
                     ScheduleDeserializationFailed(schedule_id=row["id"], exception=exc)
                 )
 
         return schedules
 
-    async def _deserialize_jobs(self, result: Result) -> list[Job]:
+    def _deserialize_jobs(self, result: Result, events: list[Event]) -> list[Job]:
         jobs: list[Job] = []
         for row in result:
             try:
                 jobs.append(Job.unmarshal(self.serializer, row._asdict()))
             except SerializationError as exc:
-                await self._event_broker.publish(
-                    JobDeserializationFailed(job_id=row["id"], exception=exc)
-                )
+                events.append(JobDeserializationFailed(job_id=row["id"], exception=exc))
 
         return jobs
 
@@ -352,12 +719,11 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             executor=task.executor,
             max_running_jobs=task.max_running_jobs,
             misfire_grace_time=task.misfire_grace_time,
+            batch_size=task.batch_size,
+            batch_window=task.batch_window,
         )
         try:
-            async for attempt in self._retry():
-                with attempt:
-                    async with self._begin_transaction() as conn:
-                        await self._execute(conn, insert)
+            await self._run_transaction(Connection.execute, insert)
         except IntegrityError:
             update = (
                 self.t_tasks.update()
@@ -366,28 +732,25 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
                     executor=task.executor,
                     max_running_jobs=task.max_running_jobs,
                     misfire_grace_time=task.misfire_grace_time,
+                    batch_size=task.batch_size,
+                    batch_window=task.batch_window,
                 )
                 .where(self.t_tasks.c.id == task.id)
             )
-            async for attempt in self._retry():
-                with attempt:
-                    async with self._begin_transaction() as conn:
-                        await self._execute(conn, update)
-
+            await self._run_transaction(Connection.execute, update)
             await self._event_broker.publish(TaskUpdated(task_id=task.id))
         else:
             await self._event_broker.publish(TaskAdded(task_id=task.id))
 
     async def remove_task(self, task_id: str) -> None:
-        delete = self.t_tasks.delete().where(self.t_tasks.c.id == task_id)
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    result = await self._execute(conn, delete)
-                    if result.rowcount == 0:
-                        raise TaskLookupError(task_id)
-                    else:
-                        await self._event_broker.publish(TaskRemoved(task_id=task_id))
+        def remove(conn: Connection) -> int:
+            delete = self.t_tasks.delete().where(self.t_tasks.c.id == task_id)
+            return conn.execute(delete).rowcount
+
+        if await self._run_transaction(remove) == 0:
+            raise TaskLookupError(task_id)
+
+        await self._event_broker.publish(TaskRemoved(task_id=task_id))
 
     async def get_task(self, task_id: str) -> Task:
         query = select(
@@ -398,14 +761,11 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
                 self.t_tasks.c.max_running_jobs,
                 self.t_tasks.c.state,
                 self.t_tasks.c.misfire_grace_time,
+                self.t_tasks.c.batch_size,
+                self.t_tasks.c.batch_window,
             ]
         ).where(self.t_tasks.c.id == task_id)
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    result = await self._execute(conn, query)
-                    row = result.first()
-
+        row = await self._run_transaction(lambda conn: conn.execute(query).first())
         if row:
             return Task.unmarshal(self.serializer, row._asdict())
         else:
@@ -420,28 +780,25 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
                 self.t_tasks.c.max_running_jobs,
                 self.t_tasks.c.state,
                 self.t_tasks.c.misfire_grace_time,
+                self.t_tasks.c.batch_size,
+                self.t_tasks.c.batch_window,
             ]
         ).order_by(self.t_tasks.c.id)
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    result = await self._execute(conn, query)
-                    tasks = [
-                        Task.unmarshal(self.serializer, row._asdict()) for row in result
-                    ]
-                    return tasks
+        rows = await self._run_transaction(lambda conn: conn.execute(query).all())
+        return [Task.unmarshal(self.serializer, row._asdict()) for row in rows]
 
     async def add_schedule(
         self, schedule: Schedule, conflict_policy: ConflictPolicy
     ) -> None:
+        def execute_and_notify(conn: Connection, statement: Executable) -> None:
+            conn.execute(statement)
+            self._notify(conn)
+
         event: DataStoreEvent
         values = schedule.marshal(self.serializer)
         insert = self.t_schedules.insert().values(**values)
         try:
-            async for attempt in self._retry():
-                with attempt:
-                    async with self._begin_transaction() as conn:
-                        await self._execute(conn, insert)
+            await self._run_transaction(execute_and_notify, insert)
         except IntegrityError:
             if conflict_policy is ConflictPolicy.exception:
                 raise ConflictingIdError(schedule.id) from None
@@ -452,11 +809,7 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
                     .where(self.t_schedules.c.id == schedule.id)
                     .values(**values)
                 )
-                async for attempt in self._retry():
-                    with attempt:
-                        async with self._begin_transaction() as conn:
-                            await self._execute(conn, update)
-
+                await self._run_transaction(execute_and_notify, update)
                 event = ScheduleUpdated(
                     schedule_id=schedule.id, next_fire_time=schedule.next_fire_time
                 )
@@ -467,24 +820,96 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             )
             await self._event_broker.publish(event)
 
-    async def remove_schedules(self, ids: Iterable[str]) -> None:
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    delete = self.t_schedules.delete().where(
-                        self.t_schedules.c.id.in_(ids)
+    async def add_schedules(
+        self, schedules: Iterable[Schedule], conflict_policy: ConflictPolicy
+    ) -> None:
+        def add(conn: Connection) -> dict[str, DataStoreEvent]:
+            # Find out which of the schedules already exist
+            query = select([self.t_schedules.c.id]).where(
+                self.t_schedules.c.id.in_({schedule.id for schedule in schedules})
+            )
+            existing_ids: set[str] = {row[0] for row in conn.execute(query)}
+
+            # Sort the schedules into inserts and updates
+            inserts: dict[str, dict[str, Any]] = {}
+            updates: dict[str, dict[str, Any]] = {}
+            events: dict[str, DataStoreEvent] = {}
+            for schedule in schedules:
+                if schedule.id in existing_ids or schedule.id in inserts:
+                    if conflict_policy is ConflictPolicy.exception:
+                        raise ConflictingIdError(schedule.id)
+                    elif conflict_policy is ConflictPolicy.do_nothing:
+                        continue
+
+                values = schedule.marshal(self.serializer)
+                if schedule.id in existing_ids:
+                    updates[schedule.id] = {
+                        f"p_{key}": value for key, value in values.items()
+                    }
+                    events[schedule.id] = ScheduleUpdated(
+                        schedule_id=schedule.id,
+                        next_fire_time=schedule.next_fire_time,
+                    )
+                else:
+                    inserts[schedule.id] = values
+                    events[schedule.id] = ScheduleAdded(
+                        schedule_id=schedule.id,
+                        next_fire_time=schedule.next_fire_time,
                     )
-                    if self._supports_update_returning:
-                        delete = delete.returning(self.t_schedules.c.id)
-                        removed_ids: Iterable[str] = [
-                            row[0] for row in await self._execute(conn, delete)
-                        ]
-                    else:
-                        # TODO: actually check which rows were deleted?
-                        await self._execute(conn, delete)
-                        removed_ids = ids
-
-        for schedule_id in removed_ids:
+
+            if inserts:
+                conn.execute(self.t_schedules.insert(), list(inserts.values()))
+
+            if updates:
+                p_id: BindParameter = bindparam("p_id")
+                columns = [key[2:] for key in next(iter(updates.values()))]
+                update = (
+                    self.t_schedules.update()
+                    .where(self.t_schedules.c.id == p_id)
+                    .values(
+                        {
+                            column: bindparam(f"p_{column}")
+                            for column in columns
+                            if column != "id"
+                        }
+                    )
+                )
+                conn.execute(update, list(updates.values()))
+
+            if inserts or updates:
+                self._notify(conn)
+
+            return events
+
+        schedules = list(schedules)
+        if not schedules:
+            return
+
+        try:
+            events = await self._run_transaction(add)
+        except IntegrityError:
+            # A concurrent writer added one of the schedules after we checked, so
+            # fall back to adding them one at a time
+            for schedule in schedules:
+                await self.add_schedule(schedule, conflict_policy)
+
+            return
+
+        for event in events.values():
+            await self._event_broker.publish(event)
+
+    async def remove_schedules(self, ids: Iterable[str]) -> None:
+        def remove(conn: Connection) -> Iterable[str]:
+            delete = self.t_schedules.delete().where(self.t_schedules.c.id.in_(ids))
+            if self._supports_update_returning:
+                delete = delete.returning(self.t_schedules.c.id)
+                return [row[0] for row in conn.execute(delete)]
+            else:
+                # TODO: actually check which rows were deleted?
+                conn.execute(delete)
+                return ids
+
+        for schedule_id in await self._run_transaction(remove):
             await self._event_broker.publish(ScheduleRemoved(schedule_id=schedule_id))
 
     async def get_schedules(self, ids: set[str] | None = None) -> list[Schedule]:
@@ -492,136 +917,154 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
         if ids:
             query = query.where(self.t_schedules.c.id.in_(ids))
 
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    result = await self._execute(conn, query)
-                    return await self._deserialize_schedules(result)
+        def get(conn: Connection) -> tuple[list[Schedule], list[Event]]:
+            events: list[Event] = []
+            return self._deserialize_schedules(conn.execute(query), events), events
 
-    async def acquire_schedules(self, scheduler_id: str, limit: int) -> list[Schedule]:
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    now = datetime.now(timezone.utc)
-                    acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
-                    schedules_cte = (
-                        select(self.t_schedules.c.id)
-                        .where(
-                            and_(
-                                self.t_schedules.c.next_fire_time.isnot(None),
-                                self.t_schedules.c.next_fire_time <= now,
-                                or_(
-                                    self.t_schedules.c.acquired_until.is_(None),
-                                    self.t_schedules.c.acquired_until < now,
-                                ),
-                            )
-                        )
-                        .order_by(self.t_schedules.c.next_fire_time)
-                        .limit(limit)
-                        .with_for_update(skip_locked=True)
-                        .cte()
-                    )
-                    subselect = select([schedules_cte.c.id])
-                    update = (
-                        self.t_schedules.update()
-                        .where(self.t_schedules.c.id.in_(subselect))
-                        .values(acquired_by=scheduler_id, acquired_until=acquired_until)
+        schedules, events = await self._run_transaction(get)
+        for event in events:
+            await self._event_broker.publish(event)
+
+        return schedules
+
+    def _claim_schedules(
+        self,
+        conn: Connection,
+        scheduler_id: str,
+        limit: int,
+        events: list[Event],
+    ) -> list[Schedule]:
+        now = datetime.now(timezone.utc)
+        acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
+        params = {
+            "p_now": now,
+            "p_limit": limit,
+            "p_scheduler_id": scheduler_id,
+            "p_acquired_until": acquired_until,
+        }
+        result = conn.execute(self._claim_schedules_update, params)
+        if not self._supports_update_returning:
+            params = {"p_scheduler_id": scheduler_id}
+            result = conn.execute(self._claimed_schedules_query, params)
+
+        return self._deserialize_schedules(result, events)
+
+    def _release_schedules(
+        self,
+        conn: Connection,
+        scheduler_id: str,
+        schedules: list[Schedule],
+        events: list[Event],
+    ) -> None:
+        finished_schedule_ids: list[str] = []
+        update_args: list[dict[str, Any]] = []
+        for schedule in schedules:
+            if schedule.next_fire_time is not None:
+                try:
+                    serialized_trigger = self.serializer.serialize(schedule.trigger)
+                except SerializationError:
+                    self._logger.exception(
+                        "Error serializing trigger for schedule %r – "
+                        "removing from data store",
+                        schedule.id,
                     )
-                    if self._supports_update_returning:
-                        update = update.returning(*self.t_schedules.columns)
-                        result = await self._execute(conn, update)
-                    else:
-                        await self._execute(conn, update)
-                        query = self.t_schedules.select().where(
-                            and_(self.t_schedules.c.acquired_by == scheduler_id)
-                        )
-                        result = await self._execute(conn, query)
+                    finished_schedule_ids.append(schedule.id)
+                    continue
+
+                update_args.append(
+                    {
+                        "p_id": schedule.id,
+                        "p_scheduler_id": scheduler_id,
+                        "p_trigger": serialized_trigger,
+                        "p_next_fire_time": schedule.next_fire_time,
+                    }
+                )
+            else:
+                finished_schedule_ids.append(schedule.id)
+
+        # Update schedules that have a next fire time
+        if update_args:
+            next_fire_times = {
+                arg["p_id"]: arg["p_next_fire_time"] for arg in update_args
+            }
+            # TODO: actually check which rows were updated?
+            conn.execute(self._release_schedules_update, update_args)
+            updated_ids = list(next_fire_times)
+
+            for schedule_id in updated_ids:
+                event = ScheduleUpdated(
+                    schedule_id=schedule_id,
+                    next_fire_time=next_fire_times[schedule_id],
+                )
+                events.append(event)
+
+        # Remove schedules that have no next fire time or failed to serialize
+        if finished_schedule_ids:
+            params = {"p_ids": finished_schedule_ids}
+            conn.execute(self._delete_schedules, params)
+            for schedule_id in finished_schedule_ids:
+                events.append(ScheduleRemoved(schedule_id=schedule_id))
+
+        if update_args:
+            self._notify(conn)
+
+    async def acquire_schedules(self, scheduler_id: str, limit: int) -> list[Schedule]:
+        def claim(conn: Connection) -> tuple[list[Schedule], list[Event]]:
+            events: list[Event] = []
+            return self._claim_schedules(conn, scheduler_id, limit, events), events
 
-                    schedules = await self._deserialize_schedules(result)
+        schedules, events = await self._run_transaction(claim)
+        for event in events:
+            await self._event_broker.publish(event)
 
         return schedules
 
     async def release_schedules(
         self, scheduler_id: str, schedules: list[Schedule]
     ) -> None:
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    update_events: list[ScheduleUpdated] = []
-                    finished_schedule_ids: list[str] = []
-                    update_args: list[dict[str, Any]] = []
-                    for schedule in schedules:
-                        if schedule.next_fire_time is not None:
-                            try:
-                                serialized_trigger = self.serializer.serialize(
-                                    schedule.trigger
-                                )
-                            except SerializationError:
-                                self._logger.exception(
-                                    "Error serializing trigger for schedule %r – "
-                                    "removing from data store",
-                                    schedule.id,
-                                )
-                                finished_schedule_ids.append(schedule.id)
-                                continue
-
-                            update_args.append(
-                                {
-                                    "p_id": schedule.id,
-                                    "p_trigger": serialized_trigger,
-                                    "p_next_fire_time": schedule.next_fire_time,
-                                }
-                            )
-                        else:
-                            finished_schedule_ids.append(schedule.id)
-
-                    # Update schedules that have a next fire time
-                    if update_args:
-                        p_id: BindParameter = bindparam("p_id")
-                        p_trigger: BindParameter = bindparam("p_trigger")
-                        p_next_fire_time: BindParameter = bindparam("p_next_fire_time")
-                        update = (
-                            self.t_schedules.update()
-                            .where(
-                                and_(
-                                    self.t_schedules.c.id == p_id,
-                                    self.t_schedules.c.acquired_by == scheduler_id,
-                                )
-                            )
-                            .values(
-                                trigger=p_trigger,
-                                next_fire_time=p_next_fire_time,
-                                acquired_by=None,
-                                acquired_until=None,
-                            )
-                        )
-                        next_fire_times = {
-                            arg["p_id"]: arg["p_next_fire_time"] for arg in update_args
-                        }
-                        # TODO: actually check which rows were updated?
-                        await self._execute(conn, update, update_args)
-                        updated_ids = list(next_fire_times)
-
-                        for schedule_id in updated_ids:
-                            event = ScheduleUpdated(
-                                schedule_id=schedule_id,
-                                next_fire_time=next_fire_times[schedule_id],
-                            )
-                            update_events.append(event)
+        def release(conn: Connection) -> list[Event]:
+            events: list[Event] = []
+            self._release_schedules(conn, scheduler_id, schedules, events)
+            return events
 
-                    # Remove schedules that have no next fire time or failed to
-                    # serialize
-                    if finished_schedule_ids:
-                        delete = self.t_schedules.delete().where(
-                            self.t_schedules.c.id.in_(finished_schedule_ids)
+        for event in await self._run_transaction(release):
+            await self._event_broker.publish(event)
+
+    async def process_due_schedules(
+        self,
+        scheduler_id: str,
+        limit: int,
+        callback: Callable[[list[Schedule]], list[Job]],
+    ) -> list[Schedule]:
+        def process(conn: Connection) -> tuple[list[Schedule], list[Event]]:
+            events: list[Event] = []
+            schedules = self._claim_schedules(conn, scheduler_id, limit, events)
+            if not schedules:
+                return [], events
+
+            jobs = callback(schedules)
+            if jobs:
+                marshalled = [job.marshal(self.serializer) for job in jobs]
+                conn.execute(self.t_jobs.insert(), marshalled)
+                self._notify(conn)
+                for job in jobs:
+                    events.append(
+                        JobAdded(
+                            job_id=job.id,
+                            task_id=job.task_id,
+                            schedule_id=job.schedule_id,
+                            tags=job.tags,
                         )
-                        await self._execute(conn, delete)
+                    )
+
+            self._release_schedules(conn, scheduler_id, schedules, events)
+            return schedules, events
 
-        for event in update_events:
+        schedules, events = await self._run_transaction(process)
+        for event in events:
             await self._event_broker.publish(event)
 
-        for schedule_id in finished_schedule_ids:
-            await self._event_broker.publish(ScheduleRemoved(schedule_id=schedule_id))
+        return schedules
 
     async def get_next_schedule_run_time(self) -> datetime | None:
         statenent = (
@@ -630,27 +1073,32 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             .order_by(self.t_schedules.c.next_fire_time)
             .limit(1)
         )
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    result = await self._execute(conn, statenent)
-                    return result.scalar()
+        return await self._run_transaction(
+            lambda conn: conn.execute(statenent).scalar()
+        )
 
     async def add_job(self, job: Job) -> None:
-        marshalled = job.marshal(self.serializer)
-        insert = self.t_jobs.insert().values(**marshalled)
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    await self._execute(conn, insert)
-
-        event = JobAdded(
-            job_id=job.id,
-            task_id=job.task_id,
-            schedule_id=job.schedule_id,
-            tags=job.tags,
-        )
-        await self._event_broker.publish(event)
+        await self.add_jobs([job])
+
+    async def add_jobs(self, jobs: Iterable[Job]) -> None:
+        def add(conn: Connection) -> None:
+            conn.execute(self.t_jobs.insert(), marshalled)
+            self._notify(conn)
+
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        marshalled = [job.marshal(self.serializer) for job in jobs]
+        await self._run_transaction(add)
+        for job in jobs:
+            event = JobAdded(
+                job_id=job.id,
+                task_id=job.task_id,
+                schedule_id=job.schedule_id,
+                tags=job.tags,
+            )
+            await self._event_broker.publish(event)
 
     async def get_jobs(self, ids: Iterable[UUID] | None = None) -> list[Job]:
         query = self.t_jobs.select().order_by(self.t_jobs.c.id)
@@ -658,97 +1106,108 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
             job_ids = [job_id for job_id in ids]
             query = query.where(self.t_jobs.c.id.in_(job_ids))
 
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    result = await self._execute(conn, query)
-                    return await self._deserialize_jobs(result)
+        def get(conn: Connection) -> tuple[list[Job], list[Event]]:
+            events: list[Event] = []
+            return self._deserialize_jobs(conn.execute(query), events), events
 
-    async def acquire_jobs(self, worker_id: str, limit: int | None = None) -> list[Job]:
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    now = datetime.now(timezone.utc)
-                    acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
-                    query = (
-                        self.t_jobs.select()
-                        .join(self.t_tasks, self.t_tasks.c.id == self.t_jobs.c.task_id)
-                        .where(
-                            or_(
-                                self.t_jobs.c.acquired_until.is_(None),
-                                self.t_jobs.c.acquired_until < now,
-                            )
-                        )
-                        .order_by(self.t_jobs.c.created_at)
-                        .with_for_update(skip_locked=True)
-                        .limit(limit)
-                    )
+        jobs, events = await self._run_transaction(get)
+        for event in events:
+            await self._event_broker.publish(event)
 
-                    result = await self._execute(conn, query)
-                    if not result:
-                        return []
-
-                    # Mark the jobs as acquired by this worker
-                    jobs = await self._deserialize_jobs(result)
-                    task_ids: set[str] = {job.task_id for job in jobs}
-
-                    # Retrieve the limits
-                    query = select(
-                        [
-                            self.t_tasks.c.id,
-                            self.t_tasks.c.max_running_jobs
-                            - self.t_tasks.c.running_jobs,
-                        ]
-                    ).where(
-                        self.t_tasks.c.max_running_jobs.isnot(None),
-                        self.t_tasks.c.id.in_(task_ids),
-                    )
-                    result = await self._execute(conn, query)
-                    job_slots_left: dict[str, int] = dict(result.fetchall())
-
-                    # Filter out jobs that don't have free slots
-                    acquired_jobs: list[Job] = []
-                    increments: dict[str, int] = defaultdict(lambda: 0)
-                    for job in jobs:
-                        # Don't acquire the job if there are no free slots left
-                        slots_left = job_slots_left.get(job.task_id)
-                        if slots_left == 0:
-                            continue
-                        elif slots_left is not None:
-                            job_slots_left[job.task_id] -= 1
-
-                        acquired_jobs.append(job)
-                        increments[job.task_id] += 1
-
-                    if acquired_jobs:
-                        # Mark the acquired jobs as acquired by this worker
-                        acquired_job_ids = [job.id for job in acquired_jobs]
-                        update = (
-                            self.t_jobs.update()
-                            .values(
-                                acquired_by=worker_id, acquired_until=acquired_until
-                            )
-                            .where(self.t_jobs.c.id.in_(acquired_job_ids))
-                        )
-                        await self._execute(conn, update)
-
-                        # Increment the running job counters on each task
-                        p_id: BindParameter = bindparam("p_id")
-                        p_increment: BindParameter = bindparam("p_increment")
-                        params = [
-                            {"p_id": task_id, "p_increment": increment}
-                            for task_id, increment in increments.items()
-                        ]
-                        update = (
-                            self.t_tasks.update()
-                            .values(
-                                running_jobs=self.t_tasks.c.running_jobs + p_increment
-                            )
-                            .where(self.t_tasks.c.id == p_id)
-                        )
-                        await self._execute(conn, update, params)
+        return jobs
+
+    async def acquire_jobs(
+        self,
+        worker_id: str,
+        limit: int | None = None,
+        *,
+        executor_limits: Mapping[str, int] | None = None,
+    ) -> list[Job]:
+        def acquire(conn: Connection) -> tuple[list[Job], list[Event]]:
+            events: list[Event] = []
+            now = datetime.now(timezone.utc)
+            acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
+            params: dict[str, Any] = {"p_now": now}
+            if limit is not None:
+                params["p_limit"] = limit
+
+            if executor_limits is not None:
+                params["p_executors"] = [
+                    name for name, slots in executor_limits.items() if slots
+                ]
+
+            query = self._acquire_jobs_queries[
+                (limit is not None, executor_limits is not None)
+            ]
+            jobs = self._deserialize_jobs(conn.execute(query, params), events)
+            if not jobs:
+                return [], events
+
+            # Retrieve the limits
+            task_ids: set[str] = {job.task_id for job in jobs}
+            result = conn.execute(
+                self._task_slots_query, {"p_task_ids": list(task_ids)}
+            )
+            task_executors: dict[str, str] = {}
+            job_slots_left: dict[str, int] = {}
+            for task_id, executor, slots_left in result:
+                task_executors[task_id] = executor
+                if slots_left is not None:
+                    job_slots_left[task_id] = slots_left
+
+            executor_slots_left = (
+                dict(executor_limits) if executor_limits is not None else None
+            )
+
+            # Filter out jobs that don't have free slots
+            acquired_jobs: list[Job] = []
+            increments: dict[str, int] = defaultdict(lambda: 0)
+            for job in jobs:
+                # Don't acquire the job if there are no free slots left
+                slots_left = job_slots_left.get(job.task_id)
+                if slots_left == 0:
+                    continue
+
+                # ...or if the job executor has no room for it
+                if executor_slots_left is not None:
+                    executor = task_executors[job.task_id]
+                    if not executor_slots_left.get(executor):
+                        continue
+
+                    executor_slots_left[executor] -= 1
+
+                if slots_left is not None:
+                    job_slots_left[job.task_id] -= 1
+
+                acquired_jobs.append(job)
+                increments[job.task_id] += 1
+
+            if acquired_jobs:
+                # Mark the acquired jobs as acquired by this worker
+                params = {
+                    "p_worker_id": worker_id,
+                    "p_acquired_until": acquired_until,
+                    "p_job_ids": [job.id for job in acquired_jobs],
+                }
+                conn.execute(self._acquire_jobs_update, params)
+
+                # Increment the running job counters on each task
+                conn.execute(
+                    self._running_jobs_update,
+                    [
+                        {"p_id": task_id, "p_delta": increment}
+                        for task_id, increment in increments.items()
+                    ],
+                )
+
+            return acquired_jobs, events
+
+        acquired_jobs, events = await self._run_transaction(acquire)
 
         # Publish the appropriate events
+        for event in events:
+            await self._event_broker.publish(event)
+
         for job in acquired_jobs:
             await self._event_broker.publish(
                 JobAcquired(job_id=job.id, worker_id=worker_id)
@@ -759,47 +1218,76 @@ class SQLAlchemyDataStore(BaseExternalDataStore):
     async def release_job(
         self, worker_id: str, task_id: str, result: JobResult
     ) -> None:
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    # Record the job result
-                    if result.expires_at > result.finished_at:
-                        marshalled = result.marshal(self.serializer)
-                        insert = self.t_job_results.insert().values(**marshalled)
-                        await self._execute(conn, insert)
-
-                    # Decrement the number of running jobs for this task
-                    update = (
-                        self.t_tasks.update()
-                        .values(running_jobs=self.t_tasks.c.running_jobs - 1)
-                        .where(self.t_tasks.c.id == task_id)
-                    )
-                    await self._execute(conn, update)
+        await self.release_jobs(worker_id, [(task_id, result)])
 
-                    # Delete the job
-                    delete = self.t_jobs.delete().where(
-                        self.t_jobs.c.id == result.job_id
-                    )
-                    await self._execute(conn, delete)
+    async def release_jobs(
+        self, worker_id: str, results: Sequence[tuple[str, JobResult]]
+    ) -> None:
+        def release(conn: Connection) -> None:
+            # Record the job results
+            if marshalled_results:
+                conn.execute(self.t_job_results.insert(), marshalled_results)
+
+            # Decrement the running job counters on each task
+            conn.execute(
+                self._running_jobs_update,
+                [
+                    {"p_id": task_id, "p_delta": -decrement}
+                    for task_id, decrement in decrements.items()
+                ],
+            )
 
-    async def get_job_result(self, job_id: UUID) -> JobResult | None:
-        async for attempt in self._retry():
-            with attempt:
-                async with self._begin_transaction() as conn:
-                    # Retrieve the result
-                    query = self.t_job_results.select().where(
-                        self.t_job_results.c.job_id == job_id
-                    )
-                    row = (await self._execute(conn, query)).first()
+            # Delete the jobs
+            conn.execute(self._delete_jobs, {"p_job_ids": job_ids})
 
-                    # Delete the result
-                    delete = self.t_job_results.delete().where(
-                        self.t_job_results.c.job_id == job_id
-                    )
-                    await self._execute(conn, delete)
+        if not results:
+            return
 
-                    return (
-                        JobResult.unmarshal(self.serializer, row._asdict())
-                        if row
-                        else None
-                    )
+        marshalled_results: list[dict[str, Any]] = []
+        decrements: dict[str, int] = defaultdict(lambda: 0)
+        job_ids: list[UUID] = []
+        for task_id, result in results:
+            if result.expires_at > result.finished_at:
+                marshalled_results.append(result.marshal(self.serializer))
+
+            decrements[task_id] += 1
+            job_ids.append(result.job_id)
+
+        await self._run_transaction(release)
+
+    async def get_job_result(self, job_id: UUID) -> JobResult | None:
+        def get_result(conn: Connection) -> Row | None:
+            # Retrieve the result
+            query = self.t_job_results.select().where(
+                self.t_job_results.c.job_id == job_id
+            )
+            row = conn.execute(query).first()
+
+            # Delete the result
+            delete = self.t_job_results.delete().where(
+                self.t_job_results.c.job_id == job_id
+            )
+            conn.execute(delete)
+            return row
+
+        row = await self._run_transaction(get_result)
+        return JobResult.unmarshal(self.serializer, row._asdict()) if row else None
+
+    async def cleanup(self) -> None:
+        # Delete the expired results in batches to keep the transactions short
+        now = datetime.now(timezone.utc)
+        expired_ids = (
+            select(self.t_job_results.c.job_id)
+            .where(self.t_job_results.c.expires_at < now)
+            .limit(CLEANUP_BATCH_SIZE)
+            .subquery()
+        )
+        delete = self.t_job_results.delete().where(
+            self.t_job_results.c.job_id.in_(select(expired_ids.c.job_id))
+        )
+        while True:
+            deleted = await self._run_transaction(
+                lambda conn: conn.execute(delete).rowcount
+            )
+            if deleted < CLEANUP_BATCH_SIZE:
+                break
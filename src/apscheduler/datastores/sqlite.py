@@ -0,0 +1,977 @@
+from __future__ import annotations
+
+import json
+import math
+import sqlite3
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from os import PathLike
+from typing import Any, Callable, TypeVar
+from uuid import UUID
+
+import anyio
+import attrs
+from anyio import CancelScope, WouldBlock, create_memory_object_stream, to_thread
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+
+from .._enums import ConflictPolicy
+from .._events import (
+    DataStoreEvent,
+    Event,
+    JobAcquired,
+    JobAdded,
+    JobDeserializationFailed,
+    ScheduleAdded,
+    ScheduleDeserializationFailed,
+    ScheduleRemoved,
+    ScheduleUpdated,
+    TaskAdded,
+    TaskRemoved,
+    TaskUpdated,
+)
+from .._exceptions import ConflictingIdError, SerializationError, TaskLookupError
+from .._structures import Job, JobResult, Schedule, Task
+from ..abc import EventBroker
+from .base import BaseExternalDataStore
+
+T = TypeVar("T")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Timestamps are stored as integer microseconds since the UNIX epoch so that they sort
+# correctly regardless of their original UTC offsets
+_timestamp_columns = frozenset(
+    [
+        "next_fire_time",
+        "last_fire_time",
+        "acquired_until",
+        "scheduled_fire_time",
+        "start_deadline",
+        "created_at",
+        "started_at",
+        "finished_at",
+        "expires_at",
+    ]
+)
+_interval_columns = frozenset(
+    [
+        "misfire_grace_time",
+        "max_jitter",
+        "batch_window",
+        "jitter",
+        "result_expiration_time",
+    ]
+)
+
+_tables = ("metadata", "tasks", "schedules", "jobs", "job_results")
+_schema = [
+    """
+    CREATE TABLE IF NOT EXISTS metadata (schema_version INTEGER NOT NULL)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id TEXT PRIMARY KEY,
+        func TEXT NOT NULL,
+        executor TEXT NOT NULL,
+        state BLOB,
+        max_running_jobs INTEGER,
+        misfire_grace_time REAL,
+        batch_size INTEGER,
+        batch_window REAL,
+        running_jobs INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS schedules (
+        id TEXT PRIMARY KEY,
+        task_id TEXT NOT NULL,
+        "trigger" BLOB,
+        args BLOB,
+        kwargs BLOB,
+        coalesce TEXT NOT NULL,
+        misfire_grace_time REAL,
+        max_jitter REAL,
+        tags TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        next_fire_time INTEGER,
+        last_fire_time INTEGER,
+        acquired_by TEXT,
+        acquired_until INTEGER
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_schedules_task_id ON schedules (task_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_schedules_next_fire_time ON schedules
+        (next_fire_time) WHERE next_fire_time IS NOT NULL
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id BLOB PRIMARY KEY,
+        task_id TEXT NOT NULL,
+        args BLOB NOT NULL,
+        kwargs BLOB NOT NULL,
+        schedule_id TEXT,
+        scheduled_fire_time INTEGER,
+        jitter REAL,
+        start_deadline INTEGER,
+        result_expiration_time REAL,
+        tags TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        created_at INTEGER NOT NULL,
+        started_at INTEGER,
+        acquired_by TEXT,
+        acquired_until INTEGER
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_jobs_task_id ON jobs (task_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_jobs_unacquired ON jobs (priority, created_at)
+        WHERE acquired_by IS NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_jobs_acquired_until ON jobs (acquired_until)
+        WHERE acquired_until IS NOT NULL
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_results (
+        job_id BLOB PRIMARY KEY,
+        outcome TEXT NOT NULL,
+        finished_at INTEGER,
+        expires_at INTEGER NOT NULL,
+        exception BLOB,
+        return_value BLOB
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_job_results_expires_at ON job_results (expires_at)
+    """,
+]
+
+
+def _columns(cls: type, table: str = "") -> str:
+    prefix = f"{table}." if table else ""
+    return ", ".join(f'{prefix}"{field.name}"' for field in attrs.fields(cls))
+
+
+_task_columns = _columns(Task)
+_schedule_columns = _columns(Schedule)
+_job_columns = _columns(Job)
+_job_result_columns = _columns(JobResult)
+
+
+def _to_timestamp(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_timestamp(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _encode(marshalled: dict[str, Any]) -> dict[str, Any]:
+    """Convert the values of a marshalled object into types that SQLite accepts."""
+    encoded: dict[str, Any] = {}
+    for key, value in marshalled.items():
+        if isinstance(value, Enum):
+            value = value.name
+        elif isinstance(value, datetime):
+            value = _to_timestamp(value)
+        elif isinstance(value, timedelta):
+            value = value.total_seconds()
+        elif isinstance(value, UUID):
+            value = value.bytes
+        elif isinstance(value, list):
+            value = json.dumps(value)
+
+        encoded[key] = value
+
+    return encoded
+
+
+def _decode(cls: type, row: sqlite3.Row) -> dict[str, Any]:
+    """Convert a database row back into a marshalled object."""
+    marshalled: dict[str, Any] = {}
+    for field in attrs.fields(cls):
+        key = field.name
+        value = row[key]
+        if value is not None:
+            if key in _timestamp_columns:
+                value = _from_timestamp(value)
+            elif key in _interval_columns:
+                value = timedelta(seconds=value)
+            elif key == "tags":
+                value = json.loads(value)
+            elif key in ("id", "job_id") and isinstance(value, bytes):
+                value = UUID(bytes=value)
+
+        marshalled[key] = value
+
+    return marshalled
+
+
+def _insert(table: str, values: Mapping[str, Any]) -> str:
+    columns = ", ".join(f'"{key}"' for key in values)
+    placeholders = ", ".join(f":{key}" for key in values)
+    return f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+
+def _upsert(table: str, values: Mapping[str, Any]) -> str:
+    updates = ", ".join(f'"{key}" = excluded."{key}"' for key in values)
+    return f"{_insert(table, values)} ON CONFLICT (id) DO UPDATE SET {updates}"
+
+
+def _placeholders(count: int) -> str:
+    return ", ".join("?" * count)
+
+
+@attrs.define(eq=False)
+class _Operation:
+    func: Callable[..., Any]
+    args: tuple[Any, ...]
+    finished: anyio.Event = attrs.field(init=False, factory=anyio.Event)
+    result: Any = attrs.field(init=False, default=None)
+    exception: Exception | None = attrs.field(init=False, default=None)
+
+
+@attrs.define(eq=False)
+class SQLiteDataStore(BaseExternalDataStore):
+    """
+    Uses an embedded SQLite database to store data.
+
+    When started, this data store creates the appropriate tables in the database if
+    they're not already present.
+
+    The database is opened in WAL mode and memory mapped (up to ``mmap_size`` bytes),
+    and all operations go through a single connection. Operations issued while a
+    previous batch is being run are committed together in the next transaction (with a
+    savepoint around each of them, so a failing operation doesn't affect the others).
+
+    This data store is meant to be used from a single process. Other processes can
+    safely use the same database file, but jobs and schedules they add will not wake
+    up the schedulers in this process.
+
+    :param path: path to the database file (or ``:memory:``)
+    :param mmap_size: maximum number of bytes of the database file to access through
+        memory mapped I/O (0 to disable)
+    :param synchronous: value of the ``synchronous`` pragma (one of ``OFF``,
+        ``NORMAL``, ``FULL`` or ``EXTRA``)
+    """
+
+    path: str | PathLike[str]
+    mmap_size: int = attrs.field(
+        kw_only=True,
+        default=268_435_456,
+        validator=attrs.validators.instance_of(int),
+    )
+    synchronous: str = attrs.field(
+        kw_only=True,
+        default="NORMAL",
+        validator=attrs.validators.in_(["OFF", "NORMAL", "FULL", "EXTRA"]),
+    )
+    _connection: sqlite3.Connection = attrs.field(init=False)
+    _send_operations: MemoryObjectSendStream[_Operation] = attrs.field(init=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+            conn.execute(f"PRAGMA mmap_size = {self.mmap_size:d}")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.start_from_scratch:
+                    for table in _tables:
+                        conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+                for statement in _schema:
+                    conn.execute(statement)
+
+                row = conn.execute("SELECT schema_version FROM metadata").fetchone()
+                if row is None:
+                    conn.execute("INSERT INTO metadata (schema_version) VALUES (1)")
+                elif row[0] > 1:
+                    raise RuntimeError(
+                        f"Unexpected schema version ({row[0]}); "
+                        f"only version 1 is supported by this version of "
+                        f"APScheduler"
+                    )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+        except BaseException:
+            conn.close()
+            raise
+
+        return conn
+
+    async def start(
+        self, exit_stack: AsyncExitStack, event_broker: EventBroker
+    ) -> None:
+        # The connection is closed only after the writer task has finished
+        self._connection = await to_thread.run_sync(self._connect)
+        exit_stack.callback(self._connection.close)
+        await super().start(exit_stack, event_broker)
+
+        send, receive = create_memory_object_stream(math.inf)
+        self._send_operations = send
+        exit_stack.callback(send.close)
+        self._task_group.start_soon(self._process_operations, receive)
+
+    async def _process_operations(
+        self, receive: MemoryObjectReceiveStream[_Operation]
+    ) -> None:
+        async with receive:
+            try:
+                async for operation in receive:
+                    # Take every operation queued up while the previous batch was
+                    # being run, and commit them together
+                    batch = [operation]
+                    while True:
+                        try:
+                            batch.append(receive.receive_nowait())
+                        except WouldBlock:
+                            break
+
+                    await to_thread.run_sync(self._run_batch, batch)
+                    for operation in batch:
+                        operation.finished.set()
+            finally:
+                while True:
+                    try:
+                        operation = receive.receive_nowait()
+                    except (WouldBlock, anyio.EndOfStream):
+                        break
+
+                    operation.exception = RuntimeError("The data store was stopped")
+                    operation.finished.set()
+
+    def _run_batch(self, batch: list[_Operation]) -> None:
+        conn = self._connection
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as exc:
+            for operation in batch:
+                operation.exception = exc
+
+            return
+
+        for operation in batch:
+            conn.execute("SAVEPOINT operation")
+            try:
+                operation.result = operation.func(conn, *operation.args)
+            except Exception as exc:
+                operation.exception = exc
+                conn.execute("ROLLBACK TO operation")
+
+            conn.execute("RELEASE operation")
+
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            conn.execute("ROLLBACK")
+            for operation in batch:
+                operation.result = None
+                operation.exception = exc
+
+    async def _run_transaction(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Call the given function within a transaction.
+
+        The function is passed the connection, followed by the given positional
+        arguments. It is run in the writer thread, possibly in the same transaction as
+        other operations, but within a savepoint of its own.
+
+        :return: the return value of the function
+
+        """
+        operation = _Operation(func, args)
+        self._send_operations.send_nowait(operation)
+
+        # The operation cannot be called off once queued, so wait for its outcome to
+        # keep the events consistent with the committed changes
+        with CancelScope(shield=True):
+            await operation.finished.wait()
+
+        if operation.exception is not None:
+            raise operation.exception
+
+        return operation.result
+
+    def _deserialize_schedules(
+        self, rows: Iterable[sqlite3.Row], events: list[Event]
+    ) -> list[Schedule]:
+        schedules: list[Schedule] = []
+        for row in rows:
+            try:
+                schedules.append(
+                    Schedule.unmarshal(self.serializer, _decode(Schedule, row))
+                )
+            except SerializationError as exc:
+                events.append(
+                    ScheduleDeserializationFailed(schedule_id=row["id"], exception=exc)
+                )
+
+        return schedules
+
+    def _deserialize_job(self, row: sqlite3.Row, events: list[Event]) -> Job | None:
+        try:
+            return Job.unmarshal(self.serializer, _decode(Job, row))
+        except SerializationError as exc:
+            events.append(
+                JobDeserializationFailed(job_id=UUID(bytes=row["id"]), exception=exc)
+            )
+            return None
+
+    async def add_task(self, task: Task) -> None:
+        def add(conn: sqlite3.Connection) -> bool:
+            existed = conn.execute(
+                "SELECT 1 FROM tasks WHERE id = ?", (task.id,)
+            ).fetchone()
+            values = _encode(task.marshal(self.serializer))
+            conn.execute(_upsert("tasks", values), values)
+            return existed is not None
+
+        if await self._run_transaction(add):
+            await self._event_broker.publish(TaskUpdated(task_id=task.id))
+        else:
+            await self._event_broker.publish(TaskAdded(task_id=task.id))
+
+    async def remove_task(self, task_id: str) -> None:
+        def remove(conn: sqlite3.Connection) -> int:
+            return conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount
+
+        if await self._run_transaction(remove) == 0:
+            raise TaskLookupError(task_id)
+
+        await self._event_broker.publish(TaskRemoved(task_id=task_id))
+
+    async def get_task(self, task_id: str) -> Task:
+        row = await self._run_transaction(
+            lambda conn: conn.execute(
+                f"SELECT {_task_columns} FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        )
+        if row:
+            return Task.unmarshal(self.serializer, _decode(Task, row))
+        else:
+            raise TaskLookupError(task_id)
+
+    async def get_tasks(self) -> list[Task]:
+        rows = await self._run_transaction(
+            lambda conn: conn.execute(
+                f"SELECT {_task_columns} FROM tasks ORDER BY id"
+            ).fetchall()
+        )
+        return [Task.unmarshal(self.serializer, _decode(Task, row)) for row in rows]
+
+    async def add_schedule(
+        self, schedule: Schedule, conflict_policy: ConflictPolicy
+    ) -> None:
+        await self.add_schedules([schedule], conflict_policy)
+
+    async def add_schedules(
+        self, schedules: Iterable[Schedule], conflict_policy: ConflictPolicy
+    ) -> None:
+        def add(conn: sqlite3.Connection) -> list[DataStoreEvent]:
+            events: list[DataStoreEvent] = []
+            for schedule in schedules:
+                values = _encode(schedule.marshal(self.serializer))
+                existed = conn.execute(
+                    "SELECT 1 FROM schedules WHERE id = ?", (schedule.id,)
+                ).fetchone()
+                if existed is None:
+                    conn.execute(_insert("schedules", values), values)
+                    events.append(
+                        ScheduleAdded(
+                            schedule_id=schedule.id,
+                            next_fire_time=schedule.next_fire_time,
+                        )
+                    )
+                elif conflict_policy is ConflictPolicy.exception:
+                    # Rolls back the whole batch
+                    raise ConflictingIdError(schedule.id)
+                elif conflict_policy is ConflictPolicy.replace:
+                    conn.execute(_upsert("schedules", values), values)
+                    events.append(
+                        ScheduleUpdated(
+                            schedule_id=schedule.id,
+                            next_fire_time=schedule.next_fire_time,
+                        )
+                    )
+
+            return events
+
+        schedules = list(schedules)
+        if not schedules:
+            return
+
+        for event in await self._run_transaction(add):
+            await self._event_broker.publish(event)
+
+    async def remove_schedules(self, ids: Iterable[str]) -> None:
+        def remove(conn: sqlite3.Connection) -> list[str]:
+            placeholders = _placeholders(len(ids))
+            removed_ids = [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT id FROM schedules WHERE id IN ({placeholders})", ids
+                )
+            ]
+            conn.execute(f"DELETE FROM schedules WHERE id IN ({placeholders})", ids)
+            return removed_ids
+
+        ids = list(ids)
+        if not ids:
+            return
+
+        for schedule_id in await self._run_transaction(remove):
+            await self._event_broker.publish(ScheduleRemoved(schedule_id=schedule_id))
+
+    async def get_schedules(self, ids: set[str] | None = None) -> list[Schedule]:
+        def get(conn: sqlite3.Connection) -> list[Schedule]:
+            if ids:
+                cursor = conn.execute(
+                    f"SELECT {_schedule_columns} FROM schedules "
+                    f"WHERE id IN ({_placeholders(len(ids))}) ORDER BY id",
+                    list(ids),
+                )
+            else:
+                cursor = conn.execute(
+                    f"SELECT {_schedule_columns} FROM schedules ORDER BY id"
+                )
+
+            return self._deserialize_schedules(cursor, events)
+
+        events: list[Event] = []
+        schedules = await self._run_transaction(get)
+        for event in events:
+            await self._event_broker.publish(event)
+
+        return schedules
+
+    def _claim_schedules(
+        self,
+        conn: sqlite3.Connection,
+        scheduler_id: str,
+        limit: int,
+        events: list[Event],
+    ) -> list[Schedule]:
+        now = datetime.now(timezone.utc)
+        acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
+        schedule_ids = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT id FROM schedules
+                WHERE next_fire_time IS NOT NULL AND next_fire_time <= :now
+                    AND (acquired_until IS NULL OR acquired_until < :now)
+                ORDER BY next_fire_time, id
+                LIMIT :limit
+                """,
+                {"now": _to_timestamp(now), "limit": limit},
+            )
+        ]
+        if not schedule_ids:
+            return []
+
+        # The surrounding BEGIN IMMEDIATE transaction holds the write lock, so the
+        # selected schedules can't be claimed by anyone else before they're updated
+        placeholders = _placeholders(len(schedule_ids))
+        conn.execute(
+            f"UPDATE schedules SET acquired_by = ?, acquired_until = ? "
+            f"WHERE id IN ({placeholders})",
+            [scheduler_id, _to_timestamp(acquired_until), *schedule_ids],
+        )
+        cursor = conn.execute(
+            f"SELECT {_schedule_columns} FROM schedules WHERE id IN ({placeholders}) "
+            f"ORDER BY next_fire_time, id",
+            schedule_ids,
+        )
+        return self._deserialize_schedules(cursor, events)
+
+    def _release_schedules(
+        self,
+        conn: sqlite3.Connection,
+        scheduler_id: str,
+        schedules: list[Schedule],
+        events: list[Event],
+    ) -> None:
+        finished_schedule_ids: list[str] = []
+        update_args: list[dict[str, Any]] = []
+        for schedule in schedules:
+            if schedule.next_fire_time is not None:
+                try:
+                    serialized_trigger = self.serializer.serialize(schedule.trigger)
+                except SerializationError:
+                    self._logger.exception(
+                        "Error serializing trigger for schedule %r – "
+                        "removing from data store",
+                        schedule.id,
+                    )
+                    finished_schedule_ids.append(schedule.id)
+                    continue
+
+                update_args.append(
+                    {
+                        "id": schedule.id,
+                        "scheduler_id": scheduler_id,
+                        "trigger": serialized_trigger,
+                        "next_fire_time": _to_timestamp(schedule.next_fire_time),
+                    }
+                )
+                events.append(
+                    ScheduleUpdated(
+                        schedule_id=schedule.id,
+                        next_fire_time=schedule.next_fire_time,
+                    )
+                )
+            else:
+                finished_schedule_ids.append(schedule.id)
+
+        # Update schedules that have a next fire time
+        if update_args:
+            conn.executemany(
+                """
+                UPDATE schedules SET "trigger" = :trigger,
+                    next_fire_time = :next_fire_time, acquired_by = NULL,
+                    acquired_until = NULL
+                WHERE id = :id AND acquired_by = :scheduler_id
+                """,
+                update_args,
+            )
+
+        # Remove schedules that have no next fire time or failed to serialize
+        if finished_schedule_ids:
+            conn.executemany(
+                "DELETE FROM schedules WHERE id = ?",
+                [(schedule_id,) for schedule_id in finished_schedule_ids],
+            )
+            for schedule_id in finished_schedule_ids:
+                events.append(ScheduleRemoved(schedule_id=schedule_id))
+
+    async def acquire_schedules(self, scheduler_id: str, limit: int) -> list[Schedule]:
+        events: list[Event] = []
+        schedules = await self._run_transaction(
+            self._claim_schedules, scheduler_id, limit, events
+        )
+        for event in events:
+            await self._event_broker.publish(event)
+
+        return schedules
+
+    async def release_schedules(
+        self, scheduler_id: str, schedules: list[Schedule]
+    ) -> None:
+        events: list[Event] = []
+        await self._run_transaction(
+            self._release_schedules, scheduler_id, schedules, events
+        )
+        for event in events:
+            await self._event_broker.publish(event)
+
+    async def process_due_schedules(
+        self,
+        scheduler_id: str,
+        limit: int,
+        callback: Callable[[list[Schedule]], list[Job]],
+    ) -> list[Schedule]:
+        def process(conn: sqlite3.Connection) -> list[Schedule]:
+            schedules = self._claim_schedules(conn, scheduler_id, limit, events)
+            if not schedules:
+                return []
+
+            jobs = callback(schedules)
+            if jobs:
+                self._insert_jobs(conn, jobs)
+                for job in jobs:
+                    events.append(
+                        JobAdded(
+                            job_id=job.id,
+                            task_id=job.task_id,
+                            schedule_id=job.schedule_id,
+                            tags=job.tags,
+                        )
+                    )
+
+            self._release_schedules(conn, scheduler_id, schedules, events)
+            return schedules
+
+        events: list[Event] = []
+        schedules = await self._run_transaction(process)
+        for event in events:
+            await self._event_broker.publish(event)
+
+        return schedules
+
+    async def get_next_schedule_run_time(self) -> datetime | None:
+        row = await self._run_transaction(
+            lambda conn: conn.execute(
+                "SELECT min(next_fire_time) FROM schedules "
+                "WHERE next_fire_time IS NOT NULL"
+            ).fetchone()
+        )
+        return _from_timestamp(row[0]) if row[0] is not None else None
+
+    def _insert_jobs(self, conn: sqlite3.Connection, jobs: Sequence[Job]) -> None:
+        encoded = [_encode(job.marshal(self.serializer)) for job in jobs]
+        conn.executemany(_insert("jobs", encoded[0]), encoded)
+
+    async def add_job(self, job: Job) -> None:
+        await self.add_jobs([job])
+
+    async def add_jobs(self, jobs: Iterable[Job]) -> None:
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        await self._run_transaction(self._insert_jobs, jobs)
+        for job in jobs:
+            event = JobAdded(
+                job_id=job.id,
+                task_id=job.task_id,
+                schedule_id=job.schedule_id,
+                tags=job.tags,
+            )
+            await self._event_broker.publish(event)
+
+    async def get_jobs(self, ids: Iterable[UUID] | None = None) -> list[Job]:
+        def get(conn: sqlite3.Connection) -> list[Job]:
+            if job_ids:
+                cursor = conn.execute(
+                    f"SELECT {_job_columns} FROM jobs "
+                    f"WHERE id IN ({_placeholders(len(job_ids))}) "
+                    f"ORDER BY priority, created_at, rowid",
+                    job_ids,
+                )
+            else:
+                cursor = conn.execute(
+                    f"SELECT {_job_columns} FROM jobs "
+                    f"ORDER BY priority, created_at, rowid"
+                )
+
+            return [
+                job
+                for job in (self._deserialize_job(row, events) for row in cursor)
+                if job is not None
+            ]
+
+        job_ids = [job_id.bytes for job_id in ids] if ids else []
+        events: list[Event] = []
+        jobs = await self._run_transaction(get)
+        for event in events:
+            await self._event_broker.publish(event)
+
+        return jobs
+
+    async def acquire_jobs(
+        self,
+        worker_id: str,
+        limit: int | None = None,
+        *,
+        executor_limits: Mapping[str, int] | None = None,
+    ) -> list[Job]:
+        def acquire(conn: sqlite3.Connection) -> list[Job]:
+            now = datetime.now(timezone.utc)
+            acquired_until = now + timedelta(seconds=self.lock_expiration_delay)
+
+            # Release the jobs whose locks have expired, and free up their slots
+            params = {"now": _to_timestamp(now)}
+            conn.execute(
+                """
+                UPDATE tasks SET running_jobs = running_jobs - (
+                    SELECT count(*) FROM jobs
+                    WHERE task_id = tasks.id AND acquired_until < :now
+                )
+                WHERE id IN (SELECT task_id FROM jobs WHERE acquired_until < :now)
+                """,
+                params,
+            )
+            conn.execute(
+                """
+                UPDATE jobs SET acquired_by = NULL, acquired_until = NULL
+                WHERE acquired_until < :now
+                """,
+                params,
+            )
+
+            # Walk through the unclaimed jobs in order until enough jobs have been
+            # acquired
+            executor_slots_left: dict[str, int] | None = None
+            query = (
+                f"SELECT {_columns(Job, 'j')}, "
+                f"t.executor AS task_executor, "
+                f"t.max_running_jobs - t.running_jobs AS task_slots_left "
+                f"FROM jobs AS j JOIN tasks AS t ON t.id = j.task_id "
+                f"WHERE j.acquired_by IS NULL"
+            )
+            args: list[Any] = []
+            if executor_limits is not None:
+                executor_slots_left = {
+                    name: slots for name, slots in executor_limits.items() if slots
+                }
+                if not executor_slots_left:
+                    return []
+
+                query += (
+                    f" AND t.executor IN ({_placeholders(len(executor_slots_left))})"
+                )
+                args.extend(executor_slots_left)
+
+            query += " ORDER BY j.priority, j.created_at, j.rowid"
+            job_slots_left: dict[str, int] = {}
+            increments: dict[str, int] = defaultdict(lambda: 0)
+            acquired_jobs: list[Job] = []
+            cursor = conn.execute(query, args)
+            for row in cursor:
+                if limit is not None and len(acquired_jobs) == limit:
+                    break
+
+                # Don't acquire the job if there are no free slots left
+                task_id = row["task_id"]
+                slots_left = job_slots_left.get(task_id, row["task_slots_left"])
+                if slots_left is not None and slots_left <= 0:
+                    continue
+
+                # ...or if the job executor has no room for it
+                if executor_slots_left is not None:
+                    executor = row["task_executor"]
+                    if not executor_slots_left.get(executor):
+                        continue
+
+                job = self._deserialize_job(row, events)
+                if job is None:
+                    continue
+
+                if executor_slots_left is not None:
+                    executor_slots_left[executor] -= 1
+
+                if slots_left is not None:
+                    job_slots_left[task_id] = slots_left - 1
+
+                job.acquired_by = worker_id
+                job.acquired_until = acquired_until
+                acquired_jobs.append(job)
+                increments[task_id] += 1
+                if executor_slots_left is not None and not any(
+                    executor_slots_left.values()
+                ):
+                    break
+
+            cursor.close()
+            if acquired_jobs:
+                # Mark the acquired jobs as acquired by this worker
+                conn.executemany(
+                    "UPDATE jobs SET acquired_by = ?, acquired_until = ? "
+                    "WHERE id = ?",
+                    [
+                        (worker_id, _to_timestamp(acquired_until), job.id.bytes)
+                        for job in acquired_jobs
+                    ],
+                )
+
+                # Increment the running job counters on each task
+                conn.executemany(
+                    "UPDATE tasks SET running_jobs = running_jobs + ? WHERE id = ?",
+                    [(increment, task_id) for task_id, increment in increments.items()],
+                )
+
+            return acquired_jobs
+
+        events: list[Event] = []
+        acquired_jobs = await self._run_transaction(acquire)
+
+        # Publish the appropriate events
+        for event in events:
+            await self._event_broker.publish(event)
+
+        for job in acquired_jobs:
+            await self._event_broker.publish(
+                JobAcquired(job_id=job.id, worker_id=worker_id)
+            )
+
+        return acquired_jobs
+
+    async def release_job(
+        self, worker_id: str, task_id: str, result: JobResult
+    ) -> None:
+        await self.release_jobs(worker_id, [(task_id, result)])
+
+    async def release_jobs(
+        self, worker_id: str, results: Sequence[tuple[str, JobResult]]
+    ) -> None:
+        def release(conn: sqlite3.Connection) -> None:
+            # Record the job results
+            if encoded_results:
+                conn.executemany(
+                    _insert("job_results", encoded_results[0]), encoded_results
+                )
+
+            # Decrement the running job counters on each task, unless the lock on the
+            # job has already expired (in which case the counter was already
+            # decremented when the lock was reclaimed)
+            conn.executemany(
+                """
+                UPDATE tasks SET running_jobs = running_jobs - 1
+                WHERE id = ? AND EXISTS (
+                    SELECT 1 FROM jobs WHERE id = ? AND acquired_by IS NOT NULL
+                )
+                """,
+                [(task_id, job_id) for task_id, job_id in task_job_ids],
+            )
+
+            # Delete the jobs
+            conn.executemany(
+                "DELETE FROM jobs WHERE id = ?",
+                [(job_id,) for _, job_id in task_job_ids],
+            )
+
+        if not results:
+            return
+
+        encoded_results: list[dict[str, Any]] = []
+        task_job_ids: list[tuple[str, bytes]] = []
+        for task_id, result in results:
+            if result.expires_at > result.finished_at:
+                encoded_results.append(_encode(result.marshal(self.serializer)))
+
+            task_job_ids.append((task_id, result.job_id.bytes))
+
+        await self._run_transaction(release)
+
+    async def get_job_result(self, job_id: UUID) -> JobResult | None:
+        def get(conn: sqlite3.Connection) -> sqlite3.Row | None:
+            row = conn.execute(
+                f"SELECT {_job_result_columns} FROM job_results WHERE job_id = ?",
+                (job_id.bytes,),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "DELETE FROM job_results WHERE job_id = ?", (job_id.bytes,)
+                )
+
+            return row
+
+        row = await self._run_transaction(get)
+        return (
+            JobResult.unmarshal(self.serializer, _decode(JobResult, row))
+            if row
+            else None
+        )
+
+    async def cleanup(self) -> None:
+        now = _to_timestamp(datetime.now(timezone.utc))
+        await self._run_transaction(
+            lambda conn: conn.execute(
+                "DELETE FROM job_results WHERE expires_at < ?", (now,)
+            )
+        )
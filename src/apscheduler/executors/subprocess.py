@@ -1,33 +1,440 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+import errno
+import math
+import mmap
+import os
+import pickle
+import struct
+import subprocess
+import sys
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
 from contextlib import AsyncExitStack
-from functools import partial
-from typing import Any
+from importlib import import_module
+from importlib.util import module_from_spec, spec_from_file_location
+from tempfile import gettempdir, mkstemp
+from types import ModuleType
+from typing import Any, BinaryIO, cast
 
 import attrs
-from anyio import CapacityLimiter, to_process
+from anyio import (
+    BrokenWorkerProcess,
+    CancelScope,
+    CapacityLimiter,
+    create_task_group,
+    fail_after,
+    get_cancelled_exc_class,
+    move_on_after,
+    open_process,
+    sleep,
+    to_thread,
+)
+from anyio.abc import ByteReceiveStream, ByteSendStream, Process, TaskGroup
+from anyio.streams.buffered import BufferedByteReceiveStream
 
+from .._exceptions import SerializationError
 from .._structures import Job
+from .._validators import non_negative_number, positive_number, require_state_version
 from ..abc import JobExecutor
+from ..marshalling import callable_from_ref, callable_to_ref
+
+# Response header: the response type and the length of the payload
+_response_header = struct.Struct("!BQ")
+
+# Response types
+_RESPONSE_EXCEPTION = 0  # pickled exception
+_RESPONSE_RETURN_VALUE = 1  # pickled return value
+_RESPONSE_MAPPED_RETURN_VALUE = 2  # path of a file containing the pickled return value
+
+# The files of mapped return values are named
+# apscheduler-<expiration time (UNIX timestamp)>-<random part>.pickle, so that expired
+# files can be identified without opening them
+_mapped_file_prefix = "apscheduler-"
+_mapped_file_suffix = ".pickle"
+
+
+@attrs.define(eq=False)
+class MappedReturnValue:
+    """
+    Handle to a job's return value, stored in a file by a worker process of
+    :class:`ProcessPoolJobExecutor`.
+
+    The scheduler loads the actual return value when the job result is retrieved via
+    :meth:`~apscheduler.schedulers.async_.AsyncScheduler.get_job_result`.
+
+    :var str path: path to the file containing the pickled return value
+    """
+
+    path: str
+
+    def load(self) -> Any:
+        """
+        Load the return value from the file and delete the file.
+
+        :return: the return value of the job
+        :raises FileNotFoundError: if the file no longer exists
+
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                errno.ENOENT,
+                "The return value has already been loaded, its job result has "
+                "expired, or the file was created on another host",
+                self.path,
+            ) from None
+
+        with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            retval = pickle.loads(mapped)
+
+        os.unlink(self.path)
+        return retval
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"version": 1, "path": self.path}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        require_state_version(self, state, 1)
+        self.path = state["path"]
+
+
+@attrs.define(eq=False)
+class _WorkerProcess:
+    process: Process
+    stdin: ByteSendStream
+    stdout: BufferedByteReceiveStream
+    jobs_run: int = 0
+
+    async def send_command(self, request: bytes) -> tuple[bool, Any]:
+        """
+        Send a pickled command to the worker process and wait for its response.
+
+        :return: a tuple of (``True``, return value) if the command succeeded, or
+            (``False``, exception) if it raised an exception
+        """
+        await self.stdin.send(request)
+        response_type, length = _response_header.unpack(
+            await self.stdout.receive_exactly(_response_header.size)
+        )
+        payload = await self.stdout.receive_exactly(length)
+        if response_type == _RESPONSE_MAPPED_RETURN_VALUE:
+            return True, MappedReturnValue(os.fsdecode(payload))
+
+        return response_type == _RESPONSE_RETURN_VALUE, pickle.loads(payload)
+
+    async def aclose(self, kill: bool = False) -> None:
+        with CancelScope(shield=True):
+            if kill:
+                try:
+                    self.process.kill()
+                except ProcessLookupError:
+                    pass
+            else:
+                # Closing stdin makes the worker exit on its own
+                await self.stdin.aclose()
+                with move_on_after(5) as scope:
+                    await self.process.wait()
+
+                if scope.cancel_called:
+                    self.process.kill()
+
+            await self.process.aclose()
 
 
 @attrs.define(eq=False, kw_only=True)
 class ProcessPoolJobExecutor(JobExecutor):
     """
-    Executes functions in a process pool.
+    Executes functions in a pool of persistent worker processes.
+
+    Worker processes are started on demand and then kept around to run further jobs.
+    Functions are sent to the workers as references (see
+    :func:`~apscheduler.marshalling.callable_to_ref`), so only the arguments and the
+    return value are pickled for each job. Functions that cannot be referenced that way,
+    and methods bound to instances, are pickled instead.
+
+    If the job is cancelled, the worker process running it is killed.
+
+    Large return values can be passed back from the worker processes through memory
+    mapped files instead of the worker's standard output, by setting
+    ``mmap_threshold``. The job result then contains a :class:`MappedReturnValue`,
+    which is only loaded (and its file deleted) when the result is retrieved with
+    :meth:`~apscheduler.schedulers.async_.AsyncScheduler.get_job_result`. The data
+    store thus only needs to store the path of the file. Setting ``mmap_dir`` to a
+    directory on a memory backed file system (like ``/dev/shm`` on Linux) keeps the
+    return values from being written to disk. The files of results that expire, or
+    that are retrieved without loading the return value, are deleted every
+    ``mmap_cleanup_interval`` seconds once their job results have expired.
 
     :param max_workers: the maximum number of worker processes to keep
+    :param max_tasks_per_child: the number of jobs a worker process runs before it is
+        replaced with a fresh one (the default is to never replace them)
+    :param preload: references to callables (``module:varname``) or names of modules to
+        import in every worker process when it starts
+    :param mmap_threshold: size (in bytes) of a pickled return value above which it is
+        passed back through a memory mapped file (the default is to never do this)
+    :param mmap_dir: directory to create the memory mapped files in (defaults to the
+        system's temporary directory). As the files are local to this host, the return
+        values can only be loaded by schedulers running on the same host, and using the
+        same directory.
+    :param mmap_cleanup_interval: interval (in seconds) between purges of the files of
+        expired job results
     """
 
-    max_workers: int = 40
+    max_workers: int = attrs.field(default=40, validator=positive_number)
+    max_tasks_per_child: int | None = attrs.field(
+        default=None, validator=attrs.validators.optional(positive_number)
+    )
+    preload: Sequence[str] = attrs.field(default=(), converter=tuple)
+    mmap_threshold: int | None = attrs.field(
+        default=None, validator=attrs.validators.optional(non_negative_number)
+    )
+    mmap_dir: str | None = attrs.field(default=None)
+    mmap_cleanup_interval: float = attrs.field(default=60, validator=positive_number)
     _limiter: CapacityLimiter = attrs.field(init=False)
+    _task_group: TaskGroup = attrs.field(init=False)
+    _workers: set[_WorkerProcess] = attrs.field(init=False, factory=set)
+    _idle_workers: deque[_WorkerProcess] = attrs.field(init=False, factory=deque)
+
+    @property
+    def max_concurrent_jobs(self) -> int:
+        return self.max_workers
 
     async def start(self, exit_stack: AsyncExitStack) -> None:
         self._limiter = CapacityLimiter(self.max_workers)
+        exit_stack.push_async_callback(self._stop_workers)
+        if self.mmap_threshold is not None:
+            self._task_group = await exit_stack.enter_async_context(create_task_group())
+            exit_stack.callback(self._task_group.cancel_scope.cancel)
+            self._task_group.start_soon(self._run_mmap_cleanup)
 
-    async def run_job(self, func: Callable[..., Any], job: Job) -> Any:
-        wrapped = partial(func, *job.args, **job.kwargs)
-        return await to_process.run_sync(
-            wrapped, cancellable=True, limiter=self._limiter
+    async def _run_mmap_cleanup(self) -> None:
+        # Files left behind by earlier runs are purged right away
+        directory = self.mmap_dir or gettempdir()
+        while True:
+            await to_thread.run_sync(_remove_expired_mapped_files, directory)
+            await sleep(self.mmap_cleanup_interval)
+
+    async def _stop_workers(self) -> None:
+        while self._workers:
+            await self._workers.pop().aclose()
+
+        self._idle_workers.clear()
+
+    async def _start_worker(self) -> _WorkerProcess:
+        command = [sys.executable, "-m", __name__]
+        process = await open_process(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE
         )
+        worker = _WorkerProcess(
+            process,
+            cast(ByteSendStream, process.stdin),
+            BufferedByteReceiveStream(cast(ByteReceiveStream, process.stdout)),
+        )
+        try:
+            main_module_path = getattr(sys.modules["__main__"], "__file__", None)
+            request = pickle.dumps(
+                ("init", sys.path, main_module_path, self.preload, self.mmap_dir),
+                pickle.HIGHEST_PROTOCOL,
+            )
+            with fail_after(20):
+                success, retval = await worker.send_command(request)
+        except BaseException as exc:
+            await worker.aclose(kill=True)
+            if isinstance(exc, get_cancelled_exc_class()):
+                raise
+
+            raise BrokenWorkerProcess(
+                "Error during worker process initialization"
+            ) from exc
+
+        if not success:
+            await worker.aclose(kill=True)
+            raise BrokenWorkerProcess(
+                "Error during worker process initialization"
+            ) from retval
+
+        self._workers.add(worker)
+        return worker
+
+    async def run_job(self, func: Callable[..., Any], job: Job) -> Any:
+        # Return values that won't be stored are not worth passing through a file
+        mmap_threshold = self.mmap_threshold if job.result_expiration_time else None
+        mmap_options = (mmap_threshold, job.result_expiration_time.total_seconds())
+        command: tuple[Any, ...] = ("run", func, job.args, job.kwargs, mmap_options)
+        if _is_referenceable(func):
+            try:
+                command = (
+                    "run_ref",
+                    callable_to_ref(func),
+                    job.args,
+                    job.kwargs,
+                    mmap_options,
+                )
+            except SerializationError:
+                pass
+
+        # Pickle the request before reserving a worker process
+        request = pickle.dumps(command, pickle.HIGHEST_PROTOCOL)
+        async with self._limiter:
+            if self._idle_workers:
+                worker = self._idle_workers.pop()
+            else:
+                worker = await self._start_worker()
+
+            try:
+                success, retval = await worker.send_command(request)
+            except BaseException as exc:
+                # The worker process is in an unknown state, so get rid of it
+                self._workers.discard(worker)
+                await worker.aclose(kill=True)
+                if isinstance(exc, get_cancelled_exc_class()):
+                    raise
+
+                raise BrokenWorkerProcess from exc
+
+            worker.jobs_run += 1
+            if worker.jobs_run == self.max_tasks_per_child:
+                self._workers.discard(worker)
+                await worker.aclose()
+            else:
+                self._idle_workers.append(worker)
+
+        if not success:
+            raise retval
+
+        return retval
+
+
+def _is_referenceable(func: Callable[..., Any]) -> bool:
+    """
+    Check if the given callable can be sent to a worker process as a reference.
+
+    Methods bound to instances are excluded, as their references would resolve to the
+    unbound functions in the worker processes.
+
+    """
+    bound_to = getattr(func, "__self__", None)
+    return bound_to is None or isinstance(bound_to, (type, ModuleType))
+
+
+def _remove_expired_mapped_files(directory: str) -> None:
+    now = time.time()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.startswith(_mapped_file_prefix) or not name.endswith(
+                _mapped_file_suffix
+            ):
+                continue
+
+            expiration_time = name.split("-", 2)[1]
+            if expiration_time.isdigit() and int(expiration_time) < now:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def _write_mapped_return_value(
+    pickled: bytes, directory: str | None, result_expiration_time: float
+) -> bytes:
+    # The job result expires a moment after this, as it's only finished by the parent
+    expiration_time = math.ceil(time.time() + result_expiration_time) + 1
+    fd, path = mkstemp(
+        prefix=f"{_mapped_file_prefix}{expiration_time}-",
+        suffix=_mapped_file_suffix,
+        dir=directory,
+    )
+    try:
+        os.ftruncate(fd, len(pickled))
+        with mmap.mmap(fd, len(pickled)) as mapped:
+            mapped[:] = pickled
+    except BaseException:
+        os.unlink(path)
+        raise
+    finally:
+        os.close(fd)
+
+    return os.fsencode(path)
+
+
+def process_worker() -> None:
+    # Redirect the standard streams to os.devnull so that user code won't interfere
+    # with the parent-worker communication
+    stdin = cast(BinaryIO, sys.stdin.buffer)
+    stdout = cast(BinaryIO, sys.stdout.buffer)
+    sys.stdin = open(os.devnull)
+    sys.stdout = open(os.devnull, "w")
+
+    mmap_dir: str | None = None
+    while True:
+        retval = exception = None
+        mmap_threshold: int | None = None
+        result_expiration_time = 0.0
+        try:
+            command, *args = pickle.load(stdin)
+        except EOFError:
+            return
+        except BaseException as exc:
+            exception = exc
+        else:
+            try:
+                if command == "run_ref":
+                    ref, args, kwargs, mmap_options = args
+                    mmap_threshold, result_expiration_time = mmap_options
+                    retval = callable_from_ref(ref)(*args, **kwargs)
+                elif command == "run":
+                    func, args, kwargs, mmap_options = args
+                    mmap_threshold, result_expiration_time = mmap_options
+                    retval = func(*args, **kwargs)
+                elif command == "init":
+                    sys.path, main_module_path, preload, mmap_dir = args
+                    del sys.modules["__main__"]
+                    if main_module_path:
+                        # Load the parent's main module as __mp_main__ instead of
+                        # __main__ (like multiprocessing does) to avoid infinite
+                        # recursion
+                        spec = spec_from_file_location("__mp_main__", main_module_path)
+                        if spec and spec.loader:
+                            main = module_from_spec(spec)
+                            spec.loader.exec_module(main)
+                            sys.modules["__main__"] = main
+
+                    for ref in preload:
+                        if ":" in ref:
+                            callable_from_ref(ref)
+                        else:
+                            import_module(ref)
+            except BaseException as exc:
+                exception = exc
+
+        try:
+            if exception is None:
+                response_type = _RESPONSE_RETURN_VALUE
+                payload = pickle.dumps(retval, pickle.HIGHEST_PROTOCOL)
+                if mmap_threshold is not None and len(payload) > mmap_threshold:
+                    response_type = _RESPONSE_MAPPED_RETURN_VALUE
+                    payload = _write_mapped_return_value(
+                        payload, mmap_dir, result_expiration_time
+                    )
+            else:
+                response_type = _RESPONSE_EXCEPTION
+                payload = pickle.dumps(exception, pickle.HIGHEST_PROTOCOL)
+        except BaseException as exc:
+            exception = exc
+            response_type = _RESPONSE_EXCEPTION
+            payload = pickle.dumps(exc, pickle.HIGHEST_PROTOCOL)
+
+        stdout.write(_response_header.pack(response_type, len(payload)) + payload)
+        stdout.flush()
+
+        # Respect SIGTERM
+        if isinstance(exception, SystemExit):
+            raise exception
+
+
+if __name__ == "__main__":
+    process_worker()
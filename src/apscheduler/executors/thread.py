@@ -23,6 +23,10 @@ class ThreadPoolJobExecutor(JobExecutor):
     max_workers: int = 40
     _limiter: CapacityLimiter = attrs.field(init=False)
 
+    @property
+    def max_concurrent_jobs(self) -> int:
+        return self.max_workers
+
     async def start(self, exit_stack: AsyncExitStack) -> None:
         self._limiter = CapacityLimiter(self.max_workers)
 
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import sys
 from datetime import date, datetime, tzinfo
-from functools import partial
+from functools import lru_cache, partial
+from importlib.machinery import ModuleSpec
+from inspect import ismethod
+from types import ModuleType
 from typing import Any, Callable, overload
 
 from ._exceptions import DeserializationError, SerializationError
@@ -80,11 +83,25 @@ def callable_to_ref(func: Callable) -> str:
     """
     Return a reference to the given callable.
 
+    Successfully created references are cached for hashable callables, except for
+    bound methods (so the cache won't keep their instances alive).
+
     :raises SerializationError: if the given object is not callable, is a partial(),
         lambda or local function or does not have the ``__module__`` and
         ``__qualname__`` attributes
 
     """
+    if ismethod(func):
+        return _callable_to_ref(func)
+
+    try:
+        return _cached_callable_to_ref(func)
+    except TypeError:
+        # Unhashable callables cannot be cached
+        return _callable_to_ref(func)
+
+
+def _callable_to_ref(func: Callable) -> str:
     if isinstance(func, partial):
         raise SerializationError("Cannot create a reference to a partial()")
 
@@ -100,23 +117,40 @@ def callable_to_ref(func: Callable) -> str:
     return f"{func.__module__}:{func.__qualname__}"
 
 
+_cached_callable_to_ref = lru_cache(maxsize=1024)(_callable_to_ref)
+
+
 def callable_from_ref(ref: str) -> Callable:
     """
     Return the callable pointed to by ``ref``.
 
+    Resolved references are cached until the module they point to is reloaded.
+
     :raises DeserializationError: if the reference could not be resolved or the looked
         up object is not callable
 
     """
+    module, spec, obj = _resolve_ref(ref)
+    if sys.modules.get(module.__name__) is not module or module.__spec__ is not spec:
+        # The module has been reloaded or replaced since the reference was resolved
+        _resolve_ref.cache_clear()
+        module, spec, obj = _resolve_ref(ref)
+
+    return obj
+
+
+@lru_cache(maxsize=1024)
+def _resolve_ref(ref: str) -> tuple[ModuleType, ModuleSpec | None, Callable]:
     if ":" not in ref:
         raise ValueError(f"Invalid reference: {ref}")
 
     modulename, rest = ref.split(":", 1)
     try:
-        obj = __import__(modulename, fromlist=[rest])
+        module = __import__(modulename, fromlist=[rest])
     except ImportError:
         raise LookupError(f"Error resolving reference {ref!r}: could not import module")
 
+    obj = module
     try:
         for name in rest.split("."):
             obj = getattr(obj, name)
@@ -131,4 +165,4 @@ def callable_from_ref(ref: str) -> Callable:
             f"{obj.__class__.__qualname__} which is not callable"
         )
 
-    return obj
+    return module, module.__spec__, obj
@@ -6,6 +6,7 @@ import random
 import sys
 from collections.abc import MutableMapping
 from contextlib import AsyncExitStack
+from copy import deepcopy
 from datetime import datetime, timedelta, timezone
 from inspect import isclass
 from logging import Logger, getLogger
@@ -21,6 +22,8 @@ from anyio import (
     create_task_group,
     get_cancelled_exc_class,
     move_on_after,
+    sleep,
+    to_thread,
 )
 from anyio.abc import TaskGroup, TaskStatus
 from attr.validators import instance_of
@@ -35,6 +38,8 @@ from .._events import (
     SchedulerStarted,
     SchedulerStopped,
     ScheduleUpdated,
+    TaskRemoved,
+    TaskUpdated,
 )
 from .._exceptions import (
     JobCancelled,
@@ -43,12 +48,13 @@ from .._exceptions import (
     ScheduleLookupError,
 )
 from .._structures import Job, JobInfo, JobResult, Schedule, Task
-from .._validators import non_negative_number
+from .._utils import accepts_keyword
+from .._validators import non_negative_number, positive_number
 from ..abc import DataStore, EventBroker, JobExecutor, Subscription, Trigger
 from ..datastores.memory import MemoryDataStore
 from ..eventbrokers.local import LocalEventBroker
 from ..executors.async_ import AsyncJobExecutor
-from ..executors.subprocess import ProcessPoolJobExecutor
+from ..executors.subprocess import MappedReturnValue, ProcessPoolJobExecutor
 from ..executors.thread import ThreadPoolJobExecutor
 from ..marshalling import callable_to_ref
 
@@ -58,9 +64,39 @@ else:
     from typing_extensions import Self
 
 _microsecond_delta = timedelta(microseconds=1)
+_second_delta = timedelta(seconds=1)
 _zero_timedelta = timedelta()
 
 
+def _copy_trigger(trigger: Trigger) -> Trigger:
+    """
+    Copy the trigger along with its current state.
+
+    Unlike :func:`copy.copy`, this does not go through the serializable state of the
+    trigger, so any time zones in the stored datetimes are preserved. Triggers that are
+    not attrs classes are deep copied.
+
+    """
+    trigger_class = type(trigger)
+    if not attrs.has(trigger_class):
+        return deepcopy(trigger)
+
+    clone = object.__new__(trigger_class)
+    for field in attrs.fields(trigger_class):
+        value = getattr(trigger, field.name)
+        if isinstance(value, Trigger):
+            value = _copy_trigger(value)
+        elif isinstance(value, list):
+            value = [
+                _copy_trigger(item) if isinstance(item, Trigger) else item
+                for item in value
+            ]
+
+        object.__setattr__(clone, field.name, value)
+
+    return clone
+
+
 @attrs.define(eq=False, kw_only=True)
 class AsyncScheduler:
     """
@@ -69,8 +105,14 @@ class AsyncScheduler:
     :param data_store: the data store for tasks, schedules and jobs
     :param event_broker: the event broker to use for publishing an subscribing events
     :param max_concurrent_jobs: Maximum number of jobs the worker will run at once
+        (jobs are also only acquired for job executors that have room for them; see
+        :attr:`JobExecutor.max_concurrent_jobs <.abc.JobExecutor.max_concurrent_jobs>`)
     :param role: specifies what the scheduler should be doing when running
     :param process_schedules: ``True`` to process due schedules in this scheduler
+    :param job_release_batch_size: maximum number of finished jobs to release in the
+        data store at once
+    :param job_release_delay: maximum time (in seconds) to wait for more jobs to
+        finish before releasing the finished jobs in the data store
     """
 
     data_store: DataStore = attrs.field(
@@ -82,6 +124,8 @@ class AsyncScheduler:
     identity: str = attrs.field(default=None)
     role: SchedulerRole = attrs.field(default=SchedulerRole.both)
     max_concurrent_jobs: int = attrs.field(validator=non_negative_number, default=100)
+    job_release_batch_size: int = attrs.field(validator=positive_number, default=100)
+    job_release_delay: float = attrs.field(validator=non_negative_number, default=0.01)
     job_executors: MutableMapping[str, JobExecutor] | None = attrs.field(default=None)
     default_job_executor: str | None = attrs.field(default=None)
     logger: Logger | None = attrs.field(default=getLogger(__name__))
@@ -92,6 +136,15 @@ class AsyncScheduler:
     _services_initialized: bool = attrs.field(init=False, default=False)
     _scheduler_cancel_scope: CancelScope | None = attrs.field(init=False, default=None)
     _running_jobs: set[Job] = attrs.field(init=False, factory=set)
+    _running_jobs_by_executor: dict[str, int] = attrs.field(init=False, factory=dict)
+    _jobs_wakeup_event: anyio.Event = attrs.field(init=False)
+    _task_cache: dict[str, Task] = attrs.field(init=False, factory=dict)
+    _job_batches: dict[str, tuple[Task, list[Job]]] = attrs.field(
+        init=False, factory=dict
+    )
+    _job_releases: list[tuple[str, JobResult]] = attrs.field(init=False, factory=list)
+    _job_releases_pending: anyio.Event = attrs.field(init=False)
+    _job_releases_full: anyio.Event = attrs.field(init=False)
 
     def __attrs_post_init__(self) -> None:
         if not self.identity:
@@ -226,6 +279,7 @@ class AsyncScheduler:
         misfire_grace_time: float | timedelta | None = None,
         max_jitter: float | timedelta | None = None,
         tags: Iterable[str] | None = None,
+        priority: int = 0,
         conflict_policy: ConflictPolicy = ConflictPolicy.do_nothing,
     ) -> str:
         """
@@ -247,6 +301,8 @@ class AsyncScheduler:
             time for each job created from this schedule
         :param tags: strings that can be used to categorize and filter the schedule and
             its derivative jobs
+        :param priority: priority of the jobs created from this schedule (jobs with
+            lower values are acquired for execution first)
         :param conflict_policy: determines what to do if a schedule with the same ID
             already exists in the data store
         :return: the ID of the newly added schedule
@@ -260,16 +316,7 @@ class AsyncScheduler:
         if isinstance(misfire_grace_time, (int, float)):
             misfire_grace_time = timedelta(seconds=misfire_grace_time)
 
-        if callable(func_or_task_id):
-            task = Task(
-                id=callable_to_ref(func_or_task_id),
-                func=func_or_task_id,
-                executor=job_executor or self.default_job_executor,
-            )
-            await self.data_store.add_task(task)
-        else:
-            task = await self.data_store.get_task(func_or_task_id)
-
+        task = await self._get_or_add_task(func_or_task_id, job_executor)
         schedule = Schedule(
             id=id,
             task_id=task.id,
@@ -280,6 +327,7 @@ class AsyncScheduler:
             misfire_grace_time=misfire_grace_time,
             max_jitter=max_jitter,
             tags=tags,
+            priority=priority,
         )
         schedule.next_fire_time = trigger.next()
         await self.data_store.add_schedule(schedule, conflict_policy)
@@ -334,6 +382,7 @@ class AsyncScheduler:
         kwargs: Mapping[str, Any] | None = None,
         job_executor: str | None = None,
         tags: Iterable[str] | None = None,
+        priority: int = 0,
         result_expiration_time: timedelta | float = 0,
     ) -> UUID:
         """
@@ -345,6 +394,8 @@ class AsyncScheduler:
         :param kwargs: keyword arguments to call the target callable with
         :param job_executor: name of the job executor to run the task with
         :param tags: strings that can be used to categorize and filter the job
+        :param priority: priority of the job (jobs with lower values are acquired for
+            execution first)
         :param result_expiration_time: the minimum time (as seconds, or timedelta) to
             keep the result of the job available for fetching (the result won't be
             saved at all if that time is 0)
@@ -352,26 +403,87 @@ class AsyncScheduler:
 
         """
         self._check_initialized()
-        if callable(func_or_task_id):
-            task = Task(
-                id=callable_to_ref(func_or_task_id),
-                func=func_or_task_id,
-                executor=job_executor or self.default_job_executor,
-            )
-            await self.data_store.add_task(task)
-        else:
-            task = await self.data_store.get_task(func_or_task_id)
-
+        task = await self._get_or_add_task(func_or_task_id, job_executor)
         job = Job(
             task_id=task.id,
             args=args or (),
             kwargs=kwargs or {},
             tags=tags or frozenset(),
+            priority=priority,
             result_expiration_time=result_expiration_time,
         )
         await self.data_store.add_job(job)
         return job.id
 
+    async def add_jobs(
+        self,
+        func_or_task_id: str | Callable,
+        args_list: Iterable[Iterable],
+        *,
+        kwargs: Mapping[str, Any] | None = None,
+        job_executor: str | None = None,
+        tags: Iterable[str] | None = None,
+        priority: int = 0,
+        result_expiration_time: timedelta | float = 0,
+    ) -> list[UUID]:
+        """
+        Add several jobs of the same task to the data store in one operation.
+
+        One job is created for each item in ``args_list``.
+
+        :param func_or_task_id: either a callable or an ID of an existing task
+            definition
+        :param args_list: an iterable of positional argument sequences, one per job
+        :param kwargs: keyword arguments to call the target callable with (shared by
+            all the jobs)
+        :param job_executor: name of the job executor to run the task with
+        :param tags: strings that can be used to categorize and filter the jobs
+        :param priority: priority of the jobs (jobs with lower values are acquired for
+            execution first)
+        :param result_expiration_time: the minimum time (as seconds, or timedelta) to
+            keep the results of the jobs available for fetching (the results won't be
+            saved at all if that time is 0)
+        :return: the IDs of the newly created jobs, in the same order as ``args_list``
+
+        """
+        self._check_initialized()
+        task = await self._get_or_add_task(func_or_task_id, job_executor)
+        jobs = [
+            Job(
+                task_id=task.id,
+                args=args,
+                kwargs=kwargs or {},
+                tags=tags or frozenset(),
+                priority=priority,
+                result_expiration_time=result_expiration_time,
+            )
+            for args in args_list
+        ]
+        await self.data_store.add_jobs(jobs)
+        return [job.id for job in jobs]
+
+    async def _get_or_add_task(
+        self, func_or_task_id: str | Callable, job_executor: str | None
+    ) -> Task:
+        if callable(func_or_task_id):
+            task = Task(
+                id=callable_to_ref(func_or_task_id),
+                func=func_or_task_id,
+                executor=job_executor or self.default_job_executor,
+            )
+
+            # Replacing the task with an identical one would only make the job
+            # processing loop drop it from the task cache and fetch it again
+            cached_task = self._task_cache.get(task.id)
+            if cached_task is None or attrs.astuple(
+                cached_task, recurse=False
+            ) != attrs.astuple(task, recurse=False):
+                await self.data_store.add_task(task)
+
+            return task
+
+        return await self.data_store.get_task(func_or_task_id)
+
     async def get_job_result(self, job_id: UUID, *, wait: bool = True) -> JobResult:
         """
         Retrieve the result of a job.
@@ -392,14 +504,21 @@ class AsyncScheduler:
 
         with self.event_broker.subscribe(listener, {JobReleased}):
             result = await self.data_store.get_job_result(job_id)
-            if result:
-                return result
-            elif not wait:
-                raise JobLookupError(job_id)
+            if not result:
+                if not wait:
+                    raise JobLookupError(job_id)
+
+                await wait_event.wait()
 
-            await wait_event.wait()
+        if not result:
+            result = await self.data_store.get_job_result(job_id)
 
-        return await self.data_store.get_job_result(job_id)
+        if result and isinstance(result.return_value, MappedReturnValue):
+            # Load the return value passed back from a worker process through a file
+            return_value = await to_thread.run_sync(result.return_value.load)
+            result = attrs.evolve(result, return_value=return_value)
+
+        return result
 
     async def run_job(
         self,
@@ -409,6 +528,7 @@ class AsyncScheduler:
         kwargs: Mapping[str, Any] | None = None,
         job_executor: str | None = None,
         tags: Iterable[str] | None = (),
+        priority: int = 0,
     ) -> Any:
         """
         Convenience method to add a job and then return its result.
@@ -421,6 +541,8 @@ class AsyncScheduler:
         :param kwargs: keyword arguments to be passed to the task function
         :param job_executor: name of the job executor to run the task with
         :param tags: strings that can be used to categorize and filter the job
+        :param priority: priority of the job (jobs with lower values are acquired for
+            execution first)
         :returns: the return value of the task function
 
         """
@@ -439,6 +561,7 @@ class AsyncScheduler:
                 kwargs=kwargs,
                 job_executor=job_executor,
                 tags=tags,
+                priority=priority,
                 result_expiration_time=timedelta(minutes=15),
             )
             await job_complete_event.wait()
@@ -565,81 +688,9 @@ class AsyncScheduler:
             await self.get_next_event(SchedulerStarted)
 
             while self._state is RunState.started:
-                schedules = await self.data_store.acquire_schedules(self.identity, 100)
-                now = datetime.now(timezone.utc)
-                for schedule in schedules:
-                    # Calculate a next fire time for the schedule, if possible
-                    fire_times = [schedule.next_fire_time]
-                    calculate_next = schedule.trigger.next
-                    while True:
-                        try:
-                            fire_time = calculate_next()
-                        except Exception:
-                            self.logger.exception(
-                                "Error computing next fire time for schedule %r of "
-                                "task %r – removing schedule",
-                                schedule.id,
-                                schedule.task_id,
-                            )
-                            break
-
-                        # Stop if the calculated fire time is in the future
-                        if fire_time is None or fire_time > now:
-                            schedule.next_fire_time = fire_time
-                            break
-
-                        # Only keep all the fire times if coalesce policy = "all"
-                        if schedule.coalesce is CoalescePolicy.all:
-                            fire_times.append(fire_time)
-                        elif schedule.coalesce is CoalescePolicy.latest:
-                            fire_times[0] = fire_time
-
-                    # Add one or more jobs to the job queue
-                    max_jitter = (
-                        schedule.max_jitter.total_seconds()
-                        if schedule.max_jitter
-                        else 0
-                    )
-                    for i, fire_time in enumerate(fire_times):
-                        # Calculate a jitter if max_jitter > 0
-                        jitter = _zero_timedelta
-                        if max_jitter:
-                            if i + 1 < len(fire_times):
-                                next_fire_time = fire_times[i + 1]
-                            else:
-                                next_fire_time = schedule.next_fire_time
-
-                            if next_fire_time is not None:
-                                # Jitter must never be so high that it would cause a
-                                # fire time to equal or exceed the next fire time
-                                jitter_s = min(
-                                    [
-                                        max_jitter,
-                                        (
-                                            next_fire_time
-                                            - fire_time
-                                            - _microsecond_delta
-                                        ).total_seconds(),
-                                    ]
-                                )
-                                jitter = timedelta(seconds=random.uniform(0, jitter_s))
-                                fire_time += jitter
-
-                        schedule.last_fire_time = fire_time
-                        job = Job(
-                            task_id=schedule.task_id,
-                            args=schedule.args,
-                            kwargs=schedule.kwargs,
-                            schedule_id=schedule.id,
-                            scheduled_fire_time=fire_time,
-                            jitter=jitter,
-                            start_deadline=schedule.next_deadline,
-                            tags=schedule.tags,
-                        )
-                        await self.data_store.add_job(job)
-
-                # Update the schedules (and release the scheduler's claim on them)
-                await self.data_store.release_schedules(self.identity, schedules)
+                schedules = await self.data_store.process_due_schedules(
+                    self.identity, 100, self._create_jobs_for_schedules
+                )
 
                 # If we received fewer schedules than the maximum amount, sleep
                 # until the next schedule is due or the scheduler is explicitly
@@ -665,40 +716,225 @@ class AsyncScheduler:
                 else:
                     self.logger.debug("Processing more schedules on the next iteration")
 
+    def _create_jobs_for_schedules(self, schedules: list[Schedule]) -> list[Job]:
+        now = datetime.now(timezone.utc)
+        jobs: list[Job] = []
+        for schedule in schedules:
+            # Calculate a next fire time for the schedule, if possible
+            fire_times = [schedule.next_fire_time]
+            trigger = schedule.trigger
+            try:
+                fire_time = trigger.next()
+                if schedule.coalesce is CoalescePolicy.all:
+                    # Keep all the fire times up to the present moment
+                    while fire_time is not None and fire_time <= now:
+                        fire_times.append(fire_time)
+                        fire_time = trigger.next()
+                elif (
+                    schedule.coalesce is CoalescePolicy.latest
+                    and type(trigger).next_after is Trigger.next_after
+                ):
+                    # Without a faster next_after(), walking through the fire times
+                    # is the cheapest way to find the latest one
+                    while fire_time is not None and fire_time <= now:
+                        fire_times[0] = fire_time
+                        fire_time = trigger.next()
+                elif fire_time is not None and fire_time <= now:
+                    # Skip all the fire times up to the present moment in one go
+                    if schedule.coalesce is CoalescePolicy.latest:
+                        fire_times[0] = self._find_latest_fire_time(
+                            trigger, fire_time, fire_time - fire_times[0], now
+                        )
+
+                    fire_time = trigger.next_after(now)
+            except Exception:
+                self.logger.exception(
+                    "Error computing next fire time for schedule %r of "
+                    "task %r – removing schedule",
+                    schedule.id,
+                    schedule.task_id,
+                )
+            else:
+                schedule.next_fire_time = fire_time
+
+            # Add one or more jobs to the job queue
+            max_jitter = (
+                schedule.max_jitter.total_seconds() if schedule.max_jitter else 0
+            )
+            for i, fire_time in enumerate(fire_times):
+                # Calculate a jitter if max_jitter > 0
+                jitter = _zero_timedelta
+                if max_jitter:
+                    if i + 1 < len(fire_times):
+                        next_fire_time = fire_times[i + 1]
+                    else:
+                        next_fire_time = schedule.next_fire_time
+
+                    if next_fire_time is not None:
+                        # Jitter must never be so high that it would cause a
+                        # fire time to equal or exceed the next fire time
+                        jitter_s = min(
+                            [
+                                max_jitter,
+                                (
+                                    next_fire_time - fire_time - _microsecond_delta
+                                ).total_seconds(),
+                            ]
+                        )
+                        jitter = timedelta(seconds=random.uniform(0, jitter_s))
+                        fire_time += jitter
+
+                schedule.last_fire_time = fire_time
+                job = Job(
+                    task_id=schedule.task_id,
+                    args=schedule.args,
+                    kwargs=schedule.kwargs,
+                    schedule_id=schedule.id,
+                    scheduled_fire_time=fire_time,
+                    jitter=jitter,
+                    start_deadline=schedule.next_deadline,
+                    tags=schedule.tags,
+                    priority=schedule.priority,
+                )
+                jobs.append(job)
+
+        return jobs
+
+    @staticmethod
+    def _find_latest_fire_time(
+        trigger: Trigger, fire_time: datetime, period: timedelta, now: datetime
+    ) -> datetime:
+        """
+        Find the latest fire time at or before ``now`` without iterating through all
+        the fire times since ``fire_time``.
+
+        This works on copies of the trigger, so the trigger itself is not advanced.
+        It only pays off for triggers that override :meth:`Trigger.next_after`.
+
+        :param trigger: a trigger that has just produced ``fire_time``
+        :param fire_time: a fire time at or before ``now``
+        :param period: the estimated time between consecutive fire times
+        :param now: the present moment
+        :return: the latest fire time at or before ``now``
+
+        """
+        # Look for fire times in an exponentially growing window preceding the present
+        # moment until it contains at least one
+        window = max(period, _second_delta)
+        while True:
+            probe = _copy_trigger(trigger)
+            if now - window > fire_time:
+                next_fire_time = probe.next_after(now - window)
+                if next_fire_time is None or next_fire_time > now:
+                    window *= 2
+                    continue
+            else:
+                next_fire_time = probe.next()
+
+            while next_fire_time is not None and next_fire_time <= now:
+                fire_time = next_fire_time
+                next_fire_time = probe.next()
+
+            return fire_time
+
     async def _process_jobs(self, *, task_status: TaskStatus) -> None:
-        wakeup_event = anyio.Event()
+        self._jobs_wakeup_event = anyio.Event()
 
         async def job_added(event: Event) -> None:
             if len(self._running_jobs) < self.max_concurrent_jobs:
-                wakeup_event.set()
+                self._jobs_wakeup_event.set()
+
+        async def task_updated_or_removed(event: Event) -> None:
+            event_ = cast("TaskUpdated | TaskRemoved", event)
+            self._task_cache.pop(event_.task_id, None)
 
         async with AsyncExitStack() as exit_stack:
             # Start the job executors
             for job_executor in self.job_executors.values():
                 await job_executor.start(exit_stack)
 
+            # Release any remaining finished jobs after all the jobs have ended
+            exit_stack.push_async_callback(self._flush_job_releases_on_exit)
+            self._job_releases_pending = anyio.Event()
+            self._job_releases_full = anyio.Event()
+
             task_group = await exit_stack.enter_async_context(create_task_group())
+            task_group.start_soon(self._process_job_releases)
 
             # Fetch new jobs every time
             exit_stack.enter_context(self.event_broker.subscribe(job_added, {JobAdded}))
 
+            # Cache task definitions until they're changed or removed
+            self._task_cache.clear()
+            self._job_batches.clear()
+            self._running_jobs_by_executor.clear()
+            exit_stack.enter_context(
+                self.event_broker.subscribe(
+                    task_updated_or_removed, {TaskUpdated, TaskRemoved}
+                )
+            )
+
+            # Data stores written against the older interface don't take executor
+            # limits, and they're pointless if none of the executors have a limit
+            pass_executor_limits = accepts_keyword(
+                self.data_store.acquire_jobs, "executor_limits"
+            ) and any(
+                job_executor.max_concurrent_jobs is not None
+                for job_executor in self.job_executors.values()
+            )
+
             # Signal that we are ready, and wait for the scheduler start event
             task_status.started()
             await self.get_next_event(SchedulerStarted)
 
             while self._state is RunState.started:
+                # Only acquire as many jobs as there are free slots in each executor
                 limit = self.max_concurrent_jobs - len(self._running_jobs)
-                if limit > 0:
-                    jobs = await self.data_store.acquire_jobs(self.identity, limit)
+                executor_limits: dict[str, int] = {}
+                for name, job_executor in self.job_executors.items():
+                    slots_left = limit
+                    if job_executor.max_concurrent_jobs is not None:
+                        running_jobs = self._running_jobs_by_executor.get(name, 0)
+                        slots_left = min(
+                            limit, job_executor.max_concurrent_jobs - running_jobs
+                        )
+
+                    if slots_left > 0:
+                        executor_limits[name] = slots_left
+
+                if executor_limits:
+                    if pass_executor_limits:
+                        jobs = await self.data_store.acquire_jobs(
+                            self.identity, limit, executor_limits=executor_limits
+                        )
+                    else:
+                        jobs = await self.data_store.acquire_jobs(self.identity, limit)
+
                     for job in jobs:
-                        task = await self.data_store.get_task(job.task_id)
+                        task = self._task_cache.get(job.task_id)
+                        if task is None:
+                            task = await self.data_store.get_task(job.task_id)
+                            self._task_cache[task.id] = task
+
                         self._running_jobs.add(job.id)
-                        task_group.start_soon(
-                            self._run_job, job, task.func, task.executor
+                        self._running_jobs_by_executor[task.executor] = (
+                            self._running_jobs_by_executor.get(task.executor, 0) + 1
                         )
+                        if task.batch_size:
+                            self._add_to_job_batch(task_group, task, job)
+                        else:
+                            task_group.start_soon(
+                                self._run_job, job, task.func, task.executor
+                            )
+
+                    # Run the partially filled batches that have no batch window
+                    for task_id, (task, batch) in list(self._job_batches.items()):
+                        if not task.batch_window:
+                            del self._job_batches[task_id]
+                            task_group.start_soon(self._run_job_batch, task, batch)
 
-                await wakeup_event.wait()
-                wakeup_event = anyio.Event()
+                await self._jobs_wakeup_event.wait()
+                self._jobs_wakeup_event = anyio.Event()
 
     async def _run_job(self, job: Job, func: Callable, executor: str) -> None:
         try:
@@ -710,10 +946,7 @@ class AsyncScheduler:
                     outcome=JobOutcome.missed_start_deadline,
                     finished_at=start_time,
                 )
-                await self.data_store.release_job(self.identity, job.task_id, result)
-                await self.event_broker.publish(
-                    JobReleased.from_result(result, self.identity)
-                )
+                self._release_job(job.task_id, result)
                 return
 
             try:
@@ -726,17 +959,11 @@ class AsyncScheduler:
                 retval = await job_executor.run_job(func, job)
             except get_cancelled_exc_class():
                 self.logger.info("Job %s was cancelled", job.id)
-                with CancelScope(shield=True):
-                    result = JobResult.from_job(
-                        job,
-                        outcome=JobOutcome.cancelled,
-                    )
-                    await self.data_store.release_job(
-                        self.identity, job.task_id, result
-                    )
-                    await self.event_broker.publish(
-                        JobReleased.from_result(result, self.identity)
-                    )
+                result = JobResult.from_job(
+                    job,
+                    outcome=JobOutcome.cancelled,
+                )
+                self._release_job(job.task_id, result)
             except BaseException as exc:
                 if isinstance(exc, Exception):
                     self.logger.exception("Job %s raised an exception", job.id)
@@ -750,14 +977,7 @@ class AsyncScheduler:
                     JobOutcome.error,
                     exception=exc,
                 )
-                await self.data_store.release_job(
-                    self.identity,
-                    job.task_id,
-                    result,
-                )
-                await self.event_broker.publish(
-                    JobReleased.from_result(result, self.identity)
-                )
+                self._release_job(job.task_id, result)
                 if not isinstance(exc, Exception):
                     raise
             else:
@@ -767,11 +987,168 @@ class AsyncScheduler:
                     JobOutcome.success,
                     return_value=retval,
                 )
-                await self.data_store.release_job(self.identity, job.task_id, result)
-                await self.event_broker.publish(
-                    JobReleased.from_result(result, self.identity)
-                )
+                self._release_job(job.task_id, result)
             finally:
                 current_job.reset(token)
         finally:
-            self._running_jobs.remove(job.id)
+            self._job_finished(job.id, executor)
+
+    def _add_to_job_batch(self, task_group: TaskGroup, task: Task, job: Job) -> None:
+        try:
+            batch = self._job_batches[task.id][1]
+        except KeyError:
+            batch = []
+            self._job_batches[task.id] = task, batch
+            if task.batch_window:
+                task_group.start_soon(self._run_job_batch_later, task, batch)
+
+        batch.append(job)
+        if len(batch) >= task.batch_size:
+            del self._job_batches[task.id]
+            task_group.start_soon(self._run_job_batch, task, batch)
+
+    async def _run_job_batch_later(self, task: Task, batch: list[Job]) -> None:
+        await sleep(task.batch_window.total_seconds())
+
+        # Only run the batch if it wasn't already run after filling up
+        if self._job_batches.get(task.id, (None, None))[1] is batch:
+            del self._job_batches[task.id]
+            await self._run_job_batch(task, batch)
+
+    async def _run_job_batch(self, task: Task, jobs: list[Job]) -> None:
+        try:
+            # Weed out the jobs that can't be run as a part of the batch
+            start_time = datetime.now(timezone.utc)
+            batch: list[Job] = []
+            for job in jobs:
+                if job.start_deadline is not None and start_time > job.start_deadline:
+                    result = JobResult.from_job(
+                        job,
+                        outcome=JobOutcome.missed_start_deadline,
+                        finished_at=start_time,
+                    )
+                    self._release_job(job.task_id, result)
+                elif job.kwargs:
+                    result = JobResult.from_job(
+                        job,
+                        JobOutcome.error,
+                        exception=TypeError(
+                            "Jobs of batched tasks cannot have keyword arguments"
+                        ),
+                    )
+                    self._release_job(job.task_id, result)
+                else:
+                    batch.append(job)
+
+            if not batch:
+                return
+
+            try:
+                job_executor = self.job_executors[task.executor]
+            except KeyError:
+                # Don't leave the jobs acquired when there is nothing to run them with
+                exc = LookupError(f"No such job executor: {task.executor}")
+                for job in batch:
+                    result = JobResult.from_job(job, JobOutcome.error, exception=exc)
+                    self._release_job(job.task_id, result)
+
+                return
+
+            # Run the task callable once, with the positional arguments of all the jobs
+            batch_job = Job(task_id=task.id, args=([job.args for job in batch],))
+            try:
+                retvals = list(await job_executor.run_job(task.func, batch_job))
+                if len(retvals) != len(batch):
+                    raise ValueError(
+                        f"Expected {len(batch)} return values from the batch, got "
+                        f"{len(retvals)} instead"
+                    )
+            except get_cancelled_exc_class():
+                self.logger.info("Batch of %d jobs was cancelled", len(batch))
+                for job in batch:
+                    result = JobResult.from_job(job, outcome=JobOutcome.cancelled)
+                    self._release_job(job.task_id, result)
+            except BaseException as exc:
+                if isinstance(exc, Exception):
+                    self.logger.exception(
+                        "Batch of %d jobs raised an exception", len(batch)
+                    )
+                else:
+                    self.logger.error(
+                        "Batch of %d jobs was aborted due to %s",
+                        len(batch),
+                        exc.__class__.__name__,
+                    )
+
+                for job in batch:
+                    result = JobResult.from_job(job, JobOutcome.error, exception=exc)
+                    self._release_job(job.task_id, result)
+
+                if not isinstance(exc, Exception):
+                    raise
+            else:
+                self.logger.info("Batch of %d jobs completed successfully", len(batch))
+                for job, retval in zip(batch, retvals):
+                    result = JobResult.from_job(
+                        job, JobOutcome.success, return_value=retval
+                    )
+                    self._release_job(job.task_id, result)
+        finally:
+            for job in jobs:
+                self._job_finished(job.id, task.executor)
+
+    def _job_finished(self, job_id: UUID, executor: str) -> None:
+        self._running_jobs.remove(job_id)
+        running_jobs = self._running_jobs_by_executor[executor]
+        self._running_jobs_by_executor[executor] = running_jobs - 1
+
+        # If the job occupied the last free slot in the scheduler or its executor, there
+        # may be jobs waiting in the data store that could not be acquired before. The
+        # executor may also have been removed while the job was running.
+        job_executor = self.job_executors.get(executor)
+        if len(self._running_jobs) + 1 == self.max_concurrent_jobs or (
+            job_executor is not None
+            and running_jobs == job_executor.max_concurrent_jobs
+        ):
+            self._jobs_wakeup_event.set()
+
+    def _release_job(self, task_id: str, result: JobResult) -> None:
+        # Finished jobs are released in batches by _process_job_releases()
+        self._job_releases.append((task_id, result))
+        self._job_releases_pending.set()
+        if len(self._job_releases) >= self.job_release_batch_size:
+            self._job_releases_full.set()
+
+    async def _process_job_releases(self) -> None:
+        while True:
+            # Wait for the first finished job, and then until either the batch is
+            # full or the release delay has passed
+            await self._job_releases_pending.wait()
+            with move_on_after(self.job_release_delay):
+                await self._job_releases_full.wait()
+
+            await self._flush_job_releases()
+
+    async def _flush_job_releases(self) -> None:
+        releases, self._job_releases = self._job_releases, []
+        self._job_releases_pending = anyio.Event()
+        self._job_releases_full = anyio.Event()
+        if releases:
+            # The releases have been taken out of the buffer, so they must not be lost
+            # to cancellation halfway through
+            with CancelScope(shield=True):
+                try:
+                    await self.data_store.release_jobs(self.identity, releases)
+                except BaseException:
+                    # Put the releases back, so the next flush can retry them
+                    self._job_releases[:0] = releases
+                    self._job_releases_pending.set()
+                    raise
+
+                for task_id, result in releases:
+                    await self.event_broker.publish(
+                        JobReleased.from_result(result, self.identity)
+                    )
+
+    async def _flush_job_releases_on_exit(self) -> None:
+        await self._flush_job_releases()
@@ -166,6 +166,7 @@ class Scheduler:
         misfire_grace_time: float | timedelta | None = None,
         max_jitter: float | timedelta | None = None,
         tags: Iterable[str] | None = None,
+        priority: int = 0,
         conflict_policy: ConflictPolicy = ConflictPolicy.do_nothing,
     ) -> str:
         self._ensure_services_ready()
@@ -182,6 +183,7 @@ class Scheduler:
                 misfire_grace_time=misfire_grace_time,
                 max_jitter=max_jitter,
                 tags=tags,
+                priority=priority,
                 conflict_policy=conflict_policy,
             )
         )
@@ -206,6 +208,7 @@ class Scheduler:
         kwargs: Mapping[str, Any] | None = None,
         job_executor: str | None = None,
         tags: Iterable[str] | None = None,
+        priority: int = 0,
         result_expiration_time: timedelta | float = 0,
     ) -> UUID:
         self._ensure_services_ready()
@@ -217,6 +220,32 @@ class Scheduler:
                 kwargs=kwargs,
                 job_executor=job_executor,
                 tags=tags,
+                priority=priority,
+                result_expiration_time=result_expiration_time,
+            )
+        )
+
+    def add_jobs(
+        self,
+        func_or_task_id: str | Callable,
+        args_list: Iterable[Iterable],
+        *,
+        kwargs: Mapping[str, Any] | None = None,
+        job_executor: str | None = None,
+        tags: Iterable[str] | None = None,
+        priority: int = 0,
+        result_expiration_time: timedelta | float = 0,
+    ) -> list[UUID]:
+        self._ensure_services_ready()
+        return self._portal.call(
+            partial(
+                self._async_scheduler.add_jobs,
+                func_or_task_id,
+                args_list,
+                kwargs=kwargs,
+                job_executor=job_executor,
+                tags=tags,
+                priority=priority,
                 result_expiration_time=result_expiration_time,
             )
         )
@@ -235,6 +264,7 @@ class Scheduler:
         kwargs: Mapping[str, Any] | None = None,
         job_executor: str | None = None,
         tags: Iterable[str] | None = (),
+        priority: int = 0,
     ) -> Any:
         self._ensure_services_ready()
         return self._portal.call(
@@ -245,6 +275,7 @@ class Scheduler:
                 kwargs=kwargs,
                 job_executor=job_executor,
                 tags=tags,
+                priority=priority,
             )
         )
 
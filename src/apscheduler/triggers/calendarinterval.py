@@ -121,6 +121,34 @@ class CalendarIntervalTrigger(Trigger):
                 self._last_fire_date = next_date
                 return next_time
 
+    def next_after(self, dt: datetime) -> datetime | None:
+        # Jump straight to the last date in the sequence that is earlier than the date
+        # of dt, and let next() find the exact fire time from there
+        previous_date = self._last_fire_date or self.start_date
+        target_date = dt.astimezone(self.timezone).date()
+        if not self.years and not self.months:
+            step = self.days + self.weeks * 7
+            skipped = (target_date - previous_date).days // step - 1
+            if skipped > 0:
+                self._last_fire_date = previous_date + timedelta(skipped * step)
+        elif not self.weeks and not self.days:
+            # The day of the month stays the same, but the dates where that day does
+            # not exist are skipped
+            step = self.years * 12 + self.months
+            previous_month = previous_date.year * 12 + previous_date.month - 1
+            target_month = target_date.year * 12 + target_date.month - 1
+            skipped = (target_month - previous_month) // step - 1
+            while skipped > 0:
+                year, month = divmod(previous_month + skipped * step, 12)
+                try:
+                    self._last_fire_date = date(year, month + 1, previous_date.day)
+                except ValueError:
+                    skipped -= 1
+                else:
+                    break
+
+        return super().next_after(dt)
+
     def __getstate__(self) -> dict[str, Any]:
         return {
             "version": 1,
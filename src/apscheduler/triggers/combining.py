@@ -33,6 +33,23 @@ class BaseCombiningTrigger(Trigger):
         ]
         self._next_fire_times = state["next_fire_times"]
 
+    def next_after(self, dt: datetime) -> datetime | None:
+        # Have each enclosed trigger skip past dt (unless its next fire time is already
+        # later than that), and then combine the fire times as usual
+        if self._next_fire_times:
+            self._next_fire_times = [
+                trigger.next_after(dt)
+                if fire_time is not None and fire_time <= dt
+                else fire_time
+                for trigger, fire_time in zip(self.triggers, self._next_fire_times)
+            ]
+        else:
+            self._next_fire_times = [
+                trigger.next_after(dt) for trigger in self.triggers
+            ]
+
+        return self.next()
+
 
 @attrs.define
 class AndTrigger(BaseCombiningTrigger):
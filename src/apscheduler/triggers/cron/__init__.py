@@ -17,11 +17,13 @@ from ...marshalling import (
 )
 from .fields import (
     DEFAULT_VALUES,
+    MIN_VALUES,
     BaseField,
     DayOfMonthField,
     DayOfWeekField,
     MonthField,
     WeekField,
+    next_masked_value,
 )
 
 
@@ -59,6 +61,13 @@ class CronTrigger(Trigger):
         ("minute", BaseField),
         ("second", BaseField),
     ]
+    #: positions of the real fields in the positional arguments of ``datetime()``
+    REAL_FIELD_POSITIONS: ClassVar[dict[int, int]] = {
+        fieldnum: position
+        for position, fieldnum in enumerate(
+            [i for i, (_, field_class) in enumerate(FIELDS_MAP) if field_class.real]
+        )
+    }
 
     year: int | str | None = None
     month: int | str | None = None
@@ -143,35 +152,23 @@ class CronTrigger(Trigger):
             actually incremented
         """
 
-        values = {}
-        i = 0
-        while i < len(self._fields):
-            field = self._fields[i]
-            if not field.real:
-                if i == fieldnum:
-                    fieldnum -= 1
-                    i -= 1
-                else:
-                    i += 1
-                continue
-
-            if i < fieldnum:
-                values[field.name] = field.get_value(dateval)
-                i += 1
-            elif i > fieldnum:
-                values[field.name] = field.get_min(dateval)
-                i += 1
-            else:
+        # Find the nearest field, starting from the given one, that can be incremented
+        # without overflowing
+        values = self._get_real_values(dateval)
+        while fieldnum >= 0:
+            field = self._fields[fieldnum]
+            if field.real:
                 value = field.get_value(dateval)
-                maxval = field.get_max(dateval)
-                if value == maxval:
-                    fieldnum -= 1
-                    i -= 1
-                else:
-                    values[field.name] = value + 1
-                    i += 1
+                if value != field.get_max(dateval):
+                    values[self.REAL_FIELD_POSITIONS[fieldnum]] = value + 1
+                    break
+
+            fieldnum -= 1
+        else:
+            return dateval, fieldnum
 
-        difference = datetime(**values) - dateval.replace(tzinfo=None)
+        self._reset_real_values(values, fieldnum)
+        difference = datetime(*values) - dateval.replace(tzinfo=None)
         dateval = datetime.fromtimestamp(
             dateval.timestamp() + difference.total_seconds(), self.timezone
         )
@@ -180,17 +177,28 @@ class CronTrigger(Trigger):
     def _set_field_value(
         self, dateval: datetime, fieldnum: int, new_value: int
     ) -> datetime:
-        values = {}
-        for i, field in enumerate(self._fields):
+        values = self._get_real_values(dateval)
+        values[self.REAL_FIELD_POSITIONS[fieldnum]] = new_value
+        self._reset_real_values(values, fieldnum)
+        return datetime(*values, tzinfo=self.timezone)
+
+    @staticmethod
+    def _get_real_values(dateval: datetime) -> list[int]:
+        return [
+            dateval.year,
+            dateval.month,
+            dateval.day,
+            dateval.hour,
+            dateval.minute,
+            dateval.second,
+        ]
+
+    def _reset_real_values(self, values: list[int], fieldnum: int) -> None:
+        """Reset the values of the real fields after ``fieldnum`` to their minimums."""
+        for i in range(fieldnum + 1, len(self._fields)):
+            field = self._fields[i]
             if field.real:
-                if i < fieldnum:
-                    values[field.name] = field.get_value(dateval)
-                elif i > fieldnum:
-                    values[field.name] = field.get_min(dateval)
-                else:
-                    values[field.name] = new_value
-
-        return datetime(**values, tzinfo=self.timezone)
+                values[self.REAL_FIELD_POSITIONS[i]] = MIN_VALUES[field.name]
 
     def next(self) -> datetime | None:
         if self._last_fire_time:
@@ -198,12 +206,36 @@ class CronTrigger(Trigger):
         else:
             start_time = self.start_time
 
+        return self._find_fire_time(start_time)
+
+    def next_after(self, dt: datetime) -> datetime | None:
+        if self._last_fire_time:
+            start_time = max(self._last_fire_time, dt) + timedelta(microseconds=1)
+        else:
+            start_time = max(self.start_time, dt + timedelta(microseconds=1))
+
+        return self._find_fire_time(start_time)
+
+    def _find_fire_time(self, start_time: datetime) -> datetime | None:
+        """
+        Find the earliest fire time at or after the given datetime and store it as the
+        last fire time.
+        """
+        fields = self._fields
         fieldnum = 0
         next_time = datetime_ceil(start_time).astimezone(self.timezone)
-        while 0 <= fieldnum < len(self._fields):
-            field = self._fields[fieldnum]
+        while 0 <= fieldnum < len(fields):
+            field = fields[fieldnum]
             curr_value = field.get_value(next_time)
-            next_value = field.get_next_value(next_time)
+            if field.mask is not None:
+                # Reuse the current value instead of letting the field look it up again
+                next_value = next_masked_value(
+                    field.mask,
+                    max(curr_value, MIN_VALUES[field.name]),
+                    field.get_max(next_time),
+                )
+            else:
+                next_value = field.get_next_value(next_time)
 
             if next_value is None:
                 # No valid value was found
@@ -231,6 +263,8 @@ class CronTrigger(Trigger):
             self._last_fire_time = next_time
             return next_time
 
+        return None
+
     def __getstate__(self) -> dict[str, Any]:
         return {
             "version": 1,
@@ -49,6 +49,15 @@ class AllExpression:
                 f"expression ({value_range})"
             )
 
+    def get_values(self, min_value: int, max_value: int) -> range | None:
+        """
+        Return all the values this expression matches within the given limits.
+
+        :return: the matching values, or ``None`` if they depend on the date
+
+        """
+        return range(min_value, max_value + 1, self.step or 1)
+
     def get_next_value(self, dateval: datetime, field) -> int | None:
         start = field.get_value(dateval)
         minval = field.get_min(dateval)
@@ -108,6 +117,11 @@ class RangeExpression(AllExpression):
                 f"expression ({value_range})"
             )
 
+    def get_values(self, min_value: int, max_value: int) -> range | None:
+        first = max(min_value, self.first)
+        last = min(max_value, self.last) if self.last is not None else max_value
+        return range(first, last + 1, self.step or 1)
+
     def get_next_value(self, date, field):
         startval = field.get_value(date)
         minval = field.get_min(date)
@@ -199,6 +213,9 @@ class WeekdayPositionExpression(AllExpression):
         except ValueError:
             raise ValueError(f"Invalid weekday name {weekday_name!r}") from None
 
+    def get_values(self, min_value: int, max_value: int) -> range | None:
+        return None
+
     def get_next_value(self, dateval: datetime, field) -> int | None:
         # Figure out the weekday of the month's first day and the number of days in that
         # month
@@ -232,6 +249,9 @@ class LastDayOfMonthExpression(AllExpression):
     def __init__(self):
         super().__init__(None)
 
+    def get_values(self, min_value: int, max_value: int) -> range | None:
+        return None
+
     def get_next_value(self, dateval: datetime, field):
         return monthrange(dateval.year, dateval.month)[1]
 
@@ -53,8 +53,26 @@ DEFAULT_VALUES = {
 SEPARATOR = re.compile(" *, *")
 
 
+def next_masked_value(mask: int, start: int, max_value: int) -> int | None:
+    """
+    Find the lowest value at or above ``start`` whose bit is set in the given mask.
+
+    :param mask: a bit mask as returned by :meth:`BaseField.compile_mask`
+    :param start: the lowest acceptable value
+    :param max_value: the highest acceptable value
+    :return: the value, or ``None`` if there is no such value up to ``max_value``
+
+    """
+    remaining = mask >> start
+    if not remaining:
+        return None
+
+    value = start + (remaining & -remaining).bit_length() - 1
+    return value if value <= max_value else None
+
+
 class BaseField:
-    __slots__ = "name", "expressions"
+    __slots__ = "name", "expressions", "mask"
 
     real: ClassVar[bool] = True
     compilers: ClassVar[Any] = (AllExpression, RangeExpression)
@@ -70,6 +88,34 @@ class BaseField:
         for expr in SEPARATOR.split(str(exprs).strip()):
             self.append_expression(expr)
 
+        self.mask = self.compile_mask()
+
+    def compile_mask(self) -> int | None:
+        """
+        Combine the values matched by all the expressions into a bit mask.
+
+        Bit ``n`` of the mask is set if the value ``n`` is matched by any of the
+        expressions.
+
+        :return: the bit mask, or ``None`` if the matched values depend on the date
+
+        """
+        mask = 0
+        min_value = MIN_VALUES[self.name]
+        max_value = MAX_VALUES[self.name]
+        for expr in self.expressions:
+            values = expr.get_values(min_value, max_value)
+            if values is None:
+                return None
+            elif values.step == 1:
+                if values:
+                    mask |= (1 << values.stop) - (1 << values.start)
+            else:
+                for value in values:
+                    mask |= 1 << value
+
+        return mask
+
     def get_min(self, dateval: datetime) -> int:
         return MIN_VALUES[self.name]
 
@@ -80,6 +126,10 @@ class BaseField:
         return getattr(dateval, self.name)
 
     def get_next_value(self, dateval: datetime) -> int | None:
+        if self.mask is not None:
+            start = max(self.get_value(dateval), self.get_min(dateval))
+            return next_masked_value(self.mask, start, self.get_max(dateval))
+
         smallest = None
         for expr in self.expressions:
             value = expr.get_next_value(dateval, self)
@@ -72,6 +72,54 @@ class IntervalTrigger(Trigger):
         else:
             return None
 
+    def next_after(self, dt: datetime) -> datetime | None:
+        if self._last_fire_time is None:
+            fire_time = self.start_time
+        else:
+            fire_time = self._last_fire_time + self._interval
+
+        if fire_time <= dt:
+            # The interval is added in wall clock time, so compute the number of
+            # intervals to skip in the time zone of the fire times
+            wall_clock_dt = dt.astimezone(fire_time.tzinfo).replace(tzinfo=None)
+            skipped = max(
+                (wall_clock_dt - fire_time.replace(tzinfo=None)) // self._interval, 0
+            )
+            fire_time += self._interval * skipped
+
+            # Correct for any UTC offset changes in between
+            while fire_time <= dt:
+                fire_time += self._interval
+                skipped += 1
+
+            while skipped > 0 and fire_time - self._interval > dt:
+                fire_time -= self._interval
+                skipped -= 1
+
+        self._last_fire_time = fire_time
+        if self.end_time is None or fire_time <= self.end_time:
+            return fire_time
+        else:
+            return None
+
+    def next_n(self, n: int) -> list[datetime]:
+        fire_times: list[datetime] = []
+        if n > 0:
+            first_fire_time = self.next()
+            if first_fire_time is not None:
+                fire_times = [first_fire_time + self._interval * i for i in range(n)]
+                if self.end_time is not None and fire_times[-1] > self.end_time:
+                    fire_times = [
+                        fire_time
+                        for fire_time in fire_times
+                        if fire_time <= self.end_time
+                    ]
+                    self._last_fire_time = fire_times[-1] + self._interval
+                else:
+                    self._last_fire_time = fire_times[-1]
+
+        return fire_times
+
     def __getstate__(self) -> dict[str, Any]:
         return {
             "version": 1,
@@ -117,6 +117,21 @@ def memory_store() -> DataStore:
     yield MemoryDataStore()
 
 
+@pytest.fixture
+def journaled_memory_store() -> DataStore:
+    from apscheduler.datastores.journaled import JournaledMemoryDataStore
+
+    with TemporaryDirectory("journaled_") as tempdir:
+        yield JournaledMemoryDataStore(path=tempdir)
+
+
+@pytest.fixture
+def sharded_store() -> DataStore:
+    from apscheduler.datastores.sharded import ShardedDataStore
+
+    yield ShardedDataStore([MemoryDataStore() for _ in range(3)])
+
+
 @pytest.fixture
 def mongodb_store() -> DataStore:
     from pymongo import MongoClient
@@ -127,6 +142,16 @@ def mongodb_store() -> DataStore:
         yield MongoDBDataStore(client, start_from_scratch=True)
 
 
+@pytest.fixture
+async def redis_store() -> DataStore:
+    from apscheduler.datastores.redis import RedisDataStore
+
+    datastore = RedisDataStore.from_url("redis://localhost:6379")
+    await datastore.client.flushdb()
+    yield datastore
+    await datastore.client.close()
+
+
 @pytest.fixture
 def sqlite_store() -> DataStore:
     from sqlalchemy.future import create_engine
@@ -141,6 +166,14 @@ def sqlite_store() -> DataStore:
             engine.dispose()
 
 
+@pytest.fixture
+def sqlite3_store() -> DataStore:
+    from apscheduler.datastores.sqlite import SQLiteDataStore
+
+    with TemporaryDirectory("sqlite_") as tempdir:
+        yield SQLiteDataStore(f"{tempdir}/test.db")
+
+
 @pytest.fixture
 def psycopg2_store() -> DataStore:
     from sqlalchemy import text
@@ -210,6 +243,11 @@ async def asyncmy_store() -> DataStore:
 
 @pytest.fixture(
     params=[
+        pytest.param(lazy_fixture("memory_store"), id="memory"),
+        pytest.param(lazy_fixture("journaled_memory_store"), id="journaled_memory"),
+        pytest.param(lazy_fixture("sharded_store"), id="sharded"),
+        pytest.param(lazy_fixture("sqlite_store"), id="sqlite"),
+        pytest.param(lazy_fixture("sqlite3_store"), id="sqlite3"),
         pytest.param(
             lazy_fixture("asyncpg_store"),
             id="asyncpg",
@@ -235,6 +273,11 @@ async def asyncmy_store() -> DataStore:
             id="mongodb",
             marks=[pytest.mark.external_service],
         ),
+        pytest.param(
+            lazy_fixture("redis_store"),
+            id="redis",
+            marks=[pytest.mark.external_service],
+        ),
     ]
 )
 async def raw_datastore(request: SubRequest) -> DataStore:
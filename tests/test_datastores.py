@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import shutil
+import threading
+import time
 from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from typing import AsyncGenerator
+from pathlib import Path
+from typing import Any, AsyncGenerator
 
 import anyio
 import pytest
@@ -11,13 +15,17 @@ from freezegun.api import FrozenDateTimeFactory
 
 from apscheduler import (
     CoalescePolicy,
+    ConflictingIdError,
     ConflictPolicy,
     Event,
     Job,
+    JobAdded,
+    JobDeserializationFailed,
     JobOutcome,
     JobResult,
     Schedule,
     ScheduleAdded,
+    ScheduleDeserializationFailed,
     ScheduleRemoved,
     ScheduleUpdated,
     Task,
@@ -152,6 +160,32 @@ async def test_replace_schedules(
     assert not events
 
 
+async def test_add_schedules_bulk(
+    datastore: DataStore, schedules: list[Schedule]
+) -> None:
+    async with capture_events(datastore, 4, {ScheduleAdded, ScheduleUpdated}) as events:
+        await datastore.add_schedules(schedules[:2], ConflictPolicy.exception)
+        with pytest.raises(ConflictingIdError):
+            await datastore.add_schedules(schedules[1:], ConflictPolicy.exception)
+
+        assert await datastore.get_schedules() == schedules[:2]
+
+        replacement = Schedule(id="s2", task_id="foo", trigger=schedules[1].trigger)
+        await datastore.add_schedules(
+            [replacement, schedules[2]], ConflictPolicy.replace
+        )
+        assert await datastore.get_schedules() == schedules
+        assert (await datastore.get_schedules({"s2"}))[0].task_id == "foo"
+
+    assert [type(event) for event in events] == [
+        ScheduleAdded,
+        ScheduleAdded,
+        ScheduleUpdated,
+        ScheduleAdded,
+    ]
+    assert [event.schedule_id for event in events] == ["s1", "s2", "s2", "s3"]
+
+
 async def test_remove_schedules(
     datastore: DataStore, schedules: list[Schedule]
 ) -> None:
@@ -222,6 +256,52 @@ async def test_acquire_release_schedules(
     assert not events
 
 
+@pytest.mark.freeze_time(datetime(2020, 9, 14, tzinfo=timezone.utc))
+async def test_process_due_schedules(
+    datastore: DataStore, schedules: list[Schedule]
+) -> None:
+    def create_jobs(schedules: list[Schedule]) -> list[Job]:
+        processed.extend(schedules)
+        jobs = [Job(task_id=schedule.task_id) for schedule in schedules]
+        schedules[0].next_fire_time = None
+        schedules[1].next_fire_time = datetime(2020, 9, 15, tzinfo=timezone.utc)
+        return jobs
+
+    await datastore.add_task(
+        Task(id="task1", func=asynccontextmanager, executor="async")
+    )
+    await datastore.add_task(
+        Task(id="task2", func=asynccontextmanager, executor="async")
+    )
+    for schedule in schedules:
+        await datastore.add_schedule(schedule, ConflictPolicy.exception)
+
+    processed: list[Schedule] = []
+    event_types = {JobAdded, ScheduleRemoved, ScheduleUpdated}
+    async with capture_events(datastore, 4, event_types) as events:
+        schedules = await datastore.process_due_schedules("dummy-id", 10, create_jobs)
+        assert [schedule.id for schedule in schedules] == ["s1", "s2"]
+        assert schedules == processed
+
+        # Nothing is due anymore, so the callback must not be called again
+        assert not await datastore.process_due_schedules("dummy-id", 10, create_jobs)
+        assert len(processed) == 2
+
+        assert [schedule.id for schedule in await datastore.get_schedules()] == [
+            "s2",
+            "s3",
+        ]
+        jobs = await datastore.get_jobs()
+        assert sorted(job.task_id for job in jobs) == ["task1", "task2"]
+
+    assert sorted(type(event).__name__ for event in events) == [
+        "JobAdded",
+        "JobAdded",
+        "ScheduleRemoved",
+        "ScheduleUpdated",
+    ]
+
+
 async def test_release_schedule_two_identical_fire_times(datastore: DataStore) -> None:
     """Regression test for #616."""
     for i in range(1, 3):
@@ -254,6 +334,26 @@ async def test_release_two_schedules_at_once(datastore: DataStore) -> None:
     assert len(remaining) == 2
 
 
+@pytest.mark.freeze_time(datetime(2020, 9, 14, tzinfo=timezone.utc))
+async def test_acquire_replaced_removed_schedules(
+    datastore: DataStore, schedules: list[Schedule]
+) -> None:
+    for schedule in schedules:
+        await datastore.add_schedule(schedule, ConflictPolicy.exception)
+
+    # Postpone the first schedule and remove the second one, leaving nothing due
+    trigger = DateTrigger(datetime(2020, 9, 16, tzinfo=timezone.utc))
+    schedule = Schedule(id="s1", task_id="task1", trigger=trigger)
+    schedule.next_fire_time = trigger.next()
+    await datastore.add_schedule(schedule, ConflictPolicy.replace)
+    await datastore.remove_schedules(["s2"])
+
+    assert not await datastore.acquire_schedules("dummy-id", 3)
+    assert await datastore.get_next_schedule_run_time() == datetime(
+        2020, 9, 16, tzinfo=timezone.utc
+    )
+
+
 async def test_acquire_schedules_lock_timeout(
     datastore: DataStore, schedules: list[Schedule], freezer
 ) -> None:
@@ -335,6 +435,49 @@ async def test_job_release_success(datastore: DataStore) -> None:
     assert not await datastore.get_job_result(acquired[0].id)
 
 
+async def test_release_jobs(datastore: DataStore) -> None:
+    for task_id in ("task1", "task2"):
+        await datastore.add_task(
+            Task(
+                id=task_id,
+                func=asynccontextmanager,
+                executor="async",
+                max_running_jobs=2,
+            )
+        )
+
+    jobs = [
+        Job(task_id="task1", result_expiration_time=timedelta(minutes=1)),
+        Job(task_id="task1"),
+        Job(task_id="task2", result_expiration_time=timedelta(minutes=1)),
+    ]
+    await datastore.add_jobs(jobs)
+    acquired = await datastore.acquire_jobs("worker_id")
+    assert len(acquired) == 3
+
+    await datastore.release_jobs(
+        "worker_id",
+        [
+            (job.task_id, JobResult.from_job(job, JobOutcome.success, return_value=i))
+            for i, job in enumerate(acquired)
+        ],
+    )
+
+    # Check that the jobs are gone and only the results meant to be kept are there
+    assert not await datastore.get_jobs()
+    results = {job.id: await datastore.get_job_result(job.id) for job in acquired}
+    assert {
+        job_id: result.return_value
+        for job_id, result in results.items()
+        if result is not None
+    } == {jobs[0].id: 0, jobs[2].id: 2}
+
+    # Check that the released jobs no longer count against the task limits
+    more_jobs = [Job(task_id="task1") for _ in range(2)]
+    await datastore.add_jobs(more_jobs)
+    assert len(await datastore.acquire_jobs("worker_id")) == 2
+
+
 async def test_job_release_failure(datastore: DataStore) -> None:
     await datastore.add_task(
         Task(id="task1", executor="async", func=asynccontextmanager)
@@ -479,6 +622,139 @@ async def test_acquire_jobs_max_number_exceeded(datastore: DataStore) -> None:
     assert [job.id for job in acquired_jobs] == [jobs[2].id]
 
 
+async def test_acquire_jobs_skip_saturated_task(datastore: DataStore) -> None:
+    await datastore.add_task(
+        Task(id="task1", func=asynccontextmanager, executor="async", max_running_jobs=1)
+    )
+    await datastore.add_task(
+        Task(id="task2", func=asynccontextmanager, executor="async")
+    )
+    jobs = [
+        Job(task_id="task1"),
+        Job(task_id="task2"),
+        Job(task_id="task1"),
+        Job(task_id="task2"),
+    ]
+    for job in jobs:
+        await datastore.add_job(job)
+
+    # The second job of task1 must be skipped without blocking the jobs of task2
+    acquired_jobs = await datastore.acquire_jobs("worker1", 4)
+    assert [job.id for job in acquired_jobs] == [jobs[0].id, jobs[1].id, jobs[3].id]
+
+    # Releasing the job of task1 should make its second job available
+    await datastore.release_job(
+        "worker1",
+        acquired_jobs[0].task_id,
+        JobResult.from_job(acquired_jobs[0], JobOutcome.success),
+    )
+    acquired_jobs = await datastore.acquire_jobs("worker1", 4)
+    assert [job.id for job in acquired_jobs] == [jobs[2].id]
+
+
+async def test_acquire_jobs_priority(datastore: DataStore) -> None:
+    from apscheduler.datastores.sharded import ShardedDataStore
+
+    if isinstance(datastore, ShardedDataStore):
+        pytest.skip("priorities are only honored within each shard")
+
+    await datastore.add_task(
+        Task(id="task1", func=asynccontextmanager, executor="async")
+    )
+    await datastore.add_task(
+        Task(id="task2", func=asynccontextmanager, executor="async")
+    )
+    jobs = [
+        Job(task_id="task1"),
+        Job(task_id="task2", priority=1),
+        Job(task_id="task1", priority=-1),
+        Job(task_id="task2", priority=-1),
+        Job(task_id="task1", priority=1),
+    ]
+    for job in jobs:
+        await datastore.add_job(job)
+
+    # Jobs are acquired in order of priority, and then in the order they were added
+    acquired_jobs = await datastore.acquire_jobs("worker1", 3)
+    assert [job.id for job in acquired_jobs] == [jobs[2].id, jobs[3].id, jobs[0].id]
+    assert [job.priority for job in acquired_jobs] == [-1, -1, 0]
+
+    acquired_jobs = await datastore.acquire_jobs("worker1")
+    assert [job.id for job in acquired_jobs] == [jobs[1].id, jobs[4].id]
+
+
+async def test_acquire_jobs_executor_limits(datastore: DataStore) -> None:
+    await datastore.add_task(
+        Task(id="task1", func=asynccontextmanager, executor="threadpool")
+    )
+    await datastore.add_task(
+        Task(id="task2", func=asynccontextmanager, executor="processpool")
+    )
+    await datastore.add_task(
+        Task(id="task3", func=asynccontextmanager, executor="async")
+    )
+    jobs = [
+        Job(task_id="task1"),
+        Job(task_id="task2"),
+        Job(task_id="task1"),
+        Job(task_id="task3"),
+        Job(task_id="task2"),
+    ]
+    for job in jobs:
+        await datastore.add_job(job)
+
+    # Only one threadpool job fits, and no processpool jobs at all
+    acquired_jobs = await datastore.acquire_jobs(
+        "worker1", 5, executor_limits={"threadpool": 1, "async": 5}
+    )
+    assert [job.id for job in acquired_jobs] == [jobs[0].id, jobs[3].id]
+
+    # The rest of the jobs are left for other workers
+    acquired_jobs = await datastore.acquire_jobs("worker2", 5)
+    assert [job.id for job in acquired_jobs] == [jobs[1].id, jobs[2].id, jobs[4].id]
+
+
+async def test_cleanup_expired_job_results(
+    datastore: DataStore, freezer: FrozenDateTimeFactory
+) -> None:
+    await datastore.add_task(
+        Task(id="task1", func=asynccontextmanager, executor="async")
+    )
+    jobs = [
+        Job(task_id="task1", result_expiration_time=timedelta(minutes=1)),
+        Job(task_id="task1", result_expiration_time=timedelta(minutes=3)),
+    ]
+    for job in jobs:
+        await datastore.add_job(job)
+
+    for job in await datastore.acquire_jobs("worker1", 2):
+        await datastore.release_job(
+            "worker1", job.task_id, JobResult.from_job(job, JobOutcome.success)
+        )
+
+    # Only the first result has expired by now
+    freezer.tick(120)
+    await datastore.cleanup()
+    assert not await datastore.get_job_result(jobs[0].id)
+    assert await datastore.get_job_result(jobs[1].id)
+
+
+async def test_add_jobs(datastore: DataStore) -> None:
+    await datastore.add_task(
+        Task(id="task1", func=asynccontextmanager, executor="async")
+    )
+    jobs = [Job(task_id="task1") for _ in range(3)]
+    async with capture_events(datastore, 3, {JobAdded}) as events:
+        await datastore.add_jobs(jobs)
+
+    assert [event.job_id for event in events] == [job.id for job in jobs]
+    assert sorted(await datastore.get_jobs(), key=lambda job: job.id) == sorted(
+        jobs, key=lambda job: job.id
+    )
+    acquired = await datastore.acquire_jobs("worker1")
+    assert {job.id for job in acquired} == {job.id for job in jobs}
+
+
 async def test_add_get_task(datastore: DataStore) -> None:
     with pytest.raises(TaskLookupError):
         await datastore.get_task("dummyid")
@@ -491,6 +767,22 @@ async def test_add_get_task(datastore: DataStore) -> None:
     assert task.func is asynccontextmanager
 
 
+async def test_task_batch_options(datastore: DataStore) -> None:
+    await datastore.add_task(
+        Task(
+            id="task1",
+            func=asynccontextmanager,
+            executor="async",
+            batch_size=10,
+            batch_window=0.05,
+        )
+    )
+    task = await datastore.get_task("task1")
+    assert task.batch_size == 10
+    assert task.batch_window == timedelta(milliseconds=50)
+    assert (await datastore.get_tasks())[0].batch_window == timedelta(milliseconds=50)
+
+
 async def test_cancel_start(
     raw_datastore: DataStore, local_broker: EventBroker
 ) -> None:
@@ -505,3 +797,551 @@ async def test_cancel_stop(raw_datastore: DataStore, local_broker: EventBroker)
         async with AsyncExitStack() as exit_stack:
             await raw_datastore.start(exit_stack, local_broker)
             scope.cancel()
+
+
+async def test_sqlalchemy_schema_upgrade(tmp_path: Path) -> None:
+    """
+    Test that the tables created with the version 1 schema are upgraded by adding the
+    columns and indexes introduced since.
+
+    """
+    from sqlalchemy import Column, MetaData, Table, inspect, text
+    from sqlalchemy.future import create_engine
+
+    from apscheduler.datastores.sqlalchemy import SCHEMA_VERSION, SQLAlchemyDataStore
+    from apscheduler.eventbrokers.local import LocalEventBroker
+
+    added_columns = {
+        ("tasks", "batch_size"),
+        ("tasks", "batch_window"),
+        ("schedules", "priority"),
+        ("jobs", "priority"),
+    }
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    try:
+        datastore = SQLAlchemyDataStore(engine)
+
+        # Create the tables without the added columns and without any indexes
+        old_metadata = MetaData()
+        for table in datastore._metadata.sorted_tables:
+            columns = [
+                Column(
+                    column.name,
+                    column.type,
+                    primary_key=column.primary_key,
+                    nullable=column.nullable,
+                    server_default=column.server_default,
+                )
+                for column in table.columns
+                if (table.name, column.name) not in added_columns
+            ]
+            Table(table.name, old_metadata, *columns)
+
+        with engine.begin() as conn:
+            old_metadata.create_all(conn)
+            conn.execute(text("INSERT INTO metadata (schema_version) VALUES (1)"))
+            conn.execute(
+                text(
+                    "INSERT INTO tasks (id, func, executor) "
+                    "VALUES ('task1', 'builtins:print', 'async')"
+                )
+            )
+
+        async with AsyncExitStack() as exit_stack:
+            event_broker = LocalEventBroker()
+            await event_broker.start(exit_stack)
+            await datastore.start(exit_stack, event_broker)
+            assert (await datastore.get_task("task1")).batch_size is None
+            await datastore.add_job(Job(task_id="task1", priority=-1))
+            jobs = await datastore.acquire_jobs("worker1")
+            assert [job.priority for job in jobs] == [-1]
+
+        with engine.begin() as conn:
+            version = conn.execute(text("SELECT schema_version FROM metadata")).scalar()
+            assert version == SCHEMA_VERSION
+            index_names = {index["name"] for index in inspect(conn).get_indexes("jobs")}
+            assert "ix_jobs_priority_created_at" in index_names
+    finally:
+        engine.dispose()
+
+
+async def test_sqlalchemy_retry_events(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that a retried transaction only publishes the events of the attempt that was
+    committed.
+
+    """
+    from sqlalchemy.future import create_engine
+    from tenacity import wait_none
+
+    from apscheduler import RetrySettings
+    from apscheduler.datastores.sqlalchemy import SQLAlchemyDataStore
+    from apscheduler.eventbrokers.local import LocalEventBroker
+
+    failures = [OSError("connection lost")]
+    release_schedules = SQLAlchemyDataStore._release_schedules
+
+    def fail_once(self: SQLAlchemyDataStore, *args: Any) -> None:
+        release_schedules(self, *args)
+        if failures:
+            raise failures.pop()
+
+    monkeypatch.setattr(SQLAlchemyDataStore, "_release_schedules", fail_once)
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    try:
+        datastore = SQLAlchemyDataStore(
+            engine, retry_settings=RetrySettings(wait=wait_none())
+        )
+        async with AsyncExitStack() as exit_stack:
+            event_broker = LocalEventBroker()
+            await event_broker.start(exit_stack)
+            await datastore.start(exit_stack, event_broker)
+            await datastore.add_task(Task(id="task1", func=print, executor="async"))
+            trigger = DateTrigger(datetime(2020, 9, 13, tzinfo=timezone.utc))
+            schedule = Schedule(id="s1", task_id="task1", trigger=trigger)
+            schedule.next_fire_time = trigger.next()
+            await datastore.add_schedule(schedule, ConflictPolicy.exception)
+
+            def create_jobs(schedules: list[Schedule]) -> list[Job]:
+                jobs = []
+                for schedule in schedules:
+                    schedule.next_fire_time = schedule.trigger.next()
+                    jobs.append(Job(task_id="task1", schedule_id=schedule.id))
+
+                return jobs
+
+            events: list[Event] = []
+            event_broker.subscribe(events.append, {JobAdded, ScheduleRemoved})
+            await datastore.process_due_schedules("scheduler1", 10, create_jobs)
+            await anyio.sleep(0.2)
+            jobs = await datastore.get_jobs()
+    finally:
+        engine.dispose()
+
+    assert not failures
+    assert len(jobs) == 1
+    assert [type(event) for event in events] == [JobAdded, ScheduleRemoved]
+    assert events[0].job_id == jobs[0].id
+
+
+async def test_sqlalchemy_poll_changes(tmp_path: Path) -> None:
+    """
+    Test that a job added via another SQLAlchemy data store on the same database is
+    announced to the local event broker.
+
+    """
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from apscheduler.datastores.sqlalchemy import SQLAlchemyDataStore
+    from apscheduler.eventbrokers.local import LocalEventBroker
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db", future=True)
+    try:
+        async with AsyncExitStack() as exit_stack:
+            datastores = []
+            for _ in range(2):
+                datastore = SQLAlchemyDataStore(engine, max_poll_time=0.1)
+                event_broker = LocalEventBroker()
+                await event_broker.start(exit_stack)
+                await datastore.start(exit_stack, event_broker)
+                datastores.append(datastore)
+
+            await datastores[0].add_task(
+                Task(id="task_id", func=print, executor="async")
+            )
+            async with capture_events(datastores[1], 1, {JobAdded}) as events:
+                job = Job(task_id="task_id")
+                await datastores[0].add_job(job)
+    finally:
+        await engine.dispose()
+
+    assert isinstance(events[0], JobAdded)
+    assert events[0].job_id == job.id
+
+
+async def test_memory_ready_tasks_bounded(local_broker: EventBroker) -> None:
+    """
+    Test that the queue of tasks with jobs ready for acquisition holds one entry per
+    task, no matter how often the task is reactivated.
+
+    """
+    from apscheduler.datastores.memory import MemoryDataStore
+
+    datastore = MemoryDataStore()
+    async with AsyncExitStack() as exit_stack:
+        await local_broker.start(exit_stack)
+        await datastore.start(exit_stack, local_broker)
+        task = Task(id="task1", func=print, executor="async")
+        await datastore.add_task(task)
+        await datastore.add_jobs([Job(task_id="task1") for _ in range(200)])
+
+        # Replacing the task reactivates it
+        for _ in range(100):
+            await datastore.add_task(task)
+
+        assert len(datastore._ready_tasks) == 1
+
+        # So does releasing a job
+        for _ in range(100):
+            job = (await datastore.acquire_jobs("worker1", 1))[0]
+            result = JobResult.from_job(job, JobOutcome.success, return_value=None)
+            await datastore.release_job("worker1", "task1", result)
+
+        assert len(datastore._ready_tasks) == 1
+
+        # A job with a higher priority supersedes the task's queue entry
+        high_priority_job = Job(task_id="task1", priority=-1)
+        await datastore.add_job(high_priority_job)
+        acquired = await datastore.acquire_jobs("worker1", 1)
+        assert [job.id for job in acquired] == [high_priority_job.id]
+        assert len(await datastore.acquire_jobs("worker1")) == 100
+        assert not datastore._ready_tasks
+
+
+@pytest.mark.parametrize("crash", [False, True], ids=["snapshot", "journal"])
+async def test_journaled_memory_recovery(tmp_path: Path, crash: bool) -> None:
+    """
+    Test that the contents of a journaled memory data store survive a restart, whether
+    it was stopped cleanly (snapshot) or not (journal).
+
+    """
+    from apscheduler.datastores.journaled import JournaledMemoryDataStore
+    from apscheduler.eventbrokers.local import LocalEventBroker
+
+    path = tmp_path / "datastore"
+    trigger = DateTrigger(datetime(2020, 9, 13, tzinfo=timezone.utc))
+    schedule = Schedule(id="s1", task_id="task1", trigger=trigger)
+    jobs = [
+        Job(task_id="task1", result_expiration_time=timedelta(minutes=1))
+        for _ in range(3)
+    ]
+    async with AsyncExitStack() as exit_stack:
+        datastore = JournaledMemoryDataStore(path=path, sync_interval=0.01)
+        event_broker = LocalEventBroker()
+        await event_broker.start(exit_stack)
+        await datastore.start(exit_stack, event_broker)
+        await datastore.add_task(Task(id="task1", func=print, executor="async"))
+        await datastore.add_schedule(schedule, ConflictPolicy.exception)
+        await datastore.add_jobs(jobs)
+
+        # Finish the first job, and leave the second one running
+        acquired = await datastore.acquire_jobs("worker_id", 1)
+        await datastore.release_job(
+            "worker_id",
+            "task1",
+            JobResult.from_job(acquired[0], JobOutcome.success, return_value="foo"),
+        )
+        await datastore.acquire_jobs("worker_id", 1)
+        if crash:
+            # Copy the files as they are while the data store is still running
+            await anyio.sleep(0.1)
+            shutil.copytree(path, tmp_path / "crashed")
+            path = tmp_path / "crashed"
+
+    async with AsyncExitStack() as exit_stack:
+        datastore = JournaledMemoryDataStore(path=path)
+        event_broker = LocalEventBroker()
+        await event_broker.start(exit_stack)
+        await datastore.start(exit_stack, event_broker)
+        assert [task.id for task in await datastore.get_tasks()] == ["task1"]
+        assert [schedule.id for schedule in await datastore.get_schedules()] == ["s1"]
+        assert [job.id for job in await datastore.get_jobs()] == [
+            jobs[1].id,
+            jobs[2].id,
+        ]
+
+        result = await datastore.get_job_result(jobs[0].id)
+        assert result.return_value == "foo"
+
+        # The claim on the job that was running is not retained
+        acquired = await datastore.acquire_jobs("worker_id")
+        assert [job.id for job in acquired] == [jobs[1].id, jobs[2].id]
+
+
+async def test_journaled_memory_unpicklable_job(tmp_path: Path) -> None:
+    """
+    Test that a job that cannot be pickled is rejected by add_job(), without affecting
+    the persistence of the other jobs.
+
+    """
+    from apscheduler.datastores.journaled import JournaledMemoryDataStore
+    from apscheduler.eventbrokers.local import LocalEventBroker
+
+    job = Job(task_id="task1")
+    async with AsyncExitStack() as exit_stack:
+        datastore = JournaledMemoryDataStore(path=tmp_path, sync_interval=0.01)
+        event_broker = LocalEventBroker()
+        await event_broker.start(exit_stack)
+        await datastore.start(exit_stack, event_broker)
+        await datastore.add_task(Task(id="task1", func=print, executor="async"))
+        with pytest.raises(TypeError):
+            await datastore.add_job(Job(task_id="task1", args=(threading.Lock(),)))
+
+        await datastore.add_job(job)
+        assert [job.id for job in await datastore.get_jobs()] == [job.id]
+
+    async with AsyncExitStack() as exit_stack:
+        datastore = JournaledMemoryDataStore(path=tmp_path)
+        event_broker = LocalEventBroker()
+        await event_broker.start(exit_stack)
+        await datastore.start(exit_stack, event_broker)
+        assert [job.id for job in await datastore.get_jobs()] == [job.id]
+
+
+@pytest.mark.freeze_time(datetime(2020, 9, 14, tzinfo=timezone.utc))
+async def test_sharded_routing(local_broker: EventBroker) -> None:
+    """
+    Test that the jobs of each task are kept on the task's shard, even when they are
+    created by schedules stored on other shards.
+
+    """
+    from apscheduler.datastores.memory import MemoryDataStore
+    from apscheduler.datastores.sharded import ShardedDataStore
+
+    def create_jobs(schedules: list[Schedule]) -> list[Job]:
+        for schedule in schedules:
+            schedule.next_fire_time = None
+
+        return [Job(task_id=schedule.task_id) for schedule in schedules]
+
+    shards = [MemoryDataStore() for _ in range(4)]
+    async with AsyncExitStack() as exit_stack:
+        await local_broker.start(exit_stack)
+        datastore = ShardedDataStore(shards)
+        await datastore.start(exit_stack, local_broker)
+        await datastore.add_task(
+            Task(
+                id="task1",
+                func=asynccontextmanager,
+                executor="async",
+                max_running_jobs=5,
+            )
+        )
+        await datastore.add_task(
+            Task(id="task2", func=asynccontextmanager, executor="async")
+        )
+        for i in range(20):
+            trigger = DateTrigger(datetime(2020, 9, 13, tzinfo=timezone.utc))
+            schedule = Schedule(id=f"s{i}", task_id=f"task{i % 2 + 1}", trigger=trigger)
+            schedule.next_fire_time = trigger.next()
+            await datastore.add_schedule(schedule, ConflictPolicy.exception)
+
+        # The schedules are spread over all the shards
+        assert all([await shard.get_schedules() for shard in shards])
+
+        schedules = await datastore.process_due_schedules("dummy-id", 100, create_jobs)
+        assert len(schedules) == 20
+        assert not await datastore.get_schedules()
+        for shard in shards:
+            task_ids = {task.id for task in await shard.get_tasks()}
+            jobs = await shard.get_jobs()
+            assert len(jobs) == 10 * len(task_ids)
+            assert {job.task_id for job in jobs} == task_ids
+
+        # The job executor limit and the task's limit on running jobs still apply
+        acquired = await datastore.acquire_jobs(
+            "worker1", executor_limits={"async": 12}
+        )
+        assert len(acquired) == 12
+        acquired += await datastore.acquire_jobs("worker2")
+        assert sum(job.task_id == "task1" for job in acquired) == 5
+        assert sum(job.task_id == "task2" for job in acquired) == 10
+
+
+@pytest.mark.external_service
+async def test_redis_acquire_deserialization_failure(
+    redis_store: DataStore, local_broker: EventBroker
+) -> None:
+    """
+    Test that schedules and jobs that fail to deserialize are skipped when acquiring,
+    without affecting the rest, and that the claims on such jobs are released.
+
+    """
+    async with AsyncExitStack() as exit_stack:
+        await local_broker.start(exit_stack)
+        await redis_store.start(exit_stack, local_broker)
+        await redis_store.add_task(Task(id="task1", func=print, executor="async"))
+        jobs = [Job(task_id="task1"), Job(task_id="task1")]
+        await redis_store.add_jobs(jobs)
+        schedules = []
+        for schedule_id in ("s1", "s2"):
+            trigger = DateTrigger(datetime(2020, 9, 13, tzinfo=timezone.utc))
+            schedule = Schedule(id=schedule_id, task_id="task1", trigger=trigger)
+            schedule.next_fire_time = trigger.next()
+            schedules.append(schedule)
+
+        await redis_store.add_schedules(schedules, ConflictPolicy.exception)
+        await redis_store.client.hset(
+            redis_store._key("job", str(jobs[0].id)), "args", b"garbage"
+        )
+        await redis_store.client.hset(
+            redis_store._key("schedule", "s1"), "trigger", b"garbage"
+        )
+
+        event_types = {JobDeserializationFailed, ScheduleDeserializationFailed}
+        async with capture_events(redis_store, 2, event_types) as events:
+            acquired_jobs = await redis_store.acquire_jobs("worker1")
+            acquired_schedules = await redis_store.acquire_schedules("scheduler1", 2)
+
+        assert [job.id for job in acquired_jobs] == [jobs[1].id]
+        assert [schedule.id for schedule in acquired_schedules] == ["s2"]
+        assert isinstance(events[0], JobDeserializationFailed)
+        assert events[0].job_id == jobs[0].id
+        assert isinstance(events[1], ScheduleDeserializationFailed)
+        assert events[1].schedule_id == "s1"
+
+        # The failed job was returned to the queue, and the task's running job counter
+        # only accounts for the acquired job
+        assert (
+            await redis_store.client.hget(
+                redis_store._key("job", str(jobs[0].id)), "acquired_by"
+            )
+            == b""
+        )
+        assert (
+            await redis_store.client.hget(
+                redis_store._key("task", "task1"), "running_jobs"
+            )
+            == b"1"
+        )
+        async with capture_events(redis_store, 1, event_types):
+            assert await redis_store.acquire_jobs("worker1") == []
+
+
+@pytest.mark.external_service
+async def test_mongodb_watch_changes() -> None:
+    """
+    Test that a job added via another MongoDB data store on the same database is
+    announced to the local event broker through the change stream.
+
+    """
+    pytest.importorskip("pymongo")
+    from pymongo import MongoClient
+
+    from apscheduler.datastores.mongodb import MongoDBDataStore
+    from apscheduler.eventbrokers.local import LocalEventBroker
+
+    with MongoClient(tz_aware=True, serverSelectionTimeoutMS=1000) as client:
+        async with AsyncExitStack() as exit_stack:
+            datastores = []
+            for i in range(2):
+                datastore = MongoDBDataStore(client, start_from_scratch=i == 0)
+                event_broker = LocalEventBroker()
+                await event_broker.start(exit_stack)
+                await datastore.start(exit_stack, event_broker)
+                datastores.append(datastore)
+
+            if not datastores[0]._supports_transactions:
+                pytest.skip("change streams require a replica set")
+
+            await datastores[0].add_task(
+                Task(id="task_id", func=print, executor="async")
+            )
+            async with capture_events(datastores[1], 1, {JobAdded}) as events:
+                job = Job(task_id="task_id")
+                await datastores[0].add_job(job)
+
+    assert isinstance(events[0], JobAdded)
+    assert events[0].job_id == job.id
+
+
+async def test_mongodb_watch_changes_cancel() -> None:
+    """
+    Test that the change stream is only closed after the thread polling it has
+    returned, when the watcher is cancelled.
+
+    """
+    pytest.importorskip("pymongo")
+    from pymongo import MongoClient
+
+    from apscheduler.datastores.mongodb import MongoDBDataStore
+
+    calls: list[str] = []
+
+    class FakeChangeStream:
+        resume_token = None
+
+        def __enter__(self) -> FakeChangeStream:
+            return self
+
+        def __exit__(self, *exc_info: object) -> None:
+            calls.append("close")
+
+        def try_next(self) -> None:
+            time.sleep(0.2)
+            calls.append("try_next")
+
+    with MongoClient(connect=False) as client:
+        datastore = MongoDBDataStore(client)
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(datastore._watch_changes, FakeChangeStream())
+            await anyio.sleep(0.1)
+            tg.cancel_scope.cancel()
+
+    assert calls == ["try_next", "close"]
+
+
+@pytest.mark.external_service
+async def test_mongodb_concurrent_schedule_processing() -> None:
+    """
+    Test that two schedulers can process the same due schedules concurrently, with the
+    transactions that conflict with each other being retried.
+
+    """
+    pytest.importorskip("pymongo")
+    from pymongo import MongoClient
+
+    from apscheduler.datastores.mongodb import MongoDBDataStore
+    from apscheduler.eventbrokers.local import LocalEventBroker
+
+    def create_jobs(schedules: list[Schedule]) -> list[Job]:
+        for schedule in schedules:
+            schedule.next_fire_time = None
+
+        return [
+            Job(task_id=schedule.task_id, schedule_id=schedule.id)
+            for schedule in schedules
+        ]
+
+    async def process_schedules(datastore: DataStore, scheduler_id: str) -> None:
+        while True:
+            schedules = await datastore.process_due_schedules(
+                scheduler_id, 10, create_jobs
+            )
+            if not schedules:
+                return
+
+            processed.extend(schedule.id for schedule in schedules)
+
+    processed: list[str] = []
+    with MongoClient(tz_aware=True, serverSelectionTimeoutMS=1000) as client:
+        async with AsyncExitStack() as exit_stack:
+            datastores = []
+            for i in range(2):
+                datastore = MongoDBDataStore(client, start_from_scratch=i == 0)
+                event_broker = LocalEventBroker()
+                await event_broker.start(exit_stack)
+                await datastore.start(exit_stack, event_broker)
+                datastores.append(datastore)
+
+            if not datastores[0]._supports_transactions:
+                pytest.skip("transactions require a replica set")
+
+            for i in range(100):
+                trigger = DateTrigger(datetime(2020, 9, 13, tzinfo=timezone.utc))
+                schedule = Schedule(id=f"s{i}", task_id="task1", trigger=trigger)
+                schedule.next_fire_time = trigger.next()
+                await datastores[0].add_schedule(schedule, ConflictPolicy.exception)
+
+            async with anyio.create_task_group() as tg:
+                for i, datastore in enumerate(datastores):
+                    tg.start_soon(process_schedules, datastore, f"scheduler{i}")
+
+            # Every schedule was processed exactly once
+            assert sorted(processed) == sorted(f"s{i}" for i in range(100))
+            jobs = await datastores[0].get_jobs()
+            assert sorted(job.schedule_id for job in jobs) == sorted(processed)
+            assert not await datastores[0].get_schedules()
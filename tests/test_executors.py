@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+import sys
+from contextlib import AsyncExitStack
+from functools import partial
+from pathlib import Path
+
+import anyio
+import pytest
+
+from apscheduler import Job
+from apscheduler.executors.subprocess import MappedReturnValue, ProcessPoolJobExecutor
+from apscheduler.schedulers.async_ import AsyncScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+def fail() -> None:
+    raise ValueError("failing as requested")
+
+
+def make_bytes(size: int) -> bytes:
+    return b"x" * size
+
+
+def is_module_loaded(modulename: str) -> bool:
+    return modulename in sys.modules
+
+
+class Greeter:
+    def __init__(self, name: str):
+        self.name = name
+
+    def greet(self) -> str:
+        return f"hi {self.name}"
+
+
+class TestProcessPoolJobExecutor:
+    async def test_run_job(self) -> None:
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(max_workers=1)
+            await executor.start(exit_stack)
+            job = Job(task_id="task", args=(3, 2))
+            assert await executor.run_job(pow, job) == 9
+
+    async def test_run_job_pickled(self) -> None:
+        """Test that callables that cannot be referenced are pickled instead."""
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(max_workers=1)
+            await executor.start(exit_stack)
+            job = Job(task_id="task", args=(3,))
+            assert await executor.run_job(partial(pow, 2), job) == 8
+
+    async def test_run_job_bound_method(self) -> None:
+        """Test that methods bound to instances are pickled along with the instance."""
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(max_workers=1)
+            await executor.start(exit_stack)
+            job = Job(task_id="task")
+            assert await executor.run_job(Greeter("bob").greet, job) == "hi bob"
+
+    async def test_run_job_error(self) -> None:
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(max_workers=1)
+            await executor.start(exit_stack)
+            with pytest.raises(ValueError, match="failing as requested"):
+                await executor.run_job(fail, Job(task_id="task"))
+
+            # The worker process should still be usable
+            assert await executor.run_job(pow, Job(task_id="task", args=(3, 2))) == 9
+
+    @pytest.mark.parametrize(
+        "max_tasks_per_child, expected_pid_count",
+        [pytest.param(None, 1, id="reuse"), pytest.param(2, 2, id="recycle")],
+    )
+    async def test_max_tasks_per_child(
+        self, max_tasks_per_child: int | None, expected_pid_count: int
+    ) -> None:
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(
+                max_workers=1, max_tasks_per_child=max_tasks_per_child
+            )
+            await executor.start(exit_stack)
+            job = Job(task_id="task")
+            pids = {await executor.run_job(os.getpid, job) for _ in range(4)}
+            assert len(pids) == expected_pid_count
+            assert os.getpid() not in pids
+
+    async def test_preload(self) -> None:
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(
+                max_workers=1, preload=["xml.dom.minidom", "email.mime.text:MIMEText"]
+            )
+            await executor.start(exit_stack)
+            for modulename in "xml.dom.minidom", "email.mime.text":
+                job = Job(task_id="task", args=(modulename,))
+                assert await executor.run_job(is_module_loaded, job)
+
+    @pytest.mark.parametrize(
+        "size, result_expiration_time, mapped",
+        [
+            pytest.param(100, 60, False, id="small"),
+            pytest.param(1000, 60, True, id="large"),
+            pytest.param(1000, 0, False, id="discarded"),
+        ],
+    )
+    async def test_mmap_threshold(
+        self, tmp_path: Path, size: int, result_expiration_time: float, mapped: bool
+    ) -> None:
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(
+                max_workers=1, mmap_threshold=500, mmap_dir=str(tmp_path)
+            )
+            await executor.start(exit_stack)
+            job = Job(
+                task_id="task",
+                args=(size,),
+                result_expiration_time=result_expiration_time,
+            )
+            retval = await executor.run_job(make_bytes, job)
+
+        if mapped:
+            assert isinstance(retval, MappedReturnValue)
+            assert Path(retval.path).parent == tmp_path
+            assert retval.load() == b"x" * size
+            assert not Path(retval.path).exists()
+        else:
+            assert retval == b"x" * size
+            assert not list(tmp_path.iterdir())
+
+    async def test_mmap_load_twice(self, tmp_path: Path) -> None:
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(
+                max_workers=1, mmap_threshold=0, mmap_dir=str(tmp_path)
+            )
+            await executor.start(exit_stack)
+            job = Job(task_id="task", args=(10,), result_expiration_time=60)
+            retval = await executor.run_job(make_bytes, job)
+
+        assert retval.load() == b"x" * 10
+        with pytest.raises(FileNotFoundError, match="already been loaded"):
+            retval.load()
+
+    async def test_mmap_cleanup(self, tmp_path: Path) -> None:
+        expired_path = tmp_path / "apscheduler-1000000000-abcdefgh.pickle"
+        expired_path.touch()
+        unrelated_path = tmp_path / "unrelated.pickle"
+        unrelated_path.touch()
+        async with AsyncExitStack() as exit_stack:
+            executor = ProcessPoolJobExecutor(
+                max_workers=1,
+                mmap_threshold=0,
+                mmap_dir=str(tmp_path),
+                mmap_cleanup_interval=0.1,
+            )
+            await executor.start(exit_stack)
+            job = Job(task_id="task", args=(10,), result_expiration_time=60)
+            retval = await executor.run_job(make_bytes, job)
+            await anyio.sleep(0.3)
+
+            # Only the file of the expired result was deleted
+            assert not expired_path.exists()
+            assert unrelated_path.exists()
+            assert Path(retval.path).exists()
+
+            # The file of a result that expires right away is deleted on the next purge
+            job = Job(task_id="task", args=(10,), result_expiration_time=0.001)
+            retval = await executor.run_job(make_bytes, job)
+            with anyio.fail_after(5):
+                while Path(retval.path).exists():
+                    await anyio.sleep(0.1)
+
+    async def test_mmap_get_job_result(self, tmp_path: Path) -> None:
+        executor = ProcessPoolJobExecutor(mmap_threshold=0, mmap_dir=str(tmp_path))
+        async with AsyncScheduler(job_executors={"processpool": executor}) as scheduler:
+            await scheduler.start_in_background()
+            assert await scheduler.run_job(make_bytes, args=(1000,)) == b"x" * 1000
+
+        assert not list(tmp_path.iterdir())
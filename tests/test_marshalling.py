@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import gc
 import sys
+import weakref
 from datetime import timedelta
 from functools import partial
 from types import ModuleType
@@ -51,6 +53,13 @@ class TestCallableToRef:
         exc = pytest.raises(SerializationError, callable_to_ref, obj)
         assert str(exc.value) == error
 
+    def test_unhashable_callable(self):
+        class UnhashableCallable(DummyClass):
+            __hash__ = None  # type: ignore[assignment]
+
+        exc = pytest.raises(SerializationError, callable_to_ref, UnhashableCallable())
+        assert str(exc.value) == "Callable has no __qualname__ attribute"
+
     def test_nested_function_error(self):
         def nested():
             pass
@@ -86,6 +95,16 @@ class TestCallableToRef:
     def test_valid_refs(self, input, expected):
         assert callable_to_ref(input) == expected
 
+    def test_bound_method_not_retained(self):
+        instance = DummyClass()
+        assert callable_to_ref(instance.meth) == "test_marshalling:DummyClass.meth"
+
+        # The instance must not be kept alive by the reference cache
+        instance_ref = weakref.ref(instance)
+        del instance
+        gc.collect()
+        assert instance_ref() is None
+
 
 class TestCallableFromRef:
     def test_valid_ref(self):
@@ -105,6 +124,18 @@ class TestCallableFromRef:
         sys.modules["pkg1.pkg2"] = pkg2
         assert callable_from_ref("pkg1.pkg2:varname") == pkg2.varname
 
+    def test_module_replaced(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        module = ModuleType("dummymodule")
+        module.func = lambda: None
+        monkeypatch.setitem(sys.modules, "dummymodule", module)
+        assert callable_from_ref("dummymodule:func") is module.func
+
+        # Replacing the module (as happens on reload) invalidates the cached reference
+        new_module = ModuleType("dummymodule")
+        new_module.func = lambda: None
+        monkeypatch.setitem(sys.modules, "dummymodule", new_module)
+        assert callable_from_ref("dummymodule:func") is new_module.func
+
     @pytest.mark.parametrize(
         "input,error",
         [(object(), TypeError), ("module", ValueError), ("module:blah", LookupError)],
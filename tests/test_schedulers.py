@@ -7,11 +7,13 @@ from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
 import anyio
+import attrs
 import pytest
 from anyio import fail_after
 from pytest_mock import MockerFixture
 
 from apscheduler import (
+    CoalescePolicy,
     Event,
     Job,
     JobAdded,
@@ -24,6 +26,7 @@ from apscheduler import (
     ScheduleRemoved,
     SchedulerStarted,
     SchedulerStopped,
+    ScheduleUpdated,
     Task,
     TaskAdded,
     current_async_scheduler,
@@ -31,6 +34,9 @@ from apscheduler import (
     current_scheduler,
 )
 from apscheduler._enums import SchedulerRole
+from apscheduler.abc import Trigger
+from apscheduler.datastores.memory import MemoryDataStore
+from apscheduler.executors.thread import ThreadPoolJobExecutor
 from apscheduler.schedulers.async_ import AsyncScheduler
 from apscheduler.schedulers.sync import Scheduler
 from apscheduler.triggers.date import DateTrigger
@@ -52,6 +58,10 @@ async def dummy_async_job(delay: float = 0, fail: bool = False) -> str:
         return "returnvalue"
 
 
+class SteppingIntervalTrigger(IntervalTrigger):
+    next_after = Trigger.next_after
+
+
 def dummy_sync_job(delay: float = 0, fail: bool = False) -> str:
     time.sleep(delay)
     if fail:
@@ -111,6 +121,19 @@ class TestAsyncScheduler:
         # There should be no more events on the list
         assert not received_events
 
+    async def test_schedule_priority(self) -> None:
+        event = anyio.Event()
+        trigger = DateTrigger(datetime.now(timezone.utc))
+        async with AsyncScheduler(role=SchedulerRole.scheduler) as scheduler:
+            scheduler.event_broker.subscribe(lambda evt: event.set(), {JobAdded})
+            await scheduler.add_schedule(dummy_async_job, trigger, priority=-3)
+            await scheduler.start_in_background()
+            with fail_after(3):
+                await event.wait()
+
+            jobs = await scheduler.data_store.get_jobs()
+            assert [job.priority for job in jobs] == [-3]
+
     async def test_add_get_schedule(self) -> None:
         async with AsyncScheduler(role=SchedulerRole.scheduler) as scheduler:
             with pytest.raises(ScheduleLookupError):
@@ -188,6 +211,70 @@ class TestAsyncScheduler:
             )
             assert jobs[0].original_scheduled_time == orig_start_time
 
+    @pytest.mark.parametrize(
+        "coalesce, expected_fire_times",
+        [
+            pytest.param(CoalescePolicy.earliest, [-3598], id="earliest"),
+            pytest.param(CoalescePolicy.latest, [-1], id="latest"),
+            pytest.param(CoalescePolicy.all, list(range(-3598, 0, 3)), id="all"),
+        ],
+    )
+    async def test_coalesce_policy(
+        self, coalesce: CoalescePolicy, expected_fire_times: list[int]
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        start_time = now - timedelta(seconds=3598)
+        expected_fire_times = [
+            now + timedelta(seconds=seconds) for seconds in expected_fire_times
+        ]
+        async with AsyncScheduler(role=SchedulerRole.scheduler) as scheduler:
+            trigger = IntervalTrigger(seconds=3, start_time=start_time)
+            await scheduler.add_schedule(
+                dummy_async_job, trigger, id="foo", coalesce=coalesce
+            )
+            schedule_updated_event = anyio.Event()
+            scheduler.event_broker.subscribe(
+                lambda event: schedule_updated_event.set(), {ScheduleUpdated}
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                await schedule_updated_event.wait()
+
+            jobs = await scheduler.data_store.get_jobs()
+            assert sorted(job.scheduled_fire_time for job in jobs) == (
+                expected_fire_times
+            )
+            schedule = await scheduler.get_schedule("foo")
+            assert schedule.next_fire_time == now + timedelta(seconds=2)
+
+    async def test_coalesce_latest_default_next_after(
+        self, mocker: MockerFixture
+    ) -> None:
+        # Triggers without their own next_after() should just be stepped through
+        now = datetime.now(timezone.utc)
+        start_time = now - timedelta(seconds=3598)
+        find_latest = mocker.spy(AsyncScheduler, "_find_latest_fire_time")
+        async with AsyncScheduler(role=SchedulerRole.scheduler) as scheduler:
+            trigger = SteppingIntervalTrigger(seconds=3, start_time=start_time)
+            await scheduler.add_schedule(
+                dummy_async_job, trigger, id="foo", coalesce=CoalescePolicy.latest
+            )
+            schedule_updated_event = anyio.Event()
+            scheduler.event_broker.subscribe(
+                lambda event: schedule_updated_event.set(), {ScheduleUpdated}
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                await schedule_updated_event.wait()
+
+            jobs = await scheduler.data_store.get_jobs()
+            assert [job.scheduled_fire_time for job in jobs] == [
+                now - timedelta(seconds=1)
+            ]
+            schedule = await scheduler.get_schedule("foo")
+            assert schedule.next_fire_time == now + timedelta(seconds=2)
+            find_latest.assert_not_called()
+
     async def test_get_job_result_success(self) -> None:
         async with AsyncScheduler() as scheduler:
             job_id = await scheduler.add_job(
@@ -201,6 +288,216 @@ class TestAsyncScheduler:
             assert result.outcome is JobOutcome.success
             assert result.return_value == "returnvalue"
 
+    async def test_add_jobs(self) -> None:
+        async with AsyncScheduler() as scheduler:
+            job_ids = await scheduler.add_jobs(
+                dummy_async_job, [(0,), (0, True)], result_expiration_time=5
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                results = [await scheduler.get_job_result(job_id) for job_id in job_ids]
+
+            assert [result.job_id for result in results] == job_ids
+            assert results[0].outcome is JobOutcome.success
+            assert results[1].outcome is JobOutcome.error
+
+    async def test_batched_job_releases(self, mocker: MockerFixture) -> None:
+        async with AsyncScheduler(
+            job_release_batch_size=3, job_release_delay=10
+        ) as scheduler:
+            release_jobs = mocker.spy(scheduler.data_store, "release_jobs")
+            job_ids = await scheduler.add_jobs(
+                dummy_async_job, [()] * 3, result_expiration_time=5
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                for job_id in job_ids:
+                    result = await scheduler.get_job_result(job_id)
+                    assert result.outcome is JobOutcome.success
+
+        release_jobs.assert_called_once()
+        assert len(release_jobs.call_args[0][1]) == 3
+
+    async def test_job_releases_on_stop(self, mocker: MockerFixture) -> None:
+        async def release_jobs(worker_id: str, results: list) -> None:
+            release_started.set()
+            await anyio.sleep(0.2)
+            await real_release_jobs(worker_id, results)
+
+        release_started = anyio.Event()
+        async with AsyncScheduler(job_release_delay=0) as scheduler:
+            real_release_jobs = scheduler.data_store.release_jobs
+            mocker.patch.object(scheduler.data_store, "release_jobs", release_jobs)
+            job_id = await scheduler.add_job(dummy_async_job, result_expiration_time=5)
+            await scheduler.start_in_background()
+            with fail_after(3):
+                await release_started.wait()
+
+            # Stopping the scheduler must not cancel the release that's in progress
+            await scheduler.stop()
+            await scheduler.wait_until_stopped()
+
+        result = await scheduler.data_store.get_job_result(job_id)
+        assert result.outcome is JobOutcome.success
+
+    async def test_task_cache(self, mocker: MockerFixture) -> None:
+        async with AsyncScheduler() as scheduler:
+            get_task = mocker.spy(scheduler.data_store, "get_task")
+            job_ids = await scheduler.add_jobs(
+                dummy_async_job, [()] * 3, result_expiration_time=5
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                for job_id in job_ids:
+                    await scheduler.get_job_result(job_id)
+
+            # The task definition was only fetched once for all three jobs
+            assert get_task.call_count == 1
+
+            # Adding more jobs for the unchanged task does not replace the task
+            add_task = mocker.spy(scheduler.data_store, "add_task")
+            job_id = await scheduler.add_job(dummy_async_job, result_expiration_time=5)
+            with fail_after(3):
+                await scheduler.get_job_result(job_id)
+
+            assert add_task.call_count == 0
+            assert get_task.call_count == 1
+
+            # Replacing the task definition invalidates the cached one
+            task = get_task.spy_return
+            await scheduler.data_store.add_task(attrs.evolve(task, max_running_jobs=5))
+            get_task.reset_mock()
+            job_id = await scheduler.add_job(task.id, result_expiration_time=5)
+            with fail_after(3):
+                await scheduler.get_job_result(job_id)
+
+            assert get_task.call_count == 2
+
+    async def test_executor_limits(self, mocker: MockerFixture) -> None:
+        executor = ThreadPoolJobExecutor(max_workers=2)
+        async with AsyncScheduler(job_executors={"threadpool": executor}) as scheduler:
+            acquire_jobs = mocker.spy(scheduler.data_store, "acquire_jobs")
+            job_ids = await scheduler.add_jobs(
+                dummy_sync_job, [(0.1,)] * 5, result_expiration_time=5
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                for job_id in job_ids:
+                    result = await scheduler.get_job_result(job_id)
+                    assert result.outcome is JobOutcome.success
+
+        # No more jobs were acquired than the executor could run at once, and more
+        # jobs were acquired as soon as the executor had room for them
+        assert acquire_jobs.call_count >= 3
+        for call in acquire_jobs.call_args_list:
+            assert call.kwargs["executor_limits"]["threadpool"] <= 2
+
+    async def test_data_store_without_executor_limits(self) -> None:
+        """
+        Test that data stores whose ``acquire_jobs()`` predates the
+        ``executor_limits`` parameter still work.
+
+        """
+
+        class LegacyDataStore(MemoryDataStore):
+            async def acquire_jobs(
+                self, worker_id: str, limit: int | None = None
+            ) -> list[Job]:
+                return await super().acquire_jobs(worker_id, limit)
+
+        executor = ThreadPoolJobExecutor(max_workers=2)
+        async with AsyncScheduler(
+            data_store=LegacyDataStore(), job_executors={"threadpool": executor}
+        ) as scheduler:
+            job_id = await scheduler.add_job(
+                dummy_sync_job, args=(0,), result_expiration_time=5
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                result = await scheduler.get_job_result(job_id)
+
+        assert result.outcome is JobOutcome.success
+
+    @pytest.mark.parametrize(
+        "batch_size, batch_window",
+        [pytest.param(3, None, id="size"), pytest.param(10, 0.1, id="window")],
+    )
+    async def test_job_batches(
+        self, batch_size: int, batch_window: float | None
+    ) -> None:
+        calls: list[list[tuple]] = []
+
+        def batch_func(args_list: list[tuple]) -> list[int]:
+            calls.append(args_list)
+            return [x * 2 for x, in args_list]
+
+        async with AsyncScheduler() as scheduler:
+            await scheduler.data_store.add_task(
+                Task(
+                    id="batched",
+                    func=batch_func,
+                    executor="async",
+                    batch_size=batch_size,
+                    batch_window=batch_window,
+                )
+            )
+            job_ids = await scheduler.add_jobs(
+                "batched", [(x,) for x in range(3)], result_expiration_time=5
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                results = [await scheduler.get_job_result(job_id) for job_id in job_ids]
+
+        assert calls == [[(0,), (1,), (2,)]]
+        assert [result.outcome for result in results] == [JobOutcome.success] * 3
+        assert [result.return_value for result in results] == [0, 2, 4]
+
+    async def test_job_batch_wrong_return_value_count(self) -> None:
+        async with AsyncScheduler() as scheduler:
+            await scheduler.data_store.add_task(
+                Task(
+                    id="batched",
+                    func=lambda args_list: [None],
+                    executor="async",
+                    batch_size=2,
+                )
+            )
+            job_ids = await scheduler.add_jobs(
+                "batched", [(1,), (2,)], result_expiration_time=5
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                for job_id in job_ids:
+                    result = await scheduler.get_job_result(job_id)
+                    assert result.outcome is JobOutcome.error
+                    assert isinstance(result.exception, ValueError)
+
+    async def test_job_batch_missing_executor(self) -> None:
+        async with AsyncScheduler() as scheduler:
+            await scheduler.data_store.add_task(
+                Task(
+                    id="batched",
+                    func=lambda args_list: args_list,
+                    executor="threadpool",
+                    batch_size=10,
+                    batch_window=0.5,
+                )
+            )
+            job_ids = await scheduler.add_jobs(
+                "batched", [(1,), (2,)], result_expiration_time=5
+            )
+            await scheduler.start_in_background()
+            with fail_after(3):
+                while len(scheduler._running_jobs) < 2:
+                    await anyio.sleep(0.01)
+
+                # Remove the executor while the jobs wait for the batch window to close
+                del scheduler.job_executors["threadpool"]
+                for job_id in job_ids:
+                    result = await scheduler.get_job_result(job_id)
+                    assert result.outcome is JobOutcome.error
+                    assert isinstance(result.exception, LookupError)
+
     async def test_get_job_result_success_empty(self) -> None:
         event = anyio.Event()
         async with AsyncScheduler() as scheduler:
@@ -434,6 +731,17 @@ class TestSyncScheduler:
             assert result.outcome is JobOutcome.success
             assert result.return_value == "returnvalue"
 
+    def test_add_jobs(self) -> None:
+        with Scheduler() as scheduler:
+            job_ids = scheduler.add_jobs(
+                dummy_sync_job, [(0,), (0, True)], result_expiration_time=5
+            )
+            scheduler.start_in_background()
+            results = [scheduler.get_job_result(job_id) for job_id in job_ids]
+            assert [result.job_id for result in results] == job_ids
+            assert results[0].outcome is JobOutcome.success
+            assert results[1].outcome is JobOutcome.error
+
     def test_get_job_result_success_empty(self) -> None:
         event = threading.Event()
         with Scheduler() as scheduler:
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date, datetime
+from datetime import date, datetime, time
 
 import pytest
 
@@ -79,6 +79,27 @@ def test_nonexistent_days(timezone, serializer):
     assert trigger.next() == datetime(2016, 5, 31, tzinfo=timezone)
 
 
+@pytest.mark.parametrize(
+    "interval, expected_date",
+    [
+        pytest.param({"days": 3}, date(2021, 2, 3), id="days"),
+        pytest.param({"weeks": 1}, date(2021, 2, 5), id="weeks"),
+        pytest.param({"months": 1}, date(2021, 3, 31), id="months"),
+        pytest.param({"years": 1, "months": 2}, date(2021, 3, 31), id="years_months"),
+        pytest.param({"months": 1, "days": 1}, date(2021, 2, 11), id="months_days"),
+    ],
+)
+def test_next_after(timezone, serializer, interval, expected_date):
+    trigger = CalendarIntervalTrigger(
+        **interval, hour=12, start_date=date(2020, 1, 31), timezone=timezone
+    )
+    if serializer:
+        trigger = serializer.deserialize(serializer.serialize(trigger))
+
+    next_time = trigger.next_after(datetime(2021, 2, 1, 12, tzinfo=timezone))
+    assert next_time == datetime.combine(expected_date, time(12), timezone)
+
+
 def test_repr(timezone, serializer):
     trigger = CalendarIntervalTrigger(
         years=1,
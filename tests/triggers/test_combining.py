@@ -99,6 +99,24 @@ class TestOrTrigger:
         # The end time of the 6 second interval has been reached
         assert trigger.next() is None
 
+    def test_next_after(self, timezone, serializer):
+        start_time = datetime(2020, 5, 16, 14, 17, 30, 254212, tzinfo=timezone)
+        trigger = OrTrigger(
+            [
+                IntervalTrigger(hours=4, start_time=start_time),
+                IntervalTrigger(hours=6, start_time=start_time),
+            ]
+        )
+        if serializer:
+            trigger = serializer.deserialize(serializer.serialize(trigger))
+
+        assert trigger.next() == start_time
+        assert trigger.next_after(start_time + timedelta(days=10)) == (
+            start_time + timedelta(days=10, hours=4)
+        )
+        assert trigger.next() == start_time + timedelta(days=10, hours=6)
+        assert trigger.next() == start_time + timedelta(days=10, hours=8)
+
     def test_repr(self, timezone):
         date1 = datetime(2020, 5, 16, 14, 17, 30, 254212, tzinfo=timezone)
         date2 = datetime(2020, 5, 18, 15, 1, 53, 940564, tzinfo=timezone)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import sys
-from datetime import datetime
+from datetime import datetime, time
 
 import pytest
 
@@ -425,6 +425,42 @@ def test_year_list(timezone, serializer):
     assert trigger.next() is None
 
 
+def test_overlapping_expressions(timezone, serializer):
+    start_time = datetime(2009, 1, 1, 23, 57, tzinfo=timezone)
+    trigger = CronTrigger(
+        minute="*/20,5-10/3,58", start_time=start_time, timezone=timezone
+    )
+    if serializer:
+        trigger = serializer.deserialize(serializer.serialize(trigger))
+
+    assert [trigger.next().time() for _ in range(6)] == [
+        time(23, 58),
+        time(0, 0),
+        time(0, 5),
+        time(0, 8),
+        time(0, 20),
+        time(0, 40),
+    ]
+
+
+def test_next_after(timezone, serializer):
+    start_time = datetime(2020, 1, 1, tzinfo=timezone)
+    trigger = CronTrigger(
+        day_of_week="mon-fri", hour="9", start_time=start_time, timezone=timezone
+    )
+    if serializer:
+        trigger = serializer.deserialize(serializer.serialize(trigger))
+
+    assert trigger.next() == datetime(2020, 1, 1, 9, tzinfo=timezone)
+    assert trigger.next_after(datetime(2020, 3, 6, 9, tzinfo=timezone)) == datetime(
+        2020, 3, 9, 9, tzinfo=timezone
+    )
+    assert trigger.next() == datetime(2020, 3, 10, 9, tzinfo=timezone)
+
+    # Skipping to a point before the next fire time must not go back in time
+    assert trigger.next_after(start_time) == datetime(2020, 3, 11, 9, tzinfo=timezone)
+
+
 @pytest.mark.parametrize(
     "expr, expected_repr",
     [
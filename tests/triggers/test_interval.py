@@ -37,6 +37,48 @@ def test_end_time(timezone, serializer):
     assert trigger.next() is None
 
 
+def test_next_after(timezone, serializer):
+    start_time = datetime(2020, 5, 16, 12, 0, 30, tzinfo=timezone)
+    trigger = IntervalTrigger(hours=6, start_time=start_time)
+    if serializer:
+        trigger = serializer.deserialize(serializer.serialize(trigger))
+
+    assert trigger.next_after(datetime(2020, 6, 16, 9, tzinfo=timezone)) == datetime(
+        2020, 6, 16, 12, 0, 30, tzinfo=timezone
+    )
+    assert trigger.next() == datetime(2020, 6, 16, 18, 0, 30, tzinfo=timezone)
+
+
+def test_next_after_dst_change(timezone):
+    # The fire times are calculated in wall clock time, across the DST change
+    start_time = datetime(2020, 3, 28, 12, tzinfo=timezone)
+    trigger = IntervalTrigger(hours=6, start_time=start_time)
+    assert trigger.next_after(datetime(2020, 4, 28, 9, tzinfo=timezone)) == datetime(
+        2020, 4, 28, 12, tzinfo=timezone
+    )
+
+
+def test_next_after_past(timezone):
+    start_time = datetime(2020, 5, 16, tzinfo=timezone)
+    trigger = IntervalTrigger(hours=1, start_time=start_time)
+    assert trigger.next_after(start_time - timedelta(days=1)) == start_time
+
+
+def test_next_n(timezone, serializer):
+    start_time = datetime(2020, 5, 16, 19, 32, 44, 649521, tzinfo=timezone)
+    end_time = datetime(2020, 5, 16, 22, 33, 1, tzinfo=timezone)
+    interval = timedelta(hours=1, seconds=6)
+    trigger = IntervalTrigger(
+        start_time=start_time, end_time=end_time, hours=1, seconds=6
+    )
+    if serializer:
+        trigger = serializer.deserialize(serializer.serialize(trigger))
+
+    assert trigger.next_n(2) == [start_time, start_time + interval]
+    assert trigger.next_n(5) == [start_time + interval * 2]
+    assert trigger.next_n(5) == []
+
+
 def test_repr(timezone, serializer):
     start_time = datetime(2020, 5, 15, 12, 55, 32, 954032, tzinfo=timezone)
     end_time = datetime(2020, 6, 4, 16, 18, 49, 306942, tzinfo=timezone)